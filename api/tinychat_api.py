@@ -3,6 +3,9 @@
 import time
 import random
 import webbrowser
+import json
+import threading
+from collections import OrderedDict
 from xml.dom.minidom import parseString
 import web_request
 import os
@@ -75,6 +78,125 @@ def tinychat_user_info(tc_account):
             return None
 
 
+class UserInfoCache:
+    """
+    A cache of tinychat_user_info results, bounded by age (ttl) and by size, dropping the least
+    recently used accounts first. Concurrent lookups of the same account share a single request.
+    The cache can be saved to and loaded from a file, so it survives restarts.
+    """
+
+    def __init__(self, ttl=3600, max_size=1024, file_path=None):
+        """
+        Initialize the cache, loading the saved entries if there is a file.
+        :param ttl: int the amount of seconds an entry is valid for.
+        :param max_size: int the maximum amount of accounts to keep.
+        :param file_path: str the file to save the cache to, or None to keep it in memory only.
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+        self.file_path = file_path
+        self.hits = 0
+        self.misses = 0
+
+        # Account name to a (time stored, info) tuple, least recently used first.
+        self._entries = OrderedDict()
+        # Account name to the event set once the request for it is done.
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+        if file_path is not None:
+            self.load()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _get(self, account):
+        entry = self._entries.pop(account, None)
+        if entry is None or entry[0] + self.ttl < time.time():
+            return None
+        self._entries[account] = entry
+        return entry[1]
+
+    def _store(self, account, info, stored=None):
+        self._entries.pop(account, None)
+        self._entries[account] = (stored or time.time(), info)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def get(self, account):
+        """
+        Get the cached info of an account, without making a request.
+        :param account: str the account name.
+        :return: dict the info, or None if it is not cached (any more).
+        """
+        with self._lock:
+            return self._get(account)
+
+    def lookup(self, account):
+        """
+        Get the info of an account, making a request if it is not cached.
+        If a request for the account is already being made, wait for that one instead.
+        :param account: str the account name.
+        :return: dict {'username', 'tinychat_id', 'last_active', 'name', 'location'} or None.
+        """
+        with self._lock:
+            info = self._get(account)
+            if info is not None:
+                self.hits += 1
+                return info
+
+            event = self._in_flight.get(account)
+            requesting = event is None
+            if requesting:
+                self.misses += 1
+                event = threading.Event()
+                self._in_flight[account] = event
+
+        if not requesting:
+            event.wait()
+            return self.get(account)
+
+        info = None
+        try:
+            info = tinychat_user_info(account)
+        finally:
+            with self._lock:
+                # Failed requests are not cached, the next lookup tries again.
+                if info is not None:
+                    self._store(account, info)
+                del self._in_flight[account]
+            event.set()
+        return info
+
+    def load(self):
+        """ Load the saved entries which have not expired yet. """
+        try:
+            with open(self.file_path, mode='r') as f:
+                entries = json.load(f)
+        except (IOError, ValueError):
+            return
+
+        expires = time.time() - self.ttl
+        with self._lock:
+            for account, stored, info in sorted(entries, key=lambda entry: entry[1]):
+                if stored > expires:
+                    self._store(account, info, stored)
+
+    def save(self):
+        """ Save the entries to the file. """
+        if self.file_path is None:
+            return
+
+        with self._lock:
+            entries = [(account, stored, info) for account, (stored, info) in self._entries.iteritems()]
+
+        directory = os.path.dirname(self.file_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        with open(self.file_path, mode='w') as f:
+            json.dump(entries, f)
+
+
 def spy_info(room):
     """
     Finds info for a given room name.
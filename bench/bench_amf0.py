@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+
+""" Benchmark of the in-tree AMF0 codec against pyamf, on the command bodies Tinychat sends most. """
+
+import pyamf
+import pyamf.amf0
+import pyamf.util
+
+from benchutil import measure, report
+from rtmp import amf0
+
+BODIES = {
+    'privmsg': [u'privmsg', 0, None, u'74,101,115,116,32,109,101,115,115,97,103,101', u'#0,en', u'n', u'guest-1234'],
+    'join': [u'join', 0, pyamf.ASObject({'nick': u'guest-1234', 'id': 1234, 'account': u'someone', 'mod': False,
+                                         'own': False, 'btype': u'', 'lf': False, 'stype': 0, 'gp': 0})],
+}
+
+
+def pyamf_encode(elements):
+    stream = pyamf.util.BufferedByteStream()
+    encoder = pyamf.amf0.Encoder(stream)
+    for element in elements:
+        encoder.writeElement(element)
+    return stream.getvalue()
+
+
+def pyamf_decode(data):
+    stream = pyamf.util.BufferedByteStream(data)
+    decoder = pyamf.amf0.Decoder(stream)
+    elements = []
+    while not stream.at_eof():
+        elements.append(decoder.readElement())
+    return elements
+
+
+if __name__ == '__main__':
+    for name, elements in sorted(BODIES.items()):
+        data = pyamf_encode(elements)
+        buf = bytearray(data)
+        report('amf0: %s decode, pyamf' % name, measure(lambda: pyamf_decode(data), 20000), 'msg')
+        report('amf0: %s decode, in-tree' % name, measure(lambda: amf0.decode_elements(buf), 20000), 'msg')
+        report('amf0: %s encode, pyamf' % name, measure(lambda: pyamf_encode(elements), 20000), 'msg')
+        report('amf0: %s encode, in-tree' % name, measure(lambda: amf0.encode_elements(elements), 20000), 'msg')
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark of decoding inbound COMMAND messages from a busy room stream.
+
+The stream is a capture given as the first argument, or the busy room simulated by bench_reader.
+The message bodies are read first; then the commands are decoded fully with pyamf (as the reader did
+before), by name only, by name and arguments, and the way the client does: the arguments of the
+commands it has a callback for, only the name of the others.
+"""
+
+import io
+import sys
+
+import pyamf
+import pyamf.amf0
+import pyamf.util
+
+from benchutil import measure, report
+from bench_reader import busy_room_stream
+import pinylib
+from rtmp import rtmp_protocol
+
+
+def command_bodies(data):
+    """
+    Read the bodies of the COMMAND messages in a stream.
+    :param data: str the chunked messages.
+    :return: list of bytearray message bodies.
+    """
+    reader = rtmp_protocol.RtmpReader(rtmp_protocol.FileDataTypeMixIn(io.BytesIO(data)))
+    bodies = []
+    while reader.stream.fileobject.tell() < len(data):
+        header, body = reader.read_message()
+        if header.data_type == rtmp_protocol.DataTypes.COMMAND:
+            bodies.append(body)
+    return bodies
+
+
+def pyamf_full(bodies):
+    for body in bodies:
+        stream = pyamf.util.BufferedByteStream(str(body))
+        decoder = pyamf.amf0.Decoder(stream)
+        while not stream.at_eof():
+            decoder.readElement()
+
+
+def name_only(bodies):
+    for body in bodies:
+        rtmp_protocol.LazyCommand(body).name
+
+
+def name_and_arguments(bodies):
+    for body in bodies:
+        len(rtmp_protocol.LazyCommand(body))
+
+
+def as_the_client(bodies):
+    callbacks = pinylib.TinychatRTMPClient.callbacks
+    for body in bodies:
+        command = rtmp_protocol.LazyCommand(body)
+        if command.name in callbacks:
+            len(command)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], 'rb') as f:
+            stream_data = f.read()
+    else:
+        stream_data = busy_room_stream()
+    command_list = command_bodies(stream_data)
+    count = len(command_list)
+    names = {}
+    for command_body in command_list:
+        name = rtmp_protocol.LazyCommand(command_body).name
+        names[name] = names.get(name, 0) + 1
+    print('%d commands: %s' % (count, ', '.join('%s %d' % item for item in sorted(names.items()))))
+
+    for func in (pyamf_full, name_only, name_and_arguments, as_the_client):
+        report('commands: %s' % func.__name__.replace('_', ' '), measure(lambda: func(command_list), 1, 5) / count,
+               'command')
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+
+""" Benchmark of the duplicate message detector, in a spam wave and with unrelated chat. """
+
+import random
+
+from benchutil import measure, report
+from files import spam_filter
+
+BASE = u'join my awesome room right now at example dot com please'
+
+
+def wave(size):
+    """
+    Time checking the next message of a spam wave, once size nearly the same messages are in the window.
+    :param size: int the amount of duplicates already sent.
+    """
+    detector = spam_filter.DuplicateDetector(3, 60)
+    for i in xrange(size):
+        detector.check(BASE + u' %d' % i, 'user%d' % i, i * 0.001)
+
+    counter = [size]
+
+    def check():
+        counter[0] += 1
+        detector.check(BASE + u' %d' % counter[0], 'user%d' % counter[0], counter[0] * 0.001)
+
+    report('duplicates: wave of %d' % size, measure(check, 1000), 'msg')
+
+
+def chat(size):
+    """
+    Time checking unrelated messages, with size of them in the window.
+    :param size: int the amount of messages already sent.
+    """
+    random.seed(1)
+    words = [u''.join(random.choice('abcdefghijklmnopqrstuvwxyz') for _ in xrange(6)) for _ in xrange(1000)]
+    detector = spam_filter.DuplicateDetector(3, 60, max_messages=size)
+    for i in xrange(size):
+        detector.check(u' '.join(random.sample(words, 8)), 'user%d' % i, i * 0.001)
+
+    messages = [u' '.join(random.sample(words, 8)) for _ in xrange(1000)]
+    counter = [size]
+
+    def check():
+        counter[0] += 1
+        detector.check(messages[counter[0] % 1000], 'user%d' % counter[0], counter[0] * 0.001)
+
+    report('duplicates: chat, %d in the window' % size, measure(check, 1000), 'msg')
+
+
+if __name__ == '__main__':
+    for n in (10, 2000, 10000):
+        wave(n)
+    for n in (10, 2000):
+        chat(n)
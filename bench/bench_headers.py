@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+
+"""
+Micro-benchmark of the RTMP chunk header codec against the field by field one it replaced.
+
+Headers of every form are decoded and encoded: the three message header forms and continuation
+headers, with 1, 2 and 3 byte channel ids and with an extended timestamp.
+"""
+
+import io
+import logging
+
+import pyamf.util
+
+from benchutil import measure, report
+from rtmp import rtmp_protocol, rtmp_protocol_base
+from rtmp.rtmp_protocol_base import Header
+
+log = logging.getLogger(__name__)
+
+
+def header_forms():
+    """
+    Get a sequence of headers using every header form, each with the header it follows.
+    :return: list of (header, previous) tuples, previous is None for a full header.
+    """
+    forms = []
+    for channel_id in (3, 100, 1000):
+        for timestamp in (10, 0x1000000):
+            full = Header(channel_id, timestamp, 20, 300, 1)
+            forms.append((full, None))
+            # Type 1 (new length and type), type 2 (new timestamp) and type 3 (nothing new).
+            new_length = Header(channel_id, timestamp, 18, 120, 1)
+            forms.append((new_length, full))
+            new_timestamp = Header(channel_id, timestamp + 5, 18, 120, 1)
+            forms.append((new_timestamp, new_length))
+            forms.append((new_timestamp, new_timestamp))
+    return forms
+
+
+def encode_all(forms):
+    buf = bytearray(rtmp_protocol_base.MAX_HEADER_LENGTH)
+    data = bytearray()
+    for header, previous in forms:
+        length = rtmp_protocol_base.header_encode_into(buf, header, previous)
+        data += buf[:length]
+    return str(data)
+
+
+def baseline_header_decode(stream, headers):
+    """ The header decoder before the struct codecs, reading field by field from a BufferedByteStream. """
+    channel_id = stream.read_uchar()
+    bits = channel_id >> 6
+    channel_id &= 0x3f
+
+    if channel_id == 0:
+        channel_id = stream.read_uchar() + 64
+
+    if channel_id == 1:
+        channel_id = stream.read_uchar() + 64 + (stream.read_uchar() << 8)
+
+    header = Header(channel_id)
+
+    if bits == 3:
+        previous = headers.get(str(channel_id))
+        if previous is not None:
+            header.stream_id = previous.stream_id
+            header.body_length = previous.body_length
+            header.data_type = previous.data_type
+            header.timestamp = previous.timestamp
+        return header
+
+    header.timestamp = stream.read_24bit_uint()
+
+    if bits < 3:
+        previous = headers.get(str(channel_id))
+        if previous is not None:
+            header.stream_id = previous.stream_id
+            header.body_length = previous.body_length
+
+    if bits < 2:
+        header.body_length = stream.read_24bit_uint()
+        header.data_type = stream.read_uchar()
+        previous = headers.get('previous')
+        if previous is not None:
+            header.stream_id = previous.stream_id
+
+    if bits < 1:
+        stream.endian = '<'
+        header.stream_id = stream.read_ulong()
+        stream.endian = '!'
+        header.full = True
+
+    if header.timestamp == 0xffffff:
+        header.timestamp = stream.read_ulong()
+
+    headers['previous'] = header
+    headers[str(channel_id)] = header
+
+    log.info('header recv: %s' % header)
+    return header
+
+
+def baseline_header_encode(stream, header, previous=None):
+    """ The header encoder before the struct codecs, writing field by field to a BufferedByteStream. """
+    log.debug('header send: %s' % header)
+    if previous is None:
+        size = 0
+    else:
+        size = rtmp_protocol_base.min_bytes_required(header, previous)
+
+    channel_id = header.channel_id
+
+    if channel_id < 64:
+        stream.write_uchar(size | channel_id)
+    elif channel_id < 320:
+        stream.write_uchar(size)
+        stream.write_uchar(channel_id - 64)
+    else:
+        channel_id -= 64
+        stream.write_uchar(size + 1)
+        stream.write_uchar(channel_id & 0xff)
+        stream.write_uchar(channel_id >> 0x08)
+
+    if size == 0xc0:
+        return
+
+    if size <= 0x80:
+        if header.timestamp >= 0xffffff:
+            stream.write_24bit_uint(0xffffff)
+        else:
+            stream.write_24bit_uint(header.timestamp)
+
+    if size <= 0x40:
+        stream.write_24bit_uint(header.body_length)
+        stream.write_uchar(header.data_type)
+
+    if size == 0:
+        stream.endian = '<'
+        stream.write_ulong(header.stream_id)
+        stream.endian = '!'
+
+    if size <= 0x80:
+        if header.timestamp >= 0xffffff:
+            stream.write_ulong(header.timestamp)
+
+
+if __name__ == '__main__':
+    header_list = header_forms()
+    header_count = len(header_list)
+    encoded = encode_all(header_list) * 100
+
+    def decode_baseline():
+        stream = pyamf.util.BufferedByteStream(encoded)
+        headers = {}
+        for _ in xrange(header_count * 100):
+            baseline_header_decode(stream, headers)
+
+    def decode_now():
+        stream = rtmp_protocol.FileDataTypeMixIn(io.BytesIO(encoded))
+        previous_headers = [None] * 64
+        for _ in xrange(header_count * 100):
+            rtmp_protocol_base.header_decode(stream, previous_headers)
+
+    def encode_baseline():
+        stream = pyamf.util.BufferedByteStream()
+        for header, previous in header_list:
+            baseline_header_encode(stream, header, previous)
+
+    buf = bytearray(rtmp_protocol_base.MAX_HEADER_LENGTH)
+
+    def encode_now():
+        for header, previous in header_list:
+            rtmp_protocol_base.header_encode_into(buf, header, previous)
+
+    report('headers: decode, field by field (before)', measure(decode_baseline, 10) / (header_count * 100), 'header')
+    report('headers: decode, struct codecs (now)', measure(decode_now, 10) / (header_count * 100), 'header')
+    report('headers: encode, field by field (before)', measure(encode_baseline, 1000) / header_count, 'header')
+    report('headers: encode, struct codecs (now)', measure(encode_now, 1000) / header_count, 'header')
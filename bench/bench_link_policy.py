@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark of the link policy with a file of 100k domains.
+
+Loading the file, looking up hosts in and out of the file, and checking chat messages
+without links, with an allowed link and with a denied link.
+"""
+
+import os
+import random
+import shutil
+import tempfile
+
+from benchutil import measure, report
+from files import link_policy
+
+TLDS = ('com', 'net', 'org', 'io', 'co.uk', 'de', 'ru', 'info', 'xyz', 'tk')
+
+
+def domains(count, seed=1):
+    """
+    Make up domain names.
+    :param count: int the amount of domains.
+    :param seed: int the seed of the random generator.
+    :return: list of str the domains.
+    """
+    rnd = random.Random(seed)
+    letters = 'abcdefghijklmnopqrstuvwxyz0123456789'
+    names = set()
+    while len(names) < count:
+        name = ''.join(rnd.choice(letters) for _ in xrange(rnd.randint(5, 14)))
+        names.add('%s.%s' % (name, rnd.choice(TLDS)))
+    return sorted(names)
+
+
+if __name__ == '__main__':
+    denied = domains(100000)
+    directory = tempfile.mkdtemp()
+    try:
+        path, name = directory + os.sep, 'link_policy.txt'
+        with open(path + name, 'w') as f:
+            f.write('# Made up spam domains.\n')
+            f.write('allow youtube.com\nallow www.%s\nignore tinychat.com\n' % denied[0])
+            f.write('\n'.join(denied) + '\n')
+
+        policy = link_policy.LinkPolicy(path, name)
+
+        def load():
+            policy.invalidate()
+            policy.trie()
+
+        report('link policy: load 100k domains', measure(load, 1))
+        trie = policy.trie()
+        print('%d domains in the trie' % trie.size)
+
+        hosts = [('denied', denied[50000]), ('denied subdomain', 'cdn.files.' + denied[50000]),
+                 ('allowed subdomain', 'www.' + denied[0]), ('unknown', 'www.example.com')]
+        for kind, host in hosts:
+            report('link policy: lookup %s host' % kind, measure(lambda: trie.lookup(host), 100000), 'lookup')
+
+        messages = [('no link', 'hey whats up everyone, anyone here like music? lol'),
+                    ('allowed link', 'check this out https://youtube.com/watch?v=dQw4w9WgXcQ so good'),
+                    ('denied link', 'free stuff at http://%s/win click now' % denied[50000]),
+                    ('ignored link', 'come to tinychat.com/otherroom')]
+        for kind, msg in messages:
+            decision = policy.check(msg)
+            report('link policy: check message, %s (%s)' % (kind, decision.action),
+                   measure(lambda: policy.check(msg), 20000), 'message')
+    finally:
+        shutil.rmtree(directory)
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark of matching chat messages against a bad strings file of 10k patterns.
+
+The chat is made up of everyday words, with one message in twenty carrying a bad string.
+The matcher is timed on its own, and through FileMatcher (the file version check included),
+against the way check_msg_for_bad_string worked before: the file read on every message
+and every word of the message looked up in the list (which never found the phrases).
+"""
+
+import os
+import random
+import shutil
+import tempfile
+
+from benchutil import measure, report
+from files import file_handler as fh, matcher
+
+CHAT_WORDS = (u'hey hi hello lol lmao what is up with this room the music song play next please good night '
+              u'yes no maybe i you we they it was is are have has do does did not can cant wont would '
+              u'should could love like hate really very so much more less today tomorrow later brb afk '
+              u'back welcome thanks thank ok okay sure why how when where who class assignment passing').split()
+
+
+def bad_strings(count, seed=1):
+    """
+    Make up bad strings, mostly single words and some phrases of two or three words.
+    :param count: int the amount of strings.
+    :param seed: int the seed of the random generator.
+    :return: list of str the strings.
+    """
+    rnd = random.Random(seed)
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    strings = set()
+    while len(strings) < count:
+        words = [''.join(rnd.choice(letters) for _ in xrange(rnd.randint(4, 9)))
+                 for _ in xrange(rnd.choice((1, 1, 1, 2, 3)))]
+        strings.add(' '.join(words))
+    return sorted(strings)
+
+
+def chat(count, strings, seed=1):
+    """
+    Make up chat messages of 3 to 20 words, one in twenty with a bad string in it.
+    :param count: int the amount of messages.
+    :param strings: list the bad strings.
+    :param seed: int the seed of the random generator.
+    :return: list of str the messages.
+    """
+    rnd = random.Random(seed)
+    messages = []
+    for number in xrange(count):
+        words = [rnd.choice(CHAT_WORDS) for _ in xrange(rnd.randint(3, 20))]
+        if number % 20 == 0:
+            words.insert(rnd.randint(0, len(words)), rnd.choice(strings))
+        messages.append(' '.join(words).encode('utf-8'))
+    return messages
+
+
+def baseline_check(file_path, file_name, msg):
+    """ The check before the matcher, returning whether a word of the message is a bad string. """
+    msg_words = msg.split(' ')
+    strings = fh.file_reader(file_path, file_name)
+    if strings is not None:
+        for word in msg_words:
+            if word in strings:
+                return True
+    return False
+
+
+if __name__ == '__main__':
+    patterns = bad_strings(10000)
+    messages = chat(2000, patterns)
+    directory = tempfile.mkdtemp()
+    try:
+        path, name = directory + os.sep, 'badstrings.txt'
+        with open(path + name, 'w') as f:
+            f.write('\n'.join(patterns) + '\n')
+
+        report('matcher: build 10k patterns', measure(lambda: matcher.StringMatcher(patterns), 1))
+        string_matcher = matcher.StringMatcher(patterns)
+        file_matcher = matcher.FileMatcher(path, name)
+        file_matcher.matcher()
+
+        hits = [string_matcher.search(msg) is not None for msg in messages]
+        baseline_hits = [baseline_check(path, name, msg) for msg in messages]
+        print('%d messages, matcher hits %d, baseline hits %d' % (len(messages), sum(hits), sum(baseline_hits)))
+
+        def match_all(search):
+            for msg in messages:
+                search(msg)
+
+        count = len(messages)
+        report('matcher: StringMatcher.search', measure(lambda: match_all(string_matcher.search), 1) / count,
+               'message')
+        # Check the file version on every message, rather than at most once a second.
+        file_matcher.check_interval = 0
+        report('matcher: FileMatcher.search, checking the file', measure(lambda: match_all(file_matcher.search), 1) /
+               count, 'message')
+        report('matcher: baseline', measure(lambda: match_all(lambda msg: baseline_check(path, name, msg)), 1, 1) /
+               count, 'message')
+    finally:
+        shutil.rmtree(directory)
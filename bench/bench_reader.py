@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark of reading RTMP messages: reassembling the chunks of a recorded busy room stream.
+
+The stream is a capture of the server side of a connection (after the handshake, at the default
+chunk size), given as the first argument; without one a busy room is simulated with RtmpWriter.
+The chunks are reassembled both the way the reader did before (a list of chunk strings, joined and
+wrapped in a BufferedByteStream) and the way it does now (straight into a preallocated bytearray),
+counting the strings read from the stream and the bytes copied besides the reads into the body.
+The stream is read from memory, from a socket file (what the client read from before) and from a
+socket through SocketDataTypeMixIn (what the client reads from now), sent by a thread over a socket pair.
+"""
+
+import io
+import random
+import socket
+import sys
+import threading
+
+import pyamf
+import pyamf.util
+
+from benchutil import measure, report
+from rtmp import rtmp_protocol, rtmp_protocol_base
+
+NICKS = [u'guest-%d' % i for i in xrange(1000, 1400)] + [u'user%d' % i for i in xrange(200)]
+WORDS = u'hey hi lol what is up with this room music song play next please good night yes no maybe'.split()
+
+
+class _Sink(object):
+    """ A socket collecting what is sent to it. """
+
+    def __init__(self):
+        self.data = bytearray()
+
+    def sendall(self, data):
+        self.data += data
+
+
+class CountingStream(rtmp_protocol.FileDataTypeMixIn):
+    """ A stream counting the strings it returns, the bytes in them and the bytes copied afterwards. """
+
+    def __init__(self, fileobject):
+        rtmp_protocol.FileDataTypeMixIn.__init__(self, fileobject)
+        self.reads = 0
+        self.read_bytes = 0
+        self.copied = 0
+
+    def read(self, length):
+        self.reads += 1
+        self.read_bytes += length
+        return self.fileobject.read(length)
+
+    def read_into(self, buf, offset, length):
+        if self._readinto is None:
+            # Read as a string and copied into the body.
+            self.reads += 1
+            self.read_bytes += length
+            self.copied += length
+        rtmp_protocol.FileDataTypeMixIn.read_into(self, buf, offset, length)
+
+
+class CountingSocketStream(rtmp_protocol.SocketDataTypeMixIn):
+    """ A socket stream counting the strings it returns, the bytes in them and the bytes copied afterwards. """
+
+    def __init__(self, sock):
+        rtmp_protocol.SocketDataTypeMixIn.__init__(self, sock)
+        self.reads = 0
+        self.read_bytes = 0
+        self.copied = 0
+
+    def read(self, length):
+        self.reads += 1
+        self.read_bytes += length
+        return rtmp_protocol.SocketDataTypeMixIn.read(self, length)
+
+    def read_into(self, buf, offset, length):
+        # What was received already is copied from the receive buffer, the rest is received into the body.
+        self.copied += min(self._end - self._start, length)
+        rtmp_protocol.SocketDataTypeMixIn.read_into(self, buf, offset, length)
+
+
+def socket_pair(data):
+    """
+    Send data over a socket pair from a thread.
+    :param data: str the data to send.
+    :return: socket.socket the receiving end.
+    """
+    # socketpair returns the bare sockets, wrap them like the sockets the client uses.
+    sender, receiver = [socket.socket(_sock=sock) for sock in socket.socketpair()]
+
+    def send():
+        sender.sendall(data)
+        sender.close()
+
+    thread = threading.Thread(target=send)
+    thread.daemon = True
+    thread.start()
+    return receiver
+
+
+def _encode_msg(msg):
+    return u','.join(unicode(ord(char)) for char in msg)
+
+
+def busy_room_stream(count=20000, seed=1):
+    """
+    Simulate the stream of a busy room: mostly chat messages, joins, quits, nick changes,
+    gifts, pings and some audio.
+    :param count: int the amount of messages.
+    :param seed: int the seed of the random choices, the same seed gives the same stream.
+    :return: str the chunked messages.
+    """
+    rng = random.Random(seed)
+    sink = _Sink()
+    writer = rtmp_protocol.RtmpWriter(sink)
+    for i in xrange(count):
+        nick = rng.choice(NICKS)
+        kind = rng.random()
+        if kind < 0.6:
+            text = u' '.join(rng.choice(WORDS) for _ in xrange(rng.randint(1, 12)))
+            command = [u'privmsg', 0, None, u'0', _encode_msg(text), u'#0,en', nick]
+        elif kind < 0.7:
+            command = [u'join', 0, None, pyamf.ASObject({'id': i, 'nick': nick, 'account': u'', 'mod': False,
+                                                         'own': False, 'btype': u'', 'lf': False, 'stype': 0,
+                                                         'gp': 0})]
+        elif kind < 0.75:
+            command = [u'quit', 0, None, nick, i]
+        elif kind < 0.8:
+            command = [u'nick', 0, None, nick, rng.choice(NICKS), i]
+        elif kind < 0.9:
+            command = [u'gift', 0, None, nick, pyamf.ASObject({'points': rng.randint(1, 100), 'item': u'rose'})]
+        else:
+            command = None
+
+        if command is not None:
+            writer.write({'msg': rtmp_protocol.DataTypes.COMMAND, 'command': command})
+        elif kind < 0.95:
+            writer.write({'msg': rtmp_protocol.DataTypes.USER_CONTROL,
+                          'event_type': rtmp_protocol.UserControlTypes.PING_REQUEST, 'event_data': '\x00\x00\x01\x00'})
+        else:
+            writer.write({'msg': rtmp_protocol.DataTypes.AUDIO, 'stream_id': 1, 'timestamp': i,
+                          'body': {'control': 0xaf, 'data': '\x01' * rng.randint(100, 600)}})
+    writer.flush()
+    return str(sink.data)
+
+
+def count_messages(data):
+    """
+    Count the messages in a stream.
+    :param data: str the chunked messages.
+    :return: int the amount of messages.
+    """
+    reader = rtmp_protocol.RtmpReader(rtmp_protocol.FileDataTypeMixIn(io.BytesIO(data)))
+    count = 0
+    while reader.stream.fileobject.tell() < len(data):
+        reader.read_message()
+        count += 1
+    return count
+
+
+def join_reassembly(stream, count, chunk_size=128):
+    """
+    Reassemble messages the way the reader did before: the chunk strings in a list, joined.
+    :param stream: FileDataTypeMixIn the stream to read from.
+    :param count: int the amount of messages to read.
+    :param chunk_size: int the chunk size.
+    :return: int the amount of bytes copied after reading.
+    """
+    copied = 0
+    previous_headers = [None] * 64
+    for _ in xrange(count):
+        header = rtmp_protocol_base.header_decode(stream, previous_headers)
+        body = []
+        received = 0
+        while True:
+            read_bytes = min(header.body_length - received, chunk_size)
+            body.append(stream.read(read_bytes))
+            received += read_bytes
+            if received >= header.body_length:
+                break
+            rtmp_protocol_base.header_decode(stream, previous_headers)
+        # Joining copies the body, and so does the stream wrapping it.
+        pyamf.util.BufferedByteStream(''.join(body))
+        copied += 2 * received
+    return copied
+
+
+def buffer_reassembly(stream, count):
+    """
+    Reassemble messages the way the reader does now, straight into a preallocated body.
+    :param stream: FileDataTypeMixIn the stream to read from.
+    :param count: int the amount of messages to read.
+    """
+    reader = rtmp_protocol.RtmpReader(stream)
+    for _ in xrange(count):
+        reader.read_message()
+
+
+def read_all(stream, count):
+    """ Read and decode messages with the reader, as the client does (command arguments decoded). """
+    reader = rtmp_protocol.RtmpReader(stream)
+    for _ in xrange(count):
+        message = reader.next()
+        if message['msg'] == rtmp_protocol.DataTypes.COMMAND:
+            len(message['command'])
+
+
+# The streams read from: in memory, a socket file (which has no readinto) and a socket,
+# each as a stream and as the same stream counting what it reads.
+SOURCES = (
+    ('BytesIO', lambda data: rtmp_protocol.FileDataTypeMixIn(io.BytesIO(data)),
+     lambda data: CountingStream(io.BytesIO(data))),
+    ('socket file', lambda data: rtmp_protocol.FileDataTypeMixIn(socket_pair(data).makefile()),
+     lambda data: CountingStream(socket_pair(data).makefile())),
+    ('socket', lambda data: rtmp_protocol.SocketDataTypeMixIn(socket_pair(data)),
+     lambda data: CountingSocketStream(socket_pair(data)))
+)
+
+
+def run(name, data, count, func):
+    """
+    Time reading a stream from each source, and report the strings read from the stream and the bytes
+    copied per message (counted in a separate run, counting takes time too).
+    :param name: str what is measured.
+    :param data: str the stream.
+    :param count: int the amount of messages in the stream.
+    :param func: callable taking the stream and the amount of messages, returning the bytes it copied itself.
+    """
+    for source, make_stream, make_counting_stream in SOURCES:
+        stream = make_counting_stream(data)
+        copied = func(stream, count) or 0
+        copied += stream.copied
+        seconds = measure(lambda: func(make_stream(data), count), 1, 5)
+        report('reader: %s (%s)' % (name, source), seconds / count, 'msg')
+        print('    %.2f stream reads/msg, %.0f bytes read as strings/msg, %.0f bytes copied/msg, %.1f MB/s' %
+              (float(stream.reads) / count, float(stream.read_bytes) / count, float(copied) / count,
+               len(data) / seconds / 1e6))
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], 'rb') as f:
+            stream_data = f.read()
+    else:
+        stream_data = busy_room_stream()
+    message_count = count_messages(stream_data)
+    print('%d messages, %d bytes' % (message_count, len(stream_data)))
+
+    run('chunk list and join (before)', stream_data, message_count, join_reassembly)
+    run('preallocated bytearray (now)', stream_data, message_count, buffer_reassembly)
+    run('read and decode', stream_data, message_count, read_all)
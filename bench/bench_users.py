@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark of the room user registry with 1k and 10k users in the room.
+
+Looking users up by nick, id and account, renaming a user, and the memory held by the users and
+their indexes, against the plain dict of RoomUser objects the client kept before, where nicks were
+tested against keys() and a user with an account was found by scanning all the users.
+"""
+
+import sys
+
+from benchutil import measure, report
+import pinylib
+
+
+class BaselineRoomUser:
+    """ A copy of the RoomUser before the registry, without __slots__. """
+
+    def __init__(self, nick, uid=None, last_msg=None):
+        self.nick = nick
+        self.id = uid
+        self.last_msg = last_msg
+        self.user_account = None
+        self.user_account_type = None
+        self.user_account_giftpoints = None
+        self.is_owner = False
+        self.is_super = False
+        self.is_mod = False
+        self.has_power = False
+        self.tinychat_id = None
+        self.last_login = None
+        self.device_type = ''
+        self.reading_only = False
+
+
+def baseline_find(room_users, nick):
+    if nick in room_users.keys():
+        return room_users[nick]
+    return None
+
+
+def baseline_find_by_id(room_users, uid):
+    for user in room_users.values():
+        if user.id == uid:
+            return user
+    return None
+
+
+def baseline_find_by_account(room_users, account):
+    for user in room_users.values():
+        if user.user_account == account:
+            return user
+    return None
+
+
+def baseline_rename(room_users, old, new):
+    old_info = baseline_find(room_users, old)
+    old_info.nick = new
+    if old in room_users.keys():
+        del room_users[old]
+        room_users[new] = old_info
+
+
+def baseline_room(count):
+    room_users = {}
+    for number in xrange(count):
+        user = BaselineRoomUser('guest-%d' % number, number)
+        user.user_account = 'account%d' % number
+        room_users[user.nick] = user
+    return room_users
+
+
+def registry_room(count):
+    registry = pinylib.RoomUserRegistry()
+    for number in xrange(count):
+        user = registry.add('guest-%d' % number)
+        user.id = number
+        user.user_account = 'account%d' % number
+    return registry
+
+
+def baseline_size(room_users):
+    return sys.getsizeof(room_users) + sum(sys.getsizeof(user) + sys.getsizeof(user.__dict__)
+                                           for user in room_users.itervalues())
+
+
+def registry_size(registry):
+    indexes = (registry._users, registry._by_id, registry._by_account, registry._by_folded_nick)
+    return sum(sys.getsizeof(index) for index in indexes) + sum(sys.getsizeof(user) for user in registry.values())
+
+
+if __name__ == '__main__':
+    for users in (1000, 10000):
+        baseline = baseline_room(users)
+        registry = registry_room(users)
+        # A user from the middle of the room; where a scan finds it depends on the order of the dict.
+        nick, uid, account = 'guest-%d' % (users / 2), users / 2, 'account%d' % (users / 2)
+        number = 100000 if users == 1000 else 10000
+        scans = max(100000 / users, 10)
+
+        report('%d users: baseline find nick' % users, measure(lambda: baseline_find(baseline, nick), scans), 'lookup')
+        report('%d users: registry find nick' % users, measure(lambda: registry.find(nick), number), 'lookup')
+        report('%d users: baseline find id' % users,
+               measure(lambda: baseline_find_by_id(baseline, uid), scans), 'lookup')
+        report('%d users: registry find id' % users, measure(lambda: registry.find_by_id(uid), number), 'lookup')
+        report('%d users: baseline find account' % users,
+               measure(lambda: baseline_find_by_account(baseline, account), scans), 'lookup')
+        report('%d users: registry find account' % users,
+               measure(lambda: registry.find_by_account(account), number), 'lookup')
+
+        def baseline_rename_twice():
+            baseline_rename(baseline, nick, 'renamed')
+            baseline_rename(baseline, 'renamed', nick)
+
+        def registry_rename_twice():
+            registry.rename(nick, 'renamed')
+            registry.rename('renamed', nick)
+
+        report('%d users: baseline rename' % users, measure(baseline_rename_twice, scans) / 2, 'rename')
+        report('%d users: registry rename' % users, measure(registry_rename_twice, number / 10) / 2, 'rename')
+        print('%d users: baseline %d KB, registry %d KB' % (users, baseline_size(baseline) / 1024,
+                                                             registry_size(registry) / 1024))
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+
+"""
+Helpers shared by the benchmarks.
+
+Each benchmark is a script, run from anywhere with the interpreter the bot runs on,
+e.g. python bench/bench_reader.py; the numbers are printed, best of a few runs.
+"""
+
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# pinylib reads config.ini from the first directory on the path.
+if sys.path[0] != ROOT:
+    sys.path.insert(0, ROOT)
+
+
+def measure(func, number, repeat=3):
+    """
+    Time a function.
+    :param func: callable the function, called without arguments.
+    :param number: int the amount of calls per run.
+    :param repeat: int the amount of runs.
+    :return: float the seconds per call of the fastest run.
+    """
+    best = None
+    for _ in xrange(repeat):
+        start = time.time()
+        for _ in xrange(number):
+            func()
+        elapsed = time.time() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best / number
+
+
+def report(name, seconds, unit='call'):
+    """
+    Print the time taken per unit of work and the units per second.
+    :param name: str what was measured.
+    :param seconds: float the seconds per unit.
+    :param unit: str the unit of work.
+    """
+    rate = 1 / seconds if seconds else float('inf')
+    print('%-48s %10.2f us/%s %14.0f %ss/s' % (name, seconds * 1e6, unit, rate, unit))
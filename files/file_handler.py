@@ -7,6 +7,39 @@ import codecs
 import ConfigParser
 import ast
 
+# The list_database.ListDatabase the list files are kept in, if any.
+_database = None
+
+
+def use_database(database):
+    """
+    Keep the list files handled by a database in the database instead; file_reader, file_writer,
+    delete_file_content and remove_from_file then use the database for those files.
+    :param database: list_database.ListDatabase the database, or None to use the files again.
+    """
+    global _database
+    _database = database
+
+
+def _in_database(file_path, file_name):
+    return _database is not None and _database.handles(file_path, file_name)
+
+
+def file_version(file_path, file_name):
+    """
+    Get a value which changes whenever a file is changed.
+    :param file_path: str the path to the file.
+    :param file_name: str the name of the file.
+    :return: the modification time of the file (or the version of the list in the database),
+             or None if no file exists.
+    """
+    if _in_database(file_path, file_name):
+        return _database.version(file_path, file_name)
+    try:
+        return os.path.getmtime(file_path + file_name)
+    except OSError:
+        return None
+
 
 def file_reader(file_path, file_name):
     """
@@ -15,6 +48,9 @@ def file_reader(file_path, file_name):
     :param file_name: str the name of the file.
     :return: list of lines or None if no file exists.
     """
+    if _in_database(file_path, file_name):
+        return _database.read(file_path, file_name)
+
     file_content = []
     try:
         with open(file_path + file_name, mode='r') as f:
@@ -33,6 +69,10 @@ def file_writer(file_path, file_name, write_this):
     :param write_this: str the content to write.
     :return:
     """
+    if _in_database(file_path, file_name):
+        _database.add(file_path, file_name, write_this)
+        return
+
     if not os.path.exists(file_path):
         os.makedirs(file_path)
     with open(file_path + file_name, mode='a') as f:
@@ -45,6 +85,10 @@ def delete_file_content(file_path, file_name):
     :param file_path: str the path to the file.
     :param file_name: str the name of the file.
     """
+    if _in_database(file_path, file_name):
+        _database.clear(file_path, file_name)
+        return
+
     open(file_path + file_name, mode='w').close()
 
 
@@ -56,13 +100,21 @@ def remove_from_file(file_path, file_name, remove):
     :param remove: str the line to remove.
     :return: True on success else False
     """
+    if _in_database(file_path, file_name):
+        return _database.remove(file_path, file_name, remove)
+
     file_list = file_reader(file_path, file_name)
     if file_list is not None:
         if remove in file_list:
             file_list.remove(remove)
-            delete_file_content(file_path, file_name)
-            for line in file_list:
-                file_writer(file_path, file_name, line)
+            # Write the remaining lines to a new file in one go and swap it in,
+            # so a crash half way does not leave the file truncated.
+            temp_location = file_path + file_name + '.tmp'
+            with open(temp_location, mode='w') as f:
+                f.writelines(line + '\n' for line in file_list)
+            if os.name == 'nt':
+                os.remove(file_path + file_name)
+            os.rename(temp_location, file_path + file_name)
             return True
         return False
     return False
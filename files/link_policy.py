@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+
+""" Decides what to do with the links in chat messages, from a file of allowed and denied domains. """
+
+import re
+import threading
+import time
+from collections import namedtuple
+
+import file_handler as fh
+import matcher
+
+# What to do with a link.
+ALLOW = 'allow'  # Fine, the title of the page may be looked up.
+IGNORE = 'ignore'  # Fine, but leave it alone.
+DENY = 'deny'  # Ban the user posting it.
+
+LinkDecision = namedtuple('LinkDecision', 'action url host')
+
+# A link: an optional scheme, a host name with at least two labels and an optional port and path.
+# Email addresses and names inside words are skipped.
+_LINK_RE = re.compile(r'(?<![\w.@-])(?:(https?)://)?((?:[a-z0-9](?:[a-z0-9-]*[a-z0-9])?\.)+[a-z][a-z0-9-]*[a-z0-9])'
+                      r'(?::\d{1,5})?(?:[/?#][^\s]*)?', re.I)
+# A dot between a host name character and a letter, messages without one have no links.
+_DOT_RE = re.compile(r'[a-z0-9-]\.[a-z]', re.I)
+
+
+class DomainTrie(object):
+    """
+    The actions of domains, in a trie of their labels from the top level domain down.
+
+    A domain's action also holds for its subdomains, unless a subdomain has an action of its own;
+    looking up a host takes one step per label. Nodes are dicts of labels to child nodes, with the
+    action of the node under the empty label; a domain without subdomains in the trie is stored as
+    just its action, so a long list of domains costs about one dict entry per domain.
+    """
+
+    def __init__(self):
+        self._root = {}
+        self.size = 0
+
+    def add(self, domain, action):
+        """
+        Set the action of a domain (and its subdomains).
+        :param domain: str the domain, e.g. example.com.
+        :param action: str the action.
+        """
+        labels = domain.strip('.').split('.')
+        node = self._root
+        for label in reversed(labels[1:]):
+            child = node.get(label)
+            if child is None:
+                child = node[label] = {}
+            elif type(child) is not dict:
+                child = node[label] = {'': child}
+            node = child
+
+        label = labels[0]
+        child = node.get(label)
+        if type(child) is dict:
+            if '' not in child:
+                self.size += 1
+            child[''] = action
+        else:
+            if child is None:
+                self.size += 1
+            node[label] = action
+
+    def lookup(self, host):
+        """
+        Find the action of a host.
+        :param host: str the host name, in lower case.
+        :return: str the action of the most specific domain of the host in the trie, or None.
+        """
+        action = None
+        node = self._root
+        for label in reversed(host.split('.')):
+            child = node.get(label)
+            if child is None:
+                break
+            if type(child) is not dict:
+                return child
+            node = child
+            action = node.get('', action)
+        return action
+
+
+class LinkPolicy(object):
+    """
+    The link policy of a file, loaded again when the file changes.
+
+    Each line of the file is a domain, optionally after its action (allow, ignore or deny); a domain on
+    its own is denied and lines starting with # are comments. Hosts not in the file are allowed.
+    The version of the file is checked at most every check_interval seconds.
+    """
+
+    def __init__(self, file_path, file_name, check_interval=1.0):
+        """
+        Initialize the policy, the file is read on first use.
+        :param file_path: str the path to the file.
+        :param file_name: str the name of the file.
+        :param check_interval: float the minimum amount of seconds between checks of the file version.
+        """
+        self.file_path = file_path
+        self.file_name = file_name
+        self.check_interval = check_interval
+
+        self._trie = DomainTrie()
+        self._version = None
+        self._checked = 0
+        self._stale = True
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        """ Read the file again on the next check. """
+        self._stale = True
+
+    def trie(self):
+        """
+        Get the domains, reading the file again if it changed.
+        :return: DomainTrie the domains and their actions.
+        """
+        now = time.time()
+        if not self._stale and now - self._checked < self.check_interval:
+            return self._trie
+
+        with self._lock:
+            self._checked = now
+            version = fh.file_version(self.file_path, self.file_name)
+            if self._stale or version != self._version:
+                self._stale = False
+                self._version = version
+                trie = DomainTrie()
+                for line in fh.file_reader(self.file_path, self.file_name) or ():
+                    parts = line.split()
+                    if not parts or parts[0].startswith('#'):
+                        continue
+                    if len(parts) == 1:
+                        trie.add(parts[0].lower(), DENY)
+                    elif parts[0] in (ALLOW, IGNORE, DENY):
+                        trie.add(parts[1].lower(), parts[0])
+                self._trie = trie
+            return self._trie
+
+    def check(self, msg, folded=None):
+        """
+        Decide what to do with the links in a message.
+        :param msg: str or unicode the message.
+        :param folded: unicode the message folded by matcher.fold, if it was.
+        :return: LinkDecision the decision: deny with the first denied link, else allow with the
+                 first allowed link having a scheme (the url to look up), else ignore.
+        """
+        if folded is None:
+            folded = matcher.fold(msg)
+        if _DOT_RE.search(folded) is None:
+            return LinkDecision(IGNORE, None, None)
+
+        trie = self.trie()
+        fetch = False
+        for match in _LINK_RE.finditer(folded):
+            host = match.group(2)
+            action = trie.lookup(host) or ALLOW
+            if action == DENY:
+                return LinkDecision(DENY, match.group(0), host)
+            if action == ALLOW and match.group(1):
+                fetch = True
+
+        if fetch:
+            # The folded message is in lower case, take the url as it was sent.
+            for match in _LINK_RE.finditer(msg):
+                host = match.group(2).lower()
+                if match.group(1) and (trie.lookup(host) or ALLOW) == ALLOW:
+                    return LinkDecision(ALLOW, match.group(0), host)
+        return LinkDecision(IGNORE, None, None)
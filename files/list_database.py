@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+
+""" Keeps the moderation lists (bad nicks, bad accounts, ...) in a SQLite database instead of text files. """
+
+import os
+import re
+import sqlite3
+import threading
+
+# How long (in seconds) to wait for another connection (or bot process) to finish writing.
+BUSY_TIMEOUT = 10
+
+
+class ListDatabase(object):
+    """
+    A SQLite database with a table per list, used by file_handler in place of the list files.
+
+    The database is in WAL mode, so several bot processes may share it; readers do not block
+    the writer and each change is a single statement on the indexed item column. Every table
+    has a version, raised by a trigger on each change, so the lists kept in memory can tell
+    when another process changed them.
+    """
+
+    def __init__(self, db_location, lists):
+        """
+        Open (or create) the database.
+        :param db_location: str the path to the database file (with extension).
+        :param lists: dict of the list file locations (path and file name) to table names.
+        """
+        self.db_location = db_location
+        self.tables = {}
+        for location, table in lists.iteritems():
+            if not re.match(r'^[a-z_]+$', table):
+                raise ValueError('Invalid table name: %s' % table)
+            self.tables[location] = table
+
+        self._local = threading.local()
+        self._setup()
+
+    def _connection(self):
+        """
+        Get the connection for the current thread, SQLite connections are not shared between threads.
+        :return: sqlite3.Connection the connection.
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_location, timeout=BUSY_TIMEOUT, isolation_level=None)
+            conn.text_factory = str
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _setup(self):
+        """ Create the tables, indexes and triggers if they do not exist yet. """
+        db_dir = os.path.dirname(self.db_location)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+
+        conn = self._connection()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute('CREATE TABLE IF NOT EXISTS list_versions '
+                         '(name TEXT PRIMARY KEY, version INTEGER NOT NULL DEFAULT 0, imported INTEGER NOT NULL DEFAULT 0)')
+            for table in set(self.tables.values()):
+                conn.execute('CREATE TABLE IF NOT EXISTS %s (id INTEGER PRIMARY KEY, item TEXT NOT NULL UNIQUE)' % table)
+                conn.execute('INSERT OR IGNORE INTO list_versions (name) VALUES (?)', (table, ))
+                for event in ('INSERT', 'DELETE'):
+                    conn.execute('CREATE TRIGGER IF NOT EXISTS %s_%s AFTER %s ON %s BEGIN '
+                                 'UPDATE list_versions SET version = version + 1 WHERE name = \'%s\'; END'
+                                 % (table, event.lower(), event, table, table))
+            conn.execute('COMMIT')
+        except sqlite3.Error:
+            conn.execute('ROLLBACK')
+            raise
+
+    def handles(self, file_path, file_name):
+        """
+        Check if a list file is kept in the database.
+        :param file_path: str the path to the file.
+        :param file_name: str the name of the file.
+        :return: bool True if the file is kept in the database.
+        """
+        return file_path + file_name in self.tables
+
+    def _table(self, file_path, file_name):
+        return self.tables[file_path + file_name]
+
+    def read(self, file_path, file_name):
+        """
+        Read the items of a list, in the order they were added.
+        :param file_path: str the path to the list file.
+        :param file_name: str the name of the list file.
+        :return: list of items.
+        """
+        cursor = self._connection().execute('SELECT item FROM %s ORDER BY id' % self._table(file_path, file_name))
+        return [row[0] for row in cursor]
+
+    def add(self, file_path, file_name, item):
+        """
+        Add an item to a list, an item is only kept once.
+        :param file_path: str the path to the list file.
+        :param file_name: str the name of the list file.
+        :param item: str the item to add.
+        :return: bool True if the item was added, False if it was in the list already.
+        """
+        cursor = self._connection().execute('INSERT OR IGNORE INTO %s (item) VALUES (?)'
+                                            % self._table(file_path, file_name), (item, ))
+        return cursor.rowcount > 0
+
+    def remove(self, file_path, file_name, item):
+        """
+        Remove an item from a list.
+        :param file_path: str the path to the list file.
+        :param file_name: str the name of the list file.
+        :param item: str the item to remove.
+        :return: bool True if the item was removed, False if it was not in the list.
+        """
+        cursor = self._connection().execute('DELETE FROM %s WHERE item = ?'
+                                            % self._table(file_path, file_name), (item, ))
+        return cursor.rowcount > 0
+
+    def clear(self, file_path, file_name):
+        """
+        Remove all the items from a list.
+        :param file_path: str the path to the list file.
+        :param file_name: str the name of the list file.
+        """
+        self._connection().execute('DELETE FROM %s' % self._table(file_path, file_name))
+
+    def version(self, file_path, file_name):
+        """
+        Get the version of a list, it changes whenever the list is changed (by any process).
+        :param file_path: str the path to the list file.
+        :param file_name: str the name of the list file.
+        :return: int the version.
+        """
+        row = self._connection().execute('SELECT version FROM list_versions WHERE name = ?',
+                                         (self._table(file_path, file_name), )).fetchone()
+        return row[0]
+
+    def import_files(self):
+        """
+        Import the items of the existing list files, once per list.
+
+        Lists that were imported before (by this or another process) are skipped, so this is safe
+        to call every time the bot starts; the files themselves are left as they are.
+        :return: dict of table names to the amount of items imported.
+        """
+        imported = {}
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            for location, table in self.tables.iteritems():
+                row = conn.execute('SELECT imported FROM list_versions WHERE name = ?', (table, )).fetchone()
+                if row[0]:
+                    continue
+
+                count = 0
+                if os.path.exists(location):
+                    with open(location, mode='r') as f:
+                        for line in f:
+                            line = line.rstrip('\n')
+                            if line.strip():
+                                count += conn.execute('INSERT OR IGNORE INTO %s (item) VALUES (?)' % table,
+                                                      (line, )).rowcount
+                conn.execute('UPDATE list_versions SET imported = 1 WHERE name = ?', (table, ))
+                imported[table] = count
+            conn.execute('COMMIT')
+        except (sqlite3.Error, IOError):
+            conn.execute('ROLLBACK')
+            raise
+        return imported
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+
+""" Keeps the lists stored in files (bad nicks, bad accounts, ...) in memory as sets. """
+
+import threading
+import time
+
+import file_handler as fh
+import matcher
+
+
+def normalize(item):
+    """
+    Get the form list items are compared in.
+    :param item: str the item.
+    :return: str the item without surrounding whitespace, in lower case.
+    """
+    return item.strip().lower()
+
+
+def fold(item):
+    """
+    Get the form list items are compared in, with look-alike letters and zero width characters folded.
+    :param item: str or unicode the item.
+    :return: unicode the item folded by matcher.fold, without surrounding whitespace.
+    """
+    return matcher.fold(item).strip()
+
+
+class ListStore(object):
+    """
+    A list of strings stored in a file, one per line, kept in memory as a set.
+
+    Membership is tested on the normalized form of the items, so it does not touch the disk
+    and ignores case; lists of names people may try to get around can fold look-alike letters too.
+    Changes are written through to the file (or the list database), and the list
+    is read again when it is changed by something else (checked at most every check_interval seconds).
+    """
+
+    def __init__(self, file_path, file_name, check_interval=1.0, fold_confusables=False):
+        """
+        Initialize the store and read the file.
+        :param file_path: str the path to the file.
+        :param file_name: str the name of the file.
+        :param check_interval: float the minimum amount of seconds between checks of the modification time.
+        :param fold_confusables: bool True to compare the items with look-alike letters folded (see fold),
+                                 never use this for lists granting privileges.
+        """
+        self.file_path = file_path
+        self.file_name = file_name
+        self.check_interval = check_interval
+        self._normalize = fold if fold_confusables else normalize
+
+        self._items = set()
+        # Normalized item to the item as it is written in the file.
+        self._normalized = {}
+        self._version = None
+        self._checked = 0
+        self._lock = threading.RLock()
+
+        self.reload()
+
+    def __len__(self):
+        self._refresh()
+        return len(self._items)
+
+    def __iter__(self):
+        self._refresh()
+        return iter(list(self._items))
+
+    def __contains__(self, item):
+        if not item:
+            return False
+        self._refresh()
+        return self._normalize(item) in self._normalized
+
+    def _refresh(self):
+        """ Read the file again if it was changed since it was last read. """
+        now = time.time()
+        if now - self._checked < self.check_interval:
+            return
+        self._checked = now
+        if fh.file_version(self.file_path, self.file_name) != self._version:
+            self.reload()
+
+    def reload(self):
+        """ Read the items from the file. """
+        with self._lock:
+            self._version = fh.file_version(self.file_path, self.file_name)
+            self._checked = time.time()
+            lines = fh.file_reader(self.file_path, self.file_name) or []
+
+            items = set()
+            normalized = {}
+            for line in lines:
+                if line.strip():
+                    items.add(line)
+                    normalized.setdefault(self._normalize(line), line)
+            self._items = items
+            self._normalized = normalized
+
+    def add(self, item):
+        """
+        Add an item and append it to the file.
+        :param item: str the item.
+        :return: bool True if the item was added, False if it was in the list already.
+        """
+        with self._lock:
+            self._refresh()
+            key = self._normalize(item)
+            if not key or key in self._normalized:
+                return False
+
+            fh.file_writer(self.file_path, self.file_name, item)
+            self._items.add(item)
+            self._normalized[key] = item
+            self._version = fh.file_version(self.file_path, self.file_name)
+            return True
+
+    def remove(self, item):
+        """
+        Remove an item and remove it from the file.
+        :param item: str the item, compared in normalized form.
+        :return: bool True if the item was removed, False if it was not in the list.
+        """
+        with self._lock:
+            self._refresh()
+            stored = self._normalized.pop(self._normalize(item), None)
+            if stored is None:
+                return False
+
+            self._items.discard(stored)
+            fh.remove_from_file(self.file_path, self.file_name, stored)
+            self._version = fh.file_version(self.file_path, self.file_name)
+            return True
+
+    def clear(self):
+        """ Remove all the items, emptying the file. """
+        with self._lock:
+            fh.delete_file_content(self.file_path, self.file_name)
+            self._items = set()
+            self._normalized = {}
+            self._version = fh.file_version(self.file_path, self.file_name)
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+
+""" Folds text for matching, and matches text against many strings at once, for the bad strings list. """
+
+import re
+import threading
+import time
+import unicodedata
+from collections import deque
+
+import file_handler as fh
+
+# Characters without width, used to break up words without it showing.
+ZERO_WIDTH = u'\u00ad\u034f\u180e\u200b\u200c\u200d\u200e\u200f\u2060\u2061\u2062\u2063\u2064\ufeff'
+
+# Letters looking like latin letters (after NFKC), to the latin letters. Digits and latin letters are left
+# alone, so the folding never makes two plain ascii texts the same.
+CONFUSABLES = {
+    # Cyrillic.
+    u'\u0430': u'a', u'\u0410': u'a', u'\u0432': u'b', u'\u0412': u'b', u'\u0441': u'c', u'\u0421': u'c',
+    u'\u0501': u'd', u'\u0435': u'e', u'\u0415': u'e', u'\u0451': u'e', u'\u0401': u'e', u'\u04bb': u'h',
+    u'\u041d': u'h', u'\u0456': u'i', u'\u0406': u'i', u'\u0457': u'i', u'\u0458': u'j', u'\u0408': u'j',
+    u'\u043a': u'k', u'\u041a': u'k', u'\u04cf': u'l', u'\u041c': u'm', u'\u043e': u'o', u'\u041e': u'o',
+    u'\u0440': u'p', u'\u0420': u'p', u'\u051b': u'q', u'\u0455': u's', u'\u0405': u's', u'\u0422': u't',
+    u'\u0443': u'y', u'\u0423': u'y', u'\u051d': u'w', u'\u0445': u'x', u'\u0425': u'x', u'\u044c': u'b',
+    # Greek.
+    u'\u03b1': u'a', u'\u0391': u'a', u'\u0392': u'b', u'\u03b5': u'e', u'\u0395': u'e', u'\u0397': u'h',
+    u'\u03b9': u'i', u'\u0399': u'i', u'\u039a': u'k', u'\u03ba': u'k', u'\u039c': u'm', u'\u039d': u'n',
+    u'\u03bd': u'v', u'\u03bf': u'o', u'\u039f': u'o', u'\u03c1': u'p', u'\u03a1': u'p', u'\u03a4': u't',
+    u'\u03c4': u't', u'\u03c5': u'u', u'\u03a5': u'y', u'\u03c7': u'x', u'\u03a7': u'x', u'\u0396': u'z',
+    # Latin.
+    u'\u0131': u'i', u'\u0237': u'j', u'\u0261': u'g', u'\u01c3': u'!', u'\u0251': u'a',
+}
+
+# The translation table of the folding, built once: look-alikes to latin letters, zero width characters removed.
+_FOLD_TABLE = dict((ord(char), latin) for char, latin in CONFUSABLES.iteritems())
+_FOLD_TABLE.update((ord(char), None) for char in ZERO_WIDTH)
+
+_NON_ASCII_RE = re.compile(u'[^\x00-\x7f]')
+
+
+def fold(text):
+    """
+    Fold text for matching: NFKC normalized (so full width and styled letters become plain letters),
+    look-alike letters replaced by latin letters, zero width characters removed and case folded.
+    Plain ascii text is only case folded.
+    :param text: str or unicode the text, byte strings are taken to be utf-8.
+    :return: unicode the folded text.
+    """
+    if type(text) is str:
+        text = text.decode('utf-8', 'replace')
+    if _NON_ASCII_RE.search(text) is None:
+        return text.lower()
+    return unicodedata.normalize('NFKC', text).translate(_FOLD_TABLE).lower()
+
+
+class StringMatcher(object):
+    """
+    An Aho-Corasick automaton over case folded strings.
+
+    A message is scanned once, however many strings there are. A string only matches as a whole
+    word or phrase; it may not start or end in the middle of a word, so 'ass' does not match 'class'.
+    """
+
+    def __init__(self, strings):
+        """
+        Compile the strings.
+        :param strings: iterable of the str or unicode strings to match.
+        """
+        self.strings = []
+        # Per state: the transitions, the failure state, and the indexes of the strings ending there.
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [()]
+
+        for string in strings:
+            folded = fold(string).strip()
+            if not folded:
+                continue
+            state = 0
+            for char in folded:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(())
+                state = next_state
+            self._output[state] += (len(self.strings), )
+            self.strings.append(folded)
+
+        # Breadth first, so the failure state of a state is always done before the state itself.
+        queue = deque(self._goto[0].itervalues())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].iteritems():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(char, 0)
+                self._fail[next_state] = fail
+                self._output[next_state] += self._output[fail]
+
+    def __len__(self):
+        return len(self.strings)
+
+    def finditer(self, text, folded=None):
+        """
+        Find the strings in a text.
+        :param text: str or unicode the text to search.
+        :param folded: unicode the text already folded, if it was.
+        :return: generator of (start, string) tuples, in the order the strings end in the (folded) text.
+        """
+        text = fold(text) if folded is None else folded
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        state = 0
+        for end, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for index in output[state]:
+                string = self.strings[index]
+                start = end - len(string) + 1
+                if string[0].isalnum() and start > 0 and text[start - 1].isalnum():
+                    continue
+                if string[-1].isalnum() and end + 1 < len(text) and text[end + 1].isalnum():
+                    continue
+                yield start, string
+
+    def search(self, text, folded=None):
+        """
+        Find the first string in a text.
+        :param text: str or unicode the text to search.
+        :param folded: unicode the text already folded, if it was.
+        :return: unicode the first (folded) string found, or None.
+        """
+        for start, string in self.finditer(text, folded):
+            return string
+        return None
+
+
+class FileMatcher(object):
+    """
+    A StringMatcher over the lines of a file (or list in the list database), compiled again when it changes.
+
+    The version of the file is checked at most every check_interval seconds;
+    call invalidate() after changing the file to have the change picked up right away.
+    """
+
+    def __init__(self, file_path, file_name, check_interval=1.0):
+        """
+        Initialize the matcher, the file is read on first use.
+        :param file_path: str the path to the file.
+        :param file_name: str the name of the file.
+        :param check_interval: float the minimum amount of seconds between checks of the file version.
+        """
+        self.file_path = file_path
+        self.file_name = file_name
+        self.check_interval = check_interval
+        self.builds = 0
+
+        self._matcher = StringMatcher(())
+        self._version = None
+        self._checked = 0
+        self._stale = True
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        """ Read the file again on the next match. """
+        self._stale = True
+
+    def matcher(self):
+        """
+        Get the compiled matcher, reading and compiling the file again if it changed.
+        :return: StringMatcher the matcher.
+        """
+        now = time.time()
+        if not self._stale and now - self._checked < self.check_interval:
+            return self._matcher
+
+        with self._lock:
+            self._checked = now
+            version = fh.file_version(self.file_path, self.file_name)
+
+            if self._stale or version != self._version:
+                self._stale = False
+                self._version = version
+                strings = fh.file_reader(self.file_path, self.file_name) or ()
+                self._matcher = StringMatcher(strings)
+                self.builds += 1
+            return self._matcher
+
+    def search(self, text, folded=None):
+        """
+        Find the first string of the file in a text.
+        :param text: str or unicode the text to search.
+        :param folded: unicode the text already folded, if it was.
+        :return: unicode the first (folded) string found, or None.
+        """
+        return self.matcher().search(text, folded)
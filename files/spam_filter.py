@@ -0,0 +1,545 @@
+# -*- coding: utf-8 -*-
+
+""" Checks chat messages for spam: against the spam rules given in the configuration, for floods and for duplicates. """
+
+import itertools
+import logging
+import math
+import os
+import re
+import threading
+import time
+import unicodedata
+from array import array
+from collections import namedtuple, OrderedDict
+
+import file_handler as fh
+import matcher
+
+log = logging.getLogger(__name__)
+
+# The types of rules.
+RULE_SUBSTRINGS = 'substrings'
+RULE_REGEX = 'regex'
+RULE_LINK = 'link'
+RULE_UNICODE_CATEGORY = 'unicode_category'
+
+# What to do with the sender of a message matching a rule.
+ACTION_BAN = 'ban'
+ACTION_KICK = 'kick'  # Ban and forgive straight away.
+
+# The reasons a user is flooding.
+FLOOD_RATE = 'rate'
+FLOOD_BURST = 'burst'
+FLOOD_REPEAT = 'repeat'
+
+# The amount of hashes in the sketch of a message, for the duplicate checks.
+SKETCH_SIZE = 16
+
+SpamRule = namedtuple('SpamRule', 'name type action option')
+SpamHit = namedtuple('SpamHit', 'rule text')
+
+
+_NON_WORD_RE = re.compile(r'[\W_]+', re.U)
+
+
+def normalize(folded):
+    """
+    Get the form messages are compared in for duplicates.
+    :param folded: unicode the message, folded by matcher.fold().
+    :return: unicode the message with anything but letters and digits as single spaces.
+    """
+    return _NON_WORD_RE.sub(u' ', folded).strip()
+
+
+def sketch(text, size=16, shingle_size=4):
+    """
+    Get the MinHash (bottom k) sketch of a text: the smallest hashes of its overlapping pieces.
+    :param text: unicode the (normalized) text.
+    :param size: int the amount of hashes in the sketch.
+    :param shingle_size: int the length of the overlapping pieces of text which are hashed.
+    :return: frozenset of the hashes.
+    """
+    shingles = set([text[i:i + shingle_size] for i in xrange(max(len(text) - shingle_size + 1, 1))])
+    return frozenset(sorted(map(hash, shingles))[:size])
+
+
+def similarity(sketch_a, sketch_b, size=16):
+    """
+    Estimate the similarity of two texts from their sketches.
+    :param sketch_a: frozenset the sketch of the first text.
+    :param sketch_b: frozenset the sketch of the second text.
+    :param size: int the amount of hashes in a sketch.
+    :return: float the estimated share of pieces the texts have in common, from 0 to 1.
+    """
+    common = sketch_a & sketch_b
+    if not common:
+        return 0.0
+    # The smallest hashes of both texts together are a sample of all their pieces;
+    # count how many of those the texts have in common.
+    smallest = sorted(sketch_a | sketch_b)[:size]
+    return sum(1 for value in smallest if value in common) / float(len(smallest))
+
+
+class SpamRules(object):
+    """
+    A set of spam rules, compiled into a combined pattern.
+
+    The substrings and links of all the rules are alternatives of one pattern, matched against the
+    folded message (see matcher.fold) and only tried at the characters they can start with; the regexes
+    of all the rules are alternatives of a second pattern, also matched against the folded message. Each is one scan of the message, stopping at the first hit.
+    Rules with an option are left out while their option is off; the patterns of every combination of
+    options are compiled up front, so rules which do not compile are rejected before any message is checked.
+    """
+
+    def __init__(self, rules):
+        """
+        Compile the rules.
+        :param rules: list of dict rules, each with a 'name' and 'type' and optionally an 'action'
+                      ('ban' or 'kick') and 'option' (the configuration option enabling the rule), and:
+                      'strings' for a substrings rule, 'pattern' for a regex rule, 'domains' for a link rule
+                      and 'categories' with 'max_count' for a unicode category rule.
+        :raises ValueError: if a rule is invalid.
+        """
+        self.rules = []
+        self.options = []
+
+        # Per rule: the alternative in a combined pattern and the characters it can start with,
+        # or the categories and maximum count.
+        self._literals = []
+        self._regexes = []
+        self._categories = []
+
+        for rule in rules:
+            name = rule.get('name')
+            rule_type = rule.get('type')
+            action = rule.get('action', ACTION_BAN)
+            option = rule.get('option')
+            if not name:
+                raise ValueError('Spam rule without a name: %r' % rule)
+            if action not in (ACTION_BAN, ACTION_KICK):
+                raise ValueError('Spam rule %s has an unknown action: %s' % (name, action))
+
+            index = len(self.rules)
+            self.rules.append(SpamRule(name, rule_type, action, option))
+            if option is not None and option not in self.options:
+                self.options.append(option)
+
+            if rule_type == RULE_SUBSTRINGS:
+                strings = sorted(set(matcher.fold(string) for string in rule['strings'] if string), key=len,
+                                 reverse=True)
+                if not strings:
+                    raise ValueError('Spam rule %s has no strings.' % name)
+                pattern = '|'.join(re.escape(string) for string in strings)
+                self._literals.append((index, '(?P<r%d>%s)' % (index, pattern), set(s[0] for s in strings)))
+            elif rule_type == RULE_LINK:
+                # A link to a room (or page) on one of the domains, ending the word.
+                domains = [matcher.fold(domain) for domain in rule['domains'] if domain]
+                if not domains:
+                    raise ValueError('Spam rule %s has no domains.' % name)
+                pattern = r'(?:%s)/+(?P<p%d>\w+)(?=$|\s|/+(?:\s|$))' \
+                          % ('|'.join(re.escape(domain) for domain in domains), index)
+                self._literals.append((index, '(?P<r%d>%s)' % (index, pattern), set(d[0] for d in domains)))
+            elif rule_type == RULE_REGEX:
+                pattern = rule['pattern']
+                try:
+                    re.compile(pattern)
+                except re.error as e:
+                    raise ValueError('Spam rule %s has an invalid pattern: %s' % (name, e))
+                self._regexes.append((index, '(?P<r%d>%s)' % (index, pattern), None))
+            elif rule_type == RULE_UNICODE_CATEGORY:
+                self._categories.append((index, frozenset(rule['categories']), rule['max_count']))
+            else:
+                raise ValueError('Spam rule %s has an unknown type: %s' % (name, rule_type))
+
+        # The combined patterns per combination of options, keyed by the tuple of the option values.
+        self._compiled = {}
+        for key in itertools.product((False, True), repeat=len(self.options)):
+            try:
+                self._compiled[key] = self._compile(dict(zip(self.options, key)))
+            except re.error as e:
+                raise ValueError('Spam rules do not compile together: %s' % e)
+
+    def _enabled(self, index, options):
+        option = self.rules[index].option
+        return option is None or bool(options.get(option))
+
+    def _compile(self, options):
+        """
+        Compile the combined patterns of the rules enabled by the options.
+        :param options: dict the configuration.
+        :return: tuple of the compiled literal and regex patterns, either is None if it has no rules enabled.
+        """
+        literals = [(pattern, chars) for index, pattern, chars in self._literals if self._enabled(index, options)]
+        literal = None
+        if literals:
+            first = set()
+            for pattern, chars in literals:
+                first |= chars
+            literal = re.compile('(?=[%s])(?:%s)' % (''.join(re.escape(char) for char in sorted(first)),
+                                                    '|'.join(pattern for pattern, chars in literals)), re.U)
+
+        # Patterns may not use numbered groups, the groups are numbered over the combined pattern.
+        regexes = [pattern for index, pattern, _ in self._regexes if self._enabled(index, options)]
+        regex = None
+        if regexes:
+            regex = re.compile('|'.join(regexes), re.I | re.U)
+        return literal, regex
+
+    def _patterns(self, options):
+        """
+        Get the combined patterns of the rules enabled by the options.
+        :param options: dict the configuration.
+        :return: tuple of the compiled literal and regex patterns, either is None if it has no rules enabled.
+        """
+        return self._compiled[tuple([bool(options.get(option)) for option in self.options])]
+
+    def check(self, msg, room, options, folded=None):
+        """
+        Find the first rule a message breaks.
+        :param msg: str or unicode the message, byte strings are taken to be utf-8.
+        :param room: str the name of the room, links to the room itself are allowed.
+        :param options: dict the configuration, rules with an option are skipped unless it is true.
+        :param folded: unicode the message already folded, if it was.
+        :return: SpamHit the rule and the (folded) text matching it, or None.
+        """
+        if type(msg) is str:
+            msg = msg.decode('utf-8', 'replace')
+        if folded is None:
+            folded = matcher.fold(msg)
+
+        literal, regex = self._patterns(options)
+        if literal is not None:
+            for match in literal.finditer(folded):
+                index = int(match.lastgroup[1:])
+                rule = self.rules[index]
+                start = match.start()
+                if rule.type == RULE_LINK:
+                    # Links to this room, or to look alike domains, are no spam.
+                    if start > 0 and (folded[start - 1].isalnum() or folded[start - 1] in '_-'):
+                        continue
+                    if match.group('p%d' % index) == room.lower():
+                        continue
+                return SpamHit(rule, match.group(0))
+
+        if regex is not None:
+            match = regex.search(folded)
+            if match is not None:
+                return SpamHit(self.rules[int(match.lastgroup[1:])], match.group(0))
+
+        if self._categories:
+            counts = {}
+            for category in map(unicodedata.category, msg):
+                counts[category] = counts.get(category, 0) + 1
+            for index, categories, max_count in self._categories:
+                if self._enabled(index, options):
+                    count = sum(counts.get(category, 0) for category in categories)
+                    if count > max_count:
+                        return SpamHit(self.rules[index], str(count))
+
+        return None
+
+
+class SpamFilter(object):
+    """
+    The spam rules of a configuration file, compiled again when the file changes.
+
+    The modification time of the file is checked at most every check_interval seconds; if the new
+    rules are invalid the error is logged and the previous rules are kept.
+    """
+
+    def __init__(self, config_location, check_interval=1.0):
+        """
+        Initialize the filter and compile the rules.
+        :param config_location: str the path to the configuration file (with extension).
+        :param check_interval: float the minimum amount of seconds between checks of the modification time.
+        """
+        self.config_location = config_location
+        self.check_interval = check_interval
+
+        self.hits = {}
+        self.checks = 0
+        self.check_time = 0.0
+
+        self._rules = SpamRules(())
+        self._mtime = None
+        self._checked = 0
+        self._lock = threading.Lock()
+
+        self.reload()
+
+    def reload(self):
+        """
+        Read and compile the rules from the configuration file.
+        :return: bool True if the rules were compiled, False if they were invalid.
+        """
+        with self._lock:
+            self._checked = time.time()
+            try:
+                self._mtime = os.path.getmtime(self.config_location)
+            except OSError:
+                self._mtime = None
+
+            config = fh.configuration_loader(self.config_location) or {}
+            try:
+                self._rules = SpamRules(config.get('spam_rules') or ())
+            except (ValueError, KeyError, TypeError, re.error) as e:
+                log.error('Spam rules not loaded: %s' % e)
+                return False
+            return True
+
+    def rules(self):
+        """
+        Get the compiled rules, compiling them again if the configuration file changed.
+        :return: SpamRules the rules.
+        """
+        now = time.time()
+        if now - self._checked >= self.check_interval:
+            self._checked = now
+            try:
+                mtime = os.path.getmtime(self.config_location)
+            except OSError:
+                mtime = None
+            if mtime != self._mtime:
+                self.reload()
+        return self._rules
+
+    def check(self, msg, room, options, folded=None):
+        """
+        Find the first rule a message breaks, counting the hits and the time taken.
+        :param msg: unicode the message.
+        :param room: str the name of the room, links to the room itself are allowed.
+        :param options: dict the configuration, rules with an option are skipped unless it is true.
+        :param folded: unicode the message already folded, if it was.
+        :return: SpamHit the rule and the (folded) text matching it, or None.
+        """
+        start = time.time()
+        hit = self.rules().check(msg, room, options, folded)
+        elapsed = time.time() - start
+
+        with self._lock:
+            self.checks += 1
+            self.check_time += elapsed
+            if hit is not None:
+                self.hits[hit.rule.name] = self.hits.get(hit.rule.name, 0) + 1
+        return hit
+
+    def stats(self):
+        """
+        Get the hit counts of the rules and the time taken checking messages.
+        :return: dict the hits per rule name, the amount of checks and the total and average seconds.
+        """
+        with self._lock:
+            return {
+                'hits': dict(self.hits),
+                'checks': self.checks,
+                'seconds': self.check_time,
+                'average': self.check_time / self.checks if self.checks else 0.0
+            }
+
+
+class FloodHistory(object):
+    """ The receive times and text hashes of the last messages of a user, in ring buffers. """
+    __slots__ = ('times', 'hashes', 'index', 'count', 'repeats')
+
+    def __init__(self, size):
+        self.times = array('d', [0.0]) * size
+        self.hashes = array('l', [0]) * size
+        self.index = 0
+        self.count = 0
+        self.repeats = 0
+
+
+class FloodDetector(object):
+    """
+    Detects users sending too many messages, or the same message too many times.
+
+    The last messages of a user are kept in a FloodHistory of fixed size, so a check takes
+    the same time however many messages a user sends, and the memory used per user is bounded.
+    """
+
+    def __init__(self, rate, rate_seconds, burst, burst_seconds, repeats):
+        """
+        Initialize the detector, a threshold of 0 turns the check off.
+        :param rate: int the amount of messages allowed within rate_seconds.
+        :param rate_seconds: float the time span of the rate.
+        :param burst: int the amount of messages allowed within burst_seconds, a shorter time span.
+        :param burst_seconds: float the time span of the burst.
+        :param repeats: int the amount of times in a row the same message is allowed.
+        """
+        self.rate = rate
+        self.rate_seconds = rate_seconds
+        self.burst = burst
+        self.burst_seconds = burst_seconds
+        self.repeats = repeats
+        self.size = max(rate, burst, 1) + 1
+
+    def check(self, history, msg, received):
+        """
+        Add a message to the history of a user and check it.
+        :param history: FloodHistory the history of the user, or None for a new one.
+        :param msg: str or unicode the message.
+        :param received: float the time the message was received.
+        :return: tuple of the (new) FloodHistory and the flood reason, or None if the user is not flooding.
+        """
+        size = self.size
+        if history is None or len(history.times) != size:
+            history = FloodHistory(size)
+
+        index = history.index
+        msg_hash = hash(msg)
+        if history.count and history.hashes[index - 1] == msg_hash:
+            history.repeats += 1
+        else:
+            history.repeats = 1
+
+        history.times[index] = received
+        history.hashes[index] = msg_hash
+        history.index = (index + 1) % size
+        if history.count < size:
+            history.count += 1
+
+        # With n messages allowed, n + 1 messages within the time span is a flood;
+        # the first of those is n places back in the ring.
+        if self.burst and history.count > self.burst \
+                and received - history.times[index - self.burst] < self.burst_seconds:
+            return history, FLOOD_BURST
+        if self.rate and history.count > self.rate \
+                and received - history.times[index - self.rate] < self.rate_seconds:
+            return history, FLOOD_RATE
+        if self.repeats and history.repeats > self.repeats:
+            return history, FLOOD_REPEAT
+        return history, None
+
+
+class DuplicateCluster(object):
+    """ Nearly the same messages: the sketch of the first of them and the users who sent them. """
+    __slots__ = ('id', 'sketch', 'last', 'senders', 'spam')
+
+    def __init__(self, cluster_id, msg_sketch):
+        self.id = cluster_id
+        self.sketch = msg_sketch
+        self.last = 0.0
+        # The nicks of the senders to the time of their last message, oldest first.
+        self.senders = OrderedDict()
+        # Set once the messages were sent by enough users.
+        self.spam = False
+
+
+class DuplicateDetector(object):
+    """
+    Detects the same (or nearly the same) message being sent by several users within a time window.
+
+    Nearly the same messages are kept together in a DuplicateCluster, compared by the sketch of the
+    first of them; the clusters are indexed by the hashes in that sketch. Nearly the same messages have
+    most of their hashes in common, so a message is only compared to the clusters sharing one of its least
+    common few hashes, at most max_candidates of them, and the first cluster it is nearly the same as is
+    taken. A wave of duplicates is a single cluster, so checking a message takes about the same time
+    however many duplicates were sent.
+    """
+
+    def __init__(self, senders, window, min_length=20, min_similarity=0.7, max_messages=2000, max_candidates=32):
+        """
+        Initialize the detector.
+        :param senders: int the amount of different users sending a message which makes it spam.
+        :param window: float the amount of seconds messages are remembered.
+        :param min_length: int the minimum length of (normalized) messages to check, shorter messages are common.
+        :param min_similarity: float the similarity (from 0 to 1) from which messages are nearly the same.
+        :param max_messages: int the maximum amount of different messages (clusters) to remember.
+        :param max_candidates: int the maximum amount of clusters a message is compared to.
+        """
+        self.senders = senders
+        self.window = window
+        self.min_length = min_length
+        self.min_similarity = min_similarity
+        self.max_messages = max_messages
+        self.max_candidates = max_candidates
+
+        # Nearly the same messages have at least this many hashes of their sketches in common,
+        # so they share at least one of any SKETCH_SIZE - _min_common + 1 hashes.
+        self._min_common = max(int(math.ceil(SKETCH_SIZE * min_similarity)), 1)
+        # The clusters by id, the one with the oldest last message first.
+        self._clusters = OrderedDict()
+        # The hashes of the cluster sketches to dicts of the clusters by id.
+        self._index = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def _remove(self, cluster):
+        del self._clusters[cluster.id]
+        for value in cluster.sketch:
+            bucket = self._index[value]
+            del bucket[cluster.id]
+            if not bucket:
+                del self._index[value]
+
+    def _expire(self, now):
+        clusters = self._clusters
+        while clusters:
+            cluster = next(clusters.itervalues())
+            if now - cluster.last <= self.window and len(clusters) < self.max_messages:
+                break
+            self._remove(cluster)
+
+    def _find(self, msg_sketch):
+        """
+        Find the cluster of the messages nearly the same as a message.
+        :param msg_sketch: frozenset the sketch of the message.
+        :return: DuplicateCluster the cluster, or None.
+        """
+        buckets = sorted([self._index.get(value, {}) for value in msg_sketch], key=len)
+        compared = set()
+        for bucket in buckets[:SKETCH_SIZE - self._min_common + 1]:
+            for cluster_id, cluster in bucket.iteritems():
+                if cluster_id in compared:
+                    continue
+                if len(msg_sketch & cluster.sketch) >= self._min_common and \
+                        similarity(msg_sketch, cluster.sketch, SKETCH_SIZE) >= self.min_similarity:
+                    return cluster
+                compared.add(cluster_id)
+                if len(compared) >= self.max_candidates:
+                    return None
+        return None
+
+    def check(self, msg, sender, received, folded=None):
+        """
+        Add a message and find the users sending duplicates of it.
+        :param msg: str or unicode the message.
+        :param sender: str the nick of the user sending the message.
+        :param received: float the time the message was received.
+        :param folded: unicode the message already folded, if it was.
+        :return: list of the nicks of the users who sent the duplicates within the window once there are
+                 enough of them, after that of each next sender; else an empty list.
+        """
+        text = normalize(matcher.fold(msg) if folded is None else folded)
+        if len(text) < self.min_length:
+            return []
+
+        msg_sketch = sketch(text, SKETCH_SIZE)
+
+        with self._lock:
+            self._expire(received)
+
+            cluster = self._find(msg_sketch)
+            if cluster is None:
+                cluster = DuplicateCluster(self._next_id, msg_sketch)
+                self._next_id += 1
+                for value in msg_sketch:
+                    self._index.setdefault(value, {})[cluster.id] = cluster
+            else:
+                del self._clusters[cluster.id]
+            self._clusters[cluster.id] = cluster
+            cluster.last = received
+
+            senders = cluster.senders
+            senders.pop(sender, None)
+            senders[sender] = received
+            while received - next(senders.itervalues()) > self.window:
+                senders.popitem(last=False)
+
+            if len(senders) < self.senders:
+                return []
+            if cluster.spam:
+                return [sender]
+            cluster.spam = True
+            return list(senders)
@@ -15,11 +15,15 @@ import re
 import random
 import threading
 import logging
+import time
+from collections import namedtuple
+from functools import partial
 
 # Standard imports
 import pinylib
 import update
 from api import auto_url, soundcloud, youtube, lastfm, privacy_settings, other_apis
+from files import matcher, list_store, list_database, spam_filter, link_policy
 
 # Information variables
 author = '*TechWhizZ199* (https://github.com/TechWhizZ199/ )' + \
@@ -67,6 +71,16 @@ if CONFIG['ascii_chars']:
         print('No ', CONFIG['ascii_file'], ' was not found at: ', CONFIG['path'])
         print('As a result, ASCII was not loaded. Please check your settings.\n')
 
+# Keeps the moderation lists in a SQLite database instead of the text files, if a database is set.
+if CONFIG['moderation_database']:
+    moderation_lists = {}
+    for list_name in ('badnicks', 'badstrings', 'badaccounts', 'botteraccounts', 'autoforgive'):
+        moderation_lists[CONFIG['path'] + CONFIG[list_name]] = list_name
+    moderation_database = list_database.ListDatabase(CONFIG['moderation_database'], moderation_lists)
+    # The text files are imported once, the first time the database is used.
+    moderation_database.import_files()
+    pinylib.fh.use_database(moderation_database)
+
 
 # Any special unicode character used within the bot is stored in this dictionary
 special_unicode = {             # Assigned to:
@@ -89,6 +103,30 @@ special_unicode = {             # Assigned to:
                                 #   This avoids [two letter bold] parsing errors in the client.
 }
 
+# User roles, as bit flags (kept in RoomUser.roles).
+ROLE_OWNER = pinylib.ROLE_OWNER
+ROLE_SUPER = pinylib.ROLE_SUPER
+ROLE_MOD = pinylib.ROLE_MOD
+ROLE_POWER = pinylib.ROLE_POWER
+
+# Command privileges; the roles which are allowed to use a command (none are required for public commands).
+PRIVILEGE_PUBLIC = 0
+PRIVILEGE_SUPER = ROLE_SUPER
+PRIVILEGE_OWNER = ROLE_OWNER | ROLE_SUPER
+PRIVILEGE_MOD = PRIVILEGE_OWNER | ROLE_MOD
+PRIVILEGE_POWER = PRIVILEGE_MOD | ROLE_POWER
+# The roles which have to give the key to use the owner's private message commands. Such commands are
+# registered at PRIVILEGE_POWER, so these roles get to the handler, which asks them for the key.
+PRIVILEGE_KEY = ROLE_MOD | ROLE_POWER
+
+# The arguments a command handler is called with.
+ARGS_NONE = 0  # No arguments.
+ARGS_TEXT = 1  # The text following the command.
+ARGS_PARTS = 2  # The whole message split on spaces.
+
+# A command registry entry.
+BotCommand = namedtuple('BotCommand', 'handler privilege threaded args ascii_fallback')
+
 
 # External commands procedures
 def eightball():
@@ -110,6 +148,85 @@ def eightball():
     return random.choice(answers)
 
 
+def ascii_key(cmd):
+    """
+    Get the key a command is looked up with in the ASCII dictionary.
+    :param cmd: str the command.
+    :return: str the ASCII dictionary key or None.
+    """
+    if '!' in cmd:
+        parts = cmd.split('!')
+        if len(parts) > 1:
+            return parts[1]
+    return None
+
+
+class CommandRegistry:
+    """
+    Maps the full (prefixed) command names to the methods handling them.
+    Keeps the invocation count and the total handling time of every command.
+    """
+    def __init__(self, prefix):
+        """
+        Initialize the registry.
+        :param prefix: str the command prefix.
+        """
+        self.prefix = prefix
+        self.commands = {}
+        self.invocations = {}
+        self.timings = {}
+        self._lock = threading.Lock()
+
+    def add(self, name, handler, privilege=PRIVILEGE_PUBLIC, threaded=False, args=ARGS_TEXT):
+        """
+        Register (or override) a command.
+        :param name: str the command name without the prefix.
+        :param handler: callable handling the command.
+        :param privilege: int the roles allowed to use the command, PRIVILEGE_PUBLIC for anyone.
+        :param threaded: bool True if the command should run in its own thread.
+        :param args: int ARGS_NONE, ARGS_TEXT or ARGS_PARTS; what the handler is called with.
+        """
+        cmd = self.prefix + name
+        # An ASCII message with the same key takes precedence over the command.
+        ascii_fallback = bool(CONFIG['ascii_chars'] and ascii_key(cmd) in ascii_dict)
+        self.commands[cmd] = BotCommand(handler, privilege, threaded, args, ascii_fallback)
+        self.invocations.setdefault(cmd, 0)
+        self.timings.setdefault(cmd, 0.0)
+
+    def lookup(self, cmd):
+        """
+        Find a command.
+        :param cmd: str the full command, including the prefix.
+        :return: BotCommand or None if there is no such command.
+        """
+        return self.commands.get(cmd)
+
+    def invoke(self, cmd, command, args):
+        """
+        Run a command handler and record the time it took.
+        :param cmd: str the full command, including the prefix.
+        :param command: BotCommand the command.
+        :param args: tuple the arguments for the handler.
+        """
+        start = time.time()
+        try:
+            command.handler(*args)
+        finally:
+            elapsed = time.time() - start
+            with self._lock:
+                self.invocations[cmd] += 1
+                self.timings[cmd] += elapsed
+
+    def stats(self):
+        """
+        Get the invocation count and timings of every command which has been used.
+        :return: dict command to a (invocations, total seconds, average seconds) tuple.
+        """
+        with self._lock:
+            return dict((cmd, (count, self.timings[cmd], self.timings[cmd] / count))
+                        for cmd, count in self.invocations.iteritems() if count)
+
+
 class TinychatBot(pinylib.TinychatRTMPClient):
     """ Overrides event methods in TinychatRTMPClient that the client should to react to. """
 
@@ -117,19 +234,6 @@ class TinychatBot(pinylib.TinychatRTMPClient):
     init_time = pinylib.time.time()
     key = CONFIG['key']
 
-    # - Privilege settings:
-    botters = []  # Botters will only be temporarily stored until the next bot restart.
-
-    # - Loads/creates permanent botter accounts:
-    if not os.path.exists(CONFIG['path'] + CONFIG['botteraccounts']):
-        open(CONFIG['path'] + CONFIG['botteraccounts'], mode='w')
-    botteraccounts = pinylib.fh.file_reader(CONFIG['path'], CONFIG['botteraccounts'])
-
-    # - Loads/creates autoforgive files:
-    if not os.path.exists(CONFIG['path'] + CONFIG['autoforgive']):
-        open(CONFIG['path'] + CONFIG['autoforgive'], mode='w')
-    autoforgive = pinylib.fh.file_reader(CONFIG['path'], CONFIG['autoforgive'])
-
     # - Media events/variables settings:
     yt_type = 'youTube'
     sc_type = 'soundCloud'
@@ -160,7 +264,234 @@ class TinychatBot(pinylib.TinychatRTMPClient):
     forgive_all = False
     syncing = False
     pmming_all = False
-    snap_line = 'I just took a video snapshot of this chatroom. Check it out here:'
+
+    def __init__(self, *args, **kwargs):
+        pinylib.TinychatRTMPClient.__init__(self, *args, **kwargs)
+
+        # - Privilege settings:
+        # Botters will only be temporarily stored until the next bot restart.
+        self.botters = set()
+        # Permanent botter accounts and autoforgive accounts.
+        self.botteraccounts = list_store.ListStore(CONFIG['path'], CONFIG['botteraccounts'])
+        self.autoforgive = list_store.ListStore(CONFIG['path'], CONFIG['autoforgive'])
+
+        # - Moderation lists:
+        self.bad_nicks = list_store.ListStore(CONFIG['path'], CONFIG['badnicks'], fold_confusables=True)
+        self.bad_accounts = list_store.ListStore(CONFIG['path'], CONFIG['badaccounts'], fold_confusables=True)
+        self.bad_strings = matcher.FileMatcher(CONFIG['path'], CONFIG['badstrings'])
+        self.spam_filter = spam_filter.SpamFilter(CONFIG_PATH)
+        self.link_policy = link_policy.LinkPolicy(CONFIG['path'], CONFIG['link_policy'])
+        self.flood_detector = spam_filter.FloodDetector(CONFIG['flood_rate'], CONFIG['flood_rate_seconds'],
+                                                        CONFIG['flood_burst'], CONFIG['flood_burst_seconds'],
+                                                        CONFIG['flood_repeats'])
+        self.duplicate_detector = spam_filter.DuplicateDetector(CONFIG['duplicate_senders'],
+                                                                CONFIG['duplicate_seconds'],
+                                                                CONFIG['duplicate_min_length'],
+                                                                CONFIG['duplicate_similarity'])
+        self.chat_commands = self.build_chat_commands()
+        self.pm_commands = self.build_pm_commands()
+
+    def build_chat_commands(self):
+        """
+        Build the registry of the room chat commands.
+        :return: CommandRegistry the chat commands.
+        """
+        commands = CommandRegistry(CONFIG['prefix'])
+        add = commands.add
+
+        # Super mod commands:
+        add('mod', self.do_make_mod, PRIVILEGE_SUPER, True)
+        add('rmod', self.do_remove_mod, PRIVILEGE_SUPER, True)
+        add('dir', self.do_directory, PRIVILEGE_SUPER, True, ARGS_NONE)
+        add('p2t', self.do_push2talk, PRIVILEGE_SUPER, True, ARGS_NONE)
+        add('gr', self.do_green_room, PRIVILEGE_SUPER, True, ARGS_NONE)
+        add('crb', self.do_clear_room_bans, PRIVILEGE_SUPER, True, ARGS_NONE)
+
+        # Owner and super mod commands:
+        add('kill', self.do_kill, PRIVILEGE_OWNER, False, ARGS_NONE)
+
+        # Mod and bot controller commands:
+        # - Lower-level commands:
+        # TODO: Make this work to a decent level.
+        add('sleep', self.do_sleep, PRIVILEGE_POWER, False, ARGS_NONE)
+        add('reboot', self.do_reboot, PRIVILEGE_MOD, False, ARGS_NONE)
+        add('spam', self.do_spam, PRIVILEGE_POWER, False, ARGS_NONE)
+        add('snap', self.do_snapshot, PRIVILEGE_POWER, False, ARGS_NONE)
+        add('camblock', self.do_camblock, PRIVILEGE_POWER)
+        add('autoclose', self.do_autoclose, PRIVILEGE_POWER, False, ARGS_NONE)
+        add('mobiles', self.do_ban_mobiles, PRIVILEGE_POWER, False, ARGS_NONE)
+        add('autourl', self.do_auto_url_mode, PRIVILEGE_POWER, False, ARGS_NONE)
+        add('playlist', self.do_playlist_mode, PRIVILEGE_POWER, False, ARGS_NONE)
+        # TODO: Make sure enabling guests/newusers bans/kicks the respective users in the room as well.
+        add('guests', self.do_guest_nick_ban, PRIVILEGE_POWER, False, ARGS_NONE)
+        add('newuser', self.do_newuser_user_ban, PRIVILEGE_POWER, False, ARGS_NONE)
+        add('mute', self.do_mute, PRIVILEGE_POWER, True, ARGS_NONE)
+        add('p2tnow', self.do_instant_push2talk, PRIVILEGE_POWER, False, ARGS_NONE)
+        add('autopm', self.do_auto_pm, PRIVILEGE_POWER, False, ARGS_NONE)
+        add('privateroom', self.do_private_room, PRIVILEGE_POWER, False, ARGS_NONE)
+        add('botter', self.do_botter, PRIVILEGE_MOD, True)
+        add('protect', self.do_autoforgive, PRIVILEGE_MOD, True)
+        add('close', self.do_close_broadcast, PRIVILEGE_POWER)
+        add('clr', self.do_clear, PRIVILEGE_POWER, False, ARGS_NONE)
+        add('media', self.do_media_info, PRIVILEGE_POWER, False, ARGS_NONE)
+
+        # - Higher-level commands:
+        add('topicis', self.do_current_topic, PRIVILEGE_PUBLIC, True, ARGS_NONE)
+        add('topic', self.do_topic, PRIVILEGE_POWER)
+        add('kick', self.do_kick, PRIVILEGE_POWER)
+        add('ban', partial(self.do_kick, ban=True), PRIVILEGE_POWER)
+        add('forgive', self.do_forgive, PRIVILEGE_POWER, True)
+        add('bn', self.do_bad_nick, PRIVILEGE_POWER, True)
+        add('rmbn', self.do_remove_bad_nick, PRIVILEGE_POWER)
+        add('bs', self.do_bad_string, PRIVILEGE_POWER, True)
+        add('rmbs', self.do_remove_bad_string, PRIVILEGE_POWER)
+        add('ba', self.do_bad_account, PRIVILEGE_POWER, True)
+        add('rmba', self.do_remove_bad_account, PRIVILEGE_POWER)
+        add('list', self.do_list_info, PRIVILEGE_POWER)
+        add('uinfo', self.do_user_info, PRIVILEGE_POWER, True)
+
+        # Standard media commands:
+        add('yt', partial(self.do_play_media, self.yt_type), PRIVILEGE_POWER, True)
+        add('sc', partial(self.do_play_media, self.sc_type), PRIVILEGE_POWER, True)
+        add('syncall', self.do_sync_media, PRIVILEGE_POWER, True, ARGS_NONE)
+        add('syt', self.do_youtube_search, PRIVILEGE_POWER, True)
+        add('psyt', self.do_play_youtube_search, PRIVILEGE_POWER)
+
+        # Specific media control commands:
+        # TODO: Requires new media handling class.
+        add('replay', self.do_media_replay, PRIVILEGE_POWER, False, ARGS_NONE)
+        add('skip', self.do_skip, PRIVILEGE_POWER, False, ARGS_NONE)
+        add('stop', self.do_close_media, PRIVILEGE_POWER, False, ARGS_NONE)
+        # TODO: Bug present; [collect info & state]
+        # add('pause', self.do_pause_media, PRIVILEGE_POWER, False, ARGS_NONE)
+        # TODO: Bug present; [collect info & state]
+        # add('resume', self.do_resume_media, PRIVILEGE_POWER, False, ARGS_NONE)
+        # TODO: Make sure the time is correctly updated in the background media timer,
+        #       so newly joined users receive the correct time.
+        # add('seek', self.do_seek_media, PRIVILEGE_POWER)
+
+        # Playlist media commands:
+        add('pl', self.do_youtube_playlist_videos, PRIVILEGE_POWER, True)
+        add('plsh', self.do_youtube_playlist_search, PRIVILEGE_POWER, True)
+        add('pladd', self.do_youtube_playlist_search_choice, PRIVILEGE_POWER, True)
+        add('top40', self.do_charts, PRIVILEGE_POWER, True, ARGS_NONE)
+        add('top', self.do_lastfm_chart, PRIVILEGE_POWER, True)
+        add('ran', self.do_lastfm_random_tunes, PRIVILEGE_POWER, True)
+        add('tag', self.search_lastfm_by_tag, PRIVILEGE_POWER, True)
+        add('rm', self.do_delete_playlist_item, PRIVILEGE_POWER)
+        add('cpl', self.do_clear_playlist, PRIVILEGE_POWER, False, ARGS_NONE)
+
+        # Public commands:
+        add('v', self.do_version, PRIVILEGE_PUBLIC, True, ARGS_NONE)
+        add('help', self.do_help, PRIVILEGE_PUBLIC, True, ARGS_NONE)
+        add('now', self.do_now_playing, PRIVILEGE_PUBLIC, True, ARGS_NONE)
+        add('next', self.do_next_tune_in_playlist, PRIVILEGE_PUBLIC, True, ARGS_NONE)
+        add('pls', self.do_playlist_status, PRIVILEGE_PUBLIC, True, ARGS_NONE)
+        add('uptime', self.do_uptime, PRIVILEGE_PUBLIC, False, ARGS_NONE)
+        add('pmme', self.do_pmme, PRIVILEGE_PUBLIC, False, ARGS_NONE)
+
+        # - Private media commands:
+        add('ytme', partial(self.do_play_private_media, self.yt_type), PRIVILEGE_PUBLIC, True)
+        add('scme', partial(self.do_play_private_media, self.sc_type), PRIVILEGE_PUBLIC, True)
+        add('syncme', self.do_sync_media_user, PRIVILEGE_PUBLIC, True, ARGS_NONE)
+        add('stopme', self.do_stop_private_media, PRIVILEGE_PUBLIC, True, ARGS_NONE)
+        # TODO: Decide if more private media functions are required.
+        # [Private pause/rewind/seek procedures here (?)]
+
+        # API commands:
+        # - Tinychat API commands:
+        add('spy', self.do_spy, PRIVILEGE_PUBLIC, True)
+        add('acspy', self.do_account_spy, PRIVILEGE_PUBLIC, True)
+
+        # - External API commands:
+        add('urb', self.do_search_urban_dictionary, PRIVILEGE_PUBLIC, True)
+        add('wea', self.do_weather_search, PRIVILEGE_PUBLIC, True)
+        add('ip', self.do_whois_ip, PRIVILEGE_PUBLIC, True)
+        add('ddg', self.do_duckduckgo_search, PRIVILEGE_PUBLIC, True)
+        # TODO: Fix bug in wikipedia parsing.
+        add('wiki', self.do_wiki_search, PRIVILEGE_PUBLIC, True)
+        add('imdb', self.do_omdb_search, PRIVILEGE_PUBLIC, True)
+        add('etymo', self.do_etymonline_search, PRIVILEGE_PUBLIC, True)
+
+        # Entertainment/alternative media commands:
+        add('cn', self.do_chuck_norris, PRIVILEGE_PUBLIC, True, ARGS_NONE)
+        add('8ball', self.do_8ball, PRIVILEGE_PUBLIC)
+        add('yomama', self.do_yo_mama_joke, PRIVILEGE_PUBLIC, True, ARGS_NONE)
+        add('advice', self.do_advice, PRIVILEGE_PUBLIC, True, ARGS_NONE)
+        add('joke', self.do_one_liner, PRIVILEGE_PUBLIC, True)
+        add('time', self.do_time, PRIVILEGE_PUBLIC, True)
+        add('time+', self.do_time_additional, PRIVILEGE_PUBLIC, True)
+
+        return commands
+
+    def build_pm_commands(self):
+        """
+        Build the registry of the private message commands.
+        :return: CommandRegistry the private message commands.
+        """
+        commands = CommandRegistry(CONFIG['prefix'])
+        add = commands.add
+
+        # Super mod commands.
+        add('rp', self.do_set_room_pass, PRIVILEGE_SUPER, True)
+        add('bp', self.do_set_broadcast_pass, PRIVILEGE_SUPER, True)
+
+        # Owner and super mod commands.
+        add('key', self.do_key, PRIVILEGE_OWNER, True)
+        add('clrbn', self.do_clear_bad_nicks, PRIVILEGE_OWNER, True, ARGS_NONE)
+        add('clrbs', self.do_clear_bad_strings, PRIVILEGE_OWNER, True, ARGS_NONE)
+        add('clrba', self.do_clear_bad_accounts, PRIVILEGE_OWNER, True, ARGS_NONE)
+        add('stats', self.do_stats, PRIVILEGE_OWNER, True, ARGS_NONE)
+
+        # Mod and bot controller commands.
+        add('disconnect', self.do_pm_disconnect, PRIVILEGE_POWER)
+        # The owner and super mods use these without the key, mods and bot controllers give the key.
+        add('op', self.do_op_user, PRIVILEGE_POWER, True, ARGS_PARTS)
+        add('deop', self.do_deop_user, PRIVILEGE_POWER, True, ARGS_PARTS)
+        add('up', self.do_cam_up, PRIVILEGE_POWER, True)
+        add('down', self.do_cam_down, PRIVILEGE_POWER, True)
+        add('nick', self.do_nick, PRIVILEGE_POWER)
+        add('ban', partial(self.do_kick, ban=True, discrete=True), PRIVILEGE_POWER, True)
+        add('nocam', self.do_nocam, PRIVILEGE_POWER, True)
+        add('noguest', self.do_no_guest, PRIVILEGE_POWER, True)
+        add('notice', self.do_pm_notice, PRIVILEGE_PUBLIC, True)
+        add('say', self.send_chat_msg, PRIVILEGE_PUBLIC, True)
+        add('setpm', self.do_set_auto_pm, ROLE_OWNER | ROLE_MOD | ROLE_POWER, True)
+        add('pmall', self.do_pm_all, ROLE_OWNER | ROLE_MOD | ROLE_POWER, True)
+
+        # Public commands.
+        add('sudo', self.do_super_user, PRIVILEGE_PUBLIC, True)
+        add('opme', self.do_opme, PRIVILEGE_PUBLIC, True)
+        add('pm', self.do_pm_bridge, PRIVILEGE_PUBLIC, True, ARGS_PARTS)
+
+        return commands
+
+    def run_command(self, registry, cmd, command, cmd_arg, parts):
+        """
+        Run a registered command if the user is allowed to use it.
+        :param registry: CommandRegistry the registry the command was found in.
+        :param cmd: str the full command, including the prefix.
+        :param command: BotCommand the command.
+        :param cmd_arg: str the text following the command.
+        :param parts: list the whole message split on spaces.
+        """
+        if command.privilege and not self.user_obj.roles & command.privilege:
+            return
+
+        if command.args == ARGS_TEXT:
+            args = (cmd_arg, )
+        elif command.args == ARGS_PARTS:
+            args = (parts, )
+        else:
+            args = ()
+
+        if command.threaded:
+            if not self.run_task(registry.invoke, cmd, command, args):
+                log.warning('Worker pool saturated, command refused: %s' % cmd)
+                self.console_write(pinylib.COLOR['bright_red'], 'Busy, refused %s from %s.' %
+                                   (cmd, self.user_obj.nick))
+        else:
+            registry.invoke(cmd, command, args)
 
     def on_join(self, join_info_dict):
         log.info('User join info: %s' % join_info_dict)
@@ -170,12 +501,10 @@ class TinychatBot(pinylib.TinychatRTMPClient):
         user.id = join_info_dict['id']
         user.is_mod = join_info_dict['mod']
         user.is_owner = join_info_dict['own']
+        self.set_botter_power(user)
 
         if join_info_dict['account']:
-            tc_info = pinylib.tinychat_api.tinychat_user_info(join_info_dict['account'])
-            if tc_info is not None:
-                user.tinychat_id = tc_info['tinychat_id']
-                user.last_login = tc_info['last_active']
+            self.prefetch_user_info([user])
             if join_info_dict['own']:
                 self.console_write(pinylib.COLOR['red'], 'Room Owner %s:%d:%s' % (join_info_dict['nick'],
                                    join_info_dict['id'], join_info_dict['account']))
@@ -186,14 +515,12 @@ class TinychatBot(pinylib.TinychatRTMPClient):
                 self.console_write(pinylib.COLOR['bright_yellow'], '%s:%d has account: %s' % (join_info_dict['nick'],
                                    join_info_dict['id'], join_info_dict['account']))
 
-                badaccounts = pinylib.fh.file_reader(CONFIG['path'], CONFIG['badaccounts'])
-                if badaccounts is not None:
-                    if join_info_dict['account'] in badaccounts:
-                        if self.is_client_mod:
-                            self.send_ban_msg(join_info_dict['nick'], join_info_dict['id'])
-                            self.send_forgive_msg(join_info_dict['id'])
-                            self.send_bot_msg(special_unicode['toxic'] + ' *Auto-Banned:* (bad account)',
-                                              self.is_client_mod)
+                if join_info_dict['account'] in self.bad_accounts:
+                    if self.is_client_mod:
+                        self.send_ban_msg(join_info_dict['nick'], join_info_dict['id'])
+                        self.send_forgive_msg(join_info_dict['id'])
+                        self.send_bot_msg(special_unicode['toxic'] + ' *Auto-Banned:* (bad account)',
+                                          self.is_client_mod)
         else:
             if join_info_dict['id'] is not self.client_id:
                 if self.no_guests:
@@ -206,6 +533,46 @@ class TinychatBot(pinylib.TinychatRTMPClient):
                     self.console_write(pinylib.COLOR['bright_cyan'], '%s:%d joined the room.' %
                                        (join_info_dict['nick'], join_info_dict['id']))
 
+    def on_joins_batch(self, joins_info_list):
+        users = pinylib.TinychatRTMPClient.on_joins_batch(self, joins_info_list)
+        for user in users:
+            self.set_botter_power(user)
+        if self.is_client_mod:
+            self.ban_bad_users(users)
+        return users
+
+    def set_botter_power(self, user):
+        """
+        Give a user bot controller privileges if they are a botter, by nick or by account.
+        :param user: RoomUser the user.
+        """
+        if user.nick in self.botters or user.user_account in self.botteraccounts:
+            user.has_power = True
+
+    def ban_bad_users(self, users):
+        """
+        Ban the users with a bad nick or a bad account, checking all of them against the lists at once.
+        :param users: list of RoomUser objects.
+        """
+        if not len(self.bad_nicks) and not len(self.bad_accounts):
+            return
+
+        bad_users = []
+        for user in users:
+            if user.id != self.client_id and not user.roles & PRIVILEGE_MOD:
+                if user.nick in self.bad_nicks or user.user_account in self.bad_accounts:
+                    bad_users.append(user)
+        for user in bad_users:
+            self.send_ban_msg(user.nick, user.id)
+            # Remove next line to keep ban.
+            self.send_forgive_msg(user.id)
+
+        if bad_users:
+            self.console_write(pinylib.COLOR['bright_red'], 'Auto-Banned %d users (bad nick/account): %s' %
+                               (len(bad_users), ', '.join(user.nick for user in bad_users)))
+            self.send_bot_msg(special_unicode['toxic'] + ' *Auto-Banned:* %d users (bad nick/account)' %
+                              len(bad_users), self.is_client_mod)
+
     def on_joinsdone(self):
         if not self.is_reconnected:
             if CONFIG['auto_message_enabled']:
@@ -213,7 +580,7 @@ class TinychatBot(pinylib.TinychatRTMPClient):
         if self.is_client_mod:
             self.send_banlist_msg()
         if self.is_client_owner and self._roomtype != 'default':
-            threading.Thread(target=self.get_privacy_settings).start()
+            self.workers.submit(self.get_privacy_settings)
 
     def on_avon(self, uid, name):
         if self.no_cam or name in self.cam_blocked:
@@ -221,7 +588,7 @@ class TinychatBot(pinylib.TinychatRTMPClient):
         else:
             user = self.find_user_info(name)
 
-            if not user.is_owner or not user.is_mod or not user.has_power:
+            if not user.roles & PRIVILEGE_POWER:
                 uid_parts = str(uid).split(':')
                 if len(uid_parts) is 2:
                     clean_uid = uid_parts[0]
@@ -279,21 +646,15 @@ class TinychatBot(pinylib.TinychatRTMPClient):
 
     def on_nick(self, old, new, uid):
         if uid is not self.client_id:
-            old_info = self.find_user_info(old)
-            old_info.nick = new
-            if old in self.room_users.keys():
-                del self.room_users[old]
-                self.room_users[new] = old_info
-
             # Fetch latest information regarding the user.
-            user = self.find_user_info(new)
+            user = self.room_users.rename(old, new)
 
             # Transfer temporary botter privileges on a nick change.
             if old in self.botters:
-                self.botters.remove(old)
-                self.botters.append(new)
+                self.botters.discard(old)
+                self.botters.add(new)
 
-            if not user.is_owner or user.is_mod or user.has_power:
+            if not user.roles & PRIVILEGE_POWER:
                 if new.startswith('guest-') and CONFIG['guest_nick_ban']:
                     if self.is_client_mod:
                         self.send_ban_msg(new, uid)
@@ -311,9 +672,7 @@ class TinychatBot(pinylib.TinychatRTMPClient):
                             return
 
             if old.startswith('guest-'):
-                bn = pinylib.fh.file_reader(CONFIG['path'], CONFIG['badnicks'])
-
-                if bn is not None and new in bn:
+                if new in self.bad_nicks:
                     if self.is_client_mod:
                         self.send_ban_msg(new, uid)
                         # Remove next line to keep ban.
@@ -357,20 +716,16 @@ class TinychatBot(pinylib.TinychatRTMPClient):
 
     def on_quit(self, uid, name):
         if uid is not self.client_id:
-            if name in self.room_users.keys():
+            if name in self.room_users:
                 # Execute the tidying method before deleting the user from our records.
                 self.tidy_exit(name)
-                del self.room_users[name]
+                self.room_users.remove(name)
                 self.console_write(pinylib.COLOR['cyan'], '%s:%s left the room.' % (name, uid))
 
     def tidy_exit(self, name):
         user = self.find_user_info(name)
-        # Delete user from botters/botteraccounts if they were instated.
-        if user.nick in self.botters:
-            self.botters.remove(user.nick)
-        if user.user_account:
-            if user.user_account in self.botteraccounts:
-                self.botteraccounts.remove(user.user_account)
+        # Delete user from the temporary botters if they were instated.
+        self.botters.discard(user.nick)
         # Delete the nickname from the cam blocked list if the user was in it.
         if user.nick in self.cam_blocked:
             self.cam_blocked.remove(user.nick)
@@ -509,34 +864,54 @@ class TinychatBot(pinylib.TinychatRTMPClient):
             self.send_chat_msg(mbs_msg)
 
     # TODO: msg_raw implemented here in spam_prevention?
-    def spam_prevention(self, msg, msg_sender):
+    def spam_prevention(self, msg, msg_sender, folded_msg=None):
         """
         Spam checks to ensure chat box is rid any potential further spam.
+        The rules are set with 'spam_rules' in the configuration file, the links allowed and denied
+        in the link policy file. The title of an allowed link is shown if auto URL mode is on.
         :param msg: str the message the user sent
         :param msg_sender: str the nick name of the message sender.
+        :param folded_msg: unicode the message folded by matcher.fold, if it was.
         """
         user = self.find_user_info(msg_sender)
+        if folded_msg is None:
+            folded_msg = matcher.fold(msg)
 
-        # Check these unicode characters to see if they are present.
-        unicode_spam = [u'\u25b2', u'\x85']
-
-        for x in xrange(len(unicode_spam)):
-            if msg.find(unicode_spam[x]) >= 0:
+        if CONFIG['flood_prevention']:
+            user.flood, flood = self.flood_detector.check(user.flood, folded_msg, self.context.received)
+            if flood is not None:
+                self.console_write(pinylib.COLOR['bright_red'], '%s is flooding (%s).' % (user.nick, flood))
                 self.send_ban_msg(user.nick, user.id)
+                if CONFIG['flood_forgive']:
+                    self.send_forgive_msg(user.id)
                 return
 
-        if 'tinychat.com/' + str(self.roomname) not in msg:
-            text_search = re.search(r'tinychat.com\/\w+($| |\/+ |\/+$)', msg, re.I)
-            if text_search:
-                self.send_ban_msg(user.nick, user.id)
+        if CONFIG['duplicate_prevention']:
+            senders = self.duplicate_detector.check(msg, msg_sender, self.context.received, folded_msg)
+            if senders:
+                self.console_write(pinylib.COLOR['bright_red'], 'Duplicate messages from: %s' % ', '.join(senders))
+                for nick in senders:
+                    duplicate_user = self.find_user_info(nick)
+                    if duplicate_user is not None:
+                        self.send_ban_msg(duplicate_user.nick, duplicate_user.id)
+                        if CONFIG['duplicate_forgive']:
+                            self.send_forgive_msg(duplicate_user.id)
                 return
 
-        if CONFIG['snapshot']:
-            if self.snap_line in msg:
-                self.send_ban_msg(user.nick, user.id)
-                # remove next line to keep ban.
+        hit = self.spam_filter.check(msg, self.roomname, CONFIG, folded_msg)
+        if hit is not None:
+            self.send_ban_msg(user.nick, user.id)
+            if hit.rule.action == spam_filter.ACTION_KICK:
                 self.send_forgive_msg(user.id)
-                return
+            return
+
+        link = self.link_policy.check(msg, folded_msg)
+        if link.action == link_policy.DENY:
+            self.console_write(pinylib.COLOR['bright_red'], '%s posted a denied link: %s' % (user.nick, link.host))
+            self.send_ban_msg(user.nick, user.id)
+        elif link.action == link_policy.ALLOW and self.auto_url_mode:
+            if not msg.startswith(CONFIG['prefix']):
+                self.run_task(self.do_auto_url, link.url)
 
     # Message Method.
     def send_bot_msg(self, msg, is_mod=False):
@@ -554,43 +929,31 @@ class TinychatBot(pinylib.TinychatRTMPClient):
         """
         Custom message/command handler.
 
-        NOTE: Any method using an API will start in a new thread along with
-        methods that require more CPU attention. Otherwise, these can be intrusive
-        to the processes running within the bot.
+        NOTE: This runs on a worker thread in the context of the message, after any earlier messages
+        of the same user; messages of different users are handled in parallel. Commands using an API,
+        or requiring more CPU attention, are marked as threaded so they never run on the reader thread.
         :param msg_sender: str the user sending a message.
         :param msg: str the message.
         """
 
-        # Sets botters to have appropriate privileges if they have not been instated already.
-        if not self.user_obj.has_power:
-            if self.user_obj.nick in self.botters:
-                self.user_obj.has_power = True
-            elif self.user_obj.user_account in self.botteraccounts:
-                self.user_obj.has_power = True
-
         # Waive handling messages to normal users if the bot listening is set to False and the user
         # is not owner/super mod/mod/botter.
         if not self.bot_listen:
             # TODO: This statement should be checked to see if it works or not.
-            if not self.user_obj.is_owner and not self.user_obj.is_super \
-                    and not self.user_obj.is_mod and not self.user_obj.has_power:
+            if not self.user_obj.roles & PRIVILEGE_POWER:
                 return
 
+        # The message folded for matching (look-alike letters, zero width characters, case), once for all checks.
+        folded_msg = matcher.fold(msg)
+
         # Spam checks to prevent any text from spamming the room chat and being parsed by the bot.
         if CONFIG['spam_prevention']:
-            if not self.user_obj.is_owner and not self.user_obj.is_super \
-                    and not self.user_obj.is_mod and not self.user_obj.has_power:
-                # Start the spam checking.
-                spam_check = threading.Thread(target=self.spam_prevention, args=(msg, msg_sender,))
-                spam_check.start()
-                # Wait until the spam check has finished, then continue like normal. This avoids breaking any
-                # particular handling of messages if the message was spam and proceeds into functions; which can
-                # potentially bear many undesired effects.
-                spam_check.join()
-
-                # If auto URL has been switched on, run, in a new the thread, the automatic URL header retrieval.
-                if self.auto_url_mode:
-                    threading.Thread(target=self.do_auto_url, args=(msg, )).start()
+            if not self.user_obj.roles & PRIVILEGE_POWER:
+                # Run the spam checks before continuing like normal. This avoids breaking any particular handling
+                # of messages if the message was spam and proceeds into functions; which can potentially bear
+                # many undesired effects.
+                # If auto URL has been switched on, this also runs the automatic URL header retrieval.
+                self.spam_prevention(msg, msg_sender, folded_msg)
 
         # Is this a custom command?
         if msg.startswith(CONFIG['prefix']):
@@ -601,298 +964,15 @@ class TinychatBot(pinylib.TinychatRTMPClient):
             # The rest is a command argument.
             cmd_arg = ' '.join(parts[1:]).strip()
 
-            # Main call to check if the command is an ASCII command.
-            if CONFIG['ascii_chars']:
-                ascii_result = self.do_ascii(cmd)
-                if ascii_result:
-                    return
-
-            # Super mod commands:
-            if cmd == CONFIG['prefix'] + 'mod':
-                threading.Thread(target=self.do_make_mod, args=(cmd_arg,)).start()
-
-            elif cmd == CONFIG['prefix'] + 'rmod':
-                threading.Thread(target=self.do_remove_mod, args=(cmd_arg,)).start()
-
-            elif cmd == CONFIG['prefix'] + 'dir':
-                threading.Thread(target=self.do_directory).start()
-
-            elif cmd == CONFIG['prefix'] + 'p2t':
-                threading.Thread(target=self.do_push2talk).start()
-
-            elif cmd == CONFIG['prefix'] + 'gr':
-                threading.Thread(target=self.do_green_room).start()
-
-            elif cmd == CONFIG['prefix'] + 'crb':
-                threading.Thread(target=self.do_clear_room_bans).start()
-
-            # Owner and super mod commands:
-            elif cmd == CONFIG['prefix'] + 'kill':
-                self.do_kill()
-
-            # Mod and bot controller commands:
-            # - Lower-level commands:
-            # TODO: Make this work to a decent level.
-            elif cmd == CONFIG['prefix'] + 'sleep':
-                self.do_sleep()
-
-            elif cmd == CONFIG['prefix'] + 'reboot':
-                self.do_reboot()
-
-            elif cmd == CONFIG['prefix'] + 'spam':
-                self.do_spam()
-
-            elif cmd == CONFIG['prefix'] + 'snap':
-                self.do_snapshot()
-
-            elif cmd == CONFIG['prefix'] + 'camblock':
-                self.do_camblock(cmd_arg)
-
-            elif cmd == CONFIG['prefix'] + 'autoclose':
-                self.do_autoclose()
-
-            elif cmd == CONFIG['prefix'] + 'mobiles':
-                self.do_ban_mobiles()
-
-            elif cmd == CONFIG['prefix'] + 'autourl':
-                self.do_auto_url_mode()
-
-            elif cmd == CONFIG['prefix'] + 'playlist':
-                self.do_playlist_mode()
-
-            # TODO: Make sure enabling guests/newusers bans/kicks the respective users in the room as well.
-            elif cmd == CONFIG['prefix'] + 'guests':
-                self.do_guest_nick_ban()
-
-            elif cmd == CONFIG['prefix'] + 'newuser':
-                self.do_newuser_user_ban()
-
-            elif cmd == CONFIG['prefix'] + 'mute':
-                threading.Thread(target=self.do_mute).start()
-
-            elif cmd == CONFIG['prefix'] + 'p2tnow':
-                self.do_instant_push2talk()
-
-            elif cmd == CONFIG['prefix'] + 'autopm':
-                self.do_auto_pm()
-
-            elif cmd == CONFIG['prefix'] + 'privateroom':
-                self.do_private_room()
-
-            elif cmd == CONFIG['prefix'] + 'botter':
-                threading.Thread(target=self.do_botter, args=(cmd_arg, )).start()
-
-            elif cmd == CONFIG['prefix'] + 'protect':
-                threading.Thread(target=self.do_autoforgive, args=(cmd_arg, )).start()
-
-            elif cmd == CONFIG['prefix'] + 'close':
-                self.do_close_broadcast(cmd_arg)
+            command = self.chat_commands.lookup(cmd)
 
-            elif cmd == CONFIG['prefix'] + 'clr':
-                self.do_clear()
-
-            elif cmd == CONFIG['prefix'] + 'media':
-                self.do_media_info()
-
-            # - Higher-level commands:
-            elif cmd == CONFIG['prefix'] + 'topicis':
-                threading.Thread(target=self.do_current_topic).start()
-
-            elif cmd == CONFIG['prefix'] + 'topic':
-                self.do_topic(cmd_arg)
-
-            elif cmd == CONFIG['prefix'] + 'kick':
-                self.do_kick(cmd_arg)
-
-            elif cmd == CONFIG['prefix'] + 'ban':
-                self.do_kick(cmd_arg, True)
-
-            elif cmd == CONFIG['prefix'] + 'forgive':
-                threading.Thread(target=self.do_forgive, args=(cmd_arg, )).start()
-
-            elif cmd == CONFIG['prefix'] + 'bn':
-                threading.Thread(target=self.do_bad_nick, args=(cmd_arg, )).start()
-
-            elif cmd == CONFIG['prefix'] + 'rmbn':
-                self.do_remove_bad_nick(cmd_arg)
-
-            elif cmd == CONFIG['prefix'] + 'bs':
-                threading.Thread(target=self.do_bad_string, args=(cmd_arg, )).start()
-
-            elif cmd == CONFIG['prefix'] + 'rmbs':
-                self.do_remove_bad_string(cmd_arg)
-
-            elif cmd == CONFIG['prefix'] + 'ba':
-                threading.Thread(target=self.do_bad_account, args=(cmd_arg, )).start()
-
-            elif cmd == CONFIG['prefix'] + 'rmba':
-                self.do_remove_bad_account(cmd_arg)
-
-            elif cmd == CONFIG['prefix'] + 'list':
-                self.do_list_info(cmd_arg)
-
-            elif cmd == CONFIG['prefix'] + 'uinfo':
-                threading.Thread(target=self.do_user_info, args=(cmd_arg, )).start()
-
-            # Standard media commands:
-            elif cmd == CONFIG['prefix'] + 'yt':
-                threading.Thread(target=self.do_play_media, args=(self.yt_type, cmd_arg, )).start()
-
-            elif cmd == CONFIG['prefix'] + 'sc':
-                threading.Thread(target=self.do_play_media, args=(self.sc_type, cmd_arg, )).start()
-
-            elif cmd == CONFIG['prefix'] + 'syncall':
-                threading.Thread(target=self.do_sync_media).start()
-
-            elif cmd == CONFIG['prefix'] + 'syt':
-                threading.Thread(target=self.do_youtube_search, args=(cmd_arg, )).start()
-
-            elif cmd == CONFIG['prefix'] + 'psyt':
-                self.do_play_youtube_search(cmd_arg)
-
-            # Specific media control commands:
-            # TODO: Requires new media handling class.
-
-            elif cmd == CONFIG['prefix'] + 'replay':
-                self.do_media_replay()
-
-            elif cmd == CONFIG['prefix'] + 'skip':
-                self.do_skip()
-
-            elif cmd == CONFIG['prefix'] + 'stop':
-                self.do_close_media()
-
-            # TODO: Bug present; [collect info & state]
-            # elif cmd == CONFIG['prefix'] + 'pause':
-            # self.do_pause_media()
-
-            # TODO: Bug present; [collect info & state]
-            # elif cmd == CONFIG['prefix'] + 'resume':
-            # self.do_resume_media()
-
-            # TODO: Make sure the time is correctly updated in the background media timer,
-            #       so newly joined users receive the correct time.
-            # elif cmd == CONFIG['prefix'] + 'seek':
-            #     self.do_seek_media(cmd_arg)
-
-            # Playlist media commands:
-            elif cmd == CONFIG['prefix'] + 'pl':
-                threading.Thread(target=self.do_youtube_playlist_videos, args=(cmd_arg, )).start()
-
-            elif cmd == CONFIG['prefix'] + 'plsh':
-                threading.Thread(target=self.do_youtube_playlist_search, args=(cmd_arg, )).start()
-
-            elif cmd == CONFIG['prefix'] + 'pladd':
-                threading.Thread(target=self.do_youtube_playlist_search_choice, args=(cmd_arg, )).start()
-
-            elif cmd == CONFIG['prefix'] + 'top40':
-                threading.Thread(target=self.do_charts).start()
-
-            elif cmd == CONFIG['prefix'] + 'top':
-                threading.Thread(target=self.do_lastfm_chart, args=(cmd_arg, )).start()
-
-            elif cmd == CONFIG['prefix'] + 'ran':
-                threading.Thread(target=self.do_lastfm_random_tunes, args=(cmd_arg, )).start()
-
-            elif cmd == CONFIG['prefix'] + 'tag':
-                threading.Thread(target=self.search_lastfm_by_tag, args=(cmd_arg, )).start()
-
-            elif cmd == CONFIG['prefix'] + 'rm':
-                self.do_delete_playlist_item(cmd_arg)
-
-            elif cmd == CONFIG['prefix'] + 'cpl':
-                self.do_clear_playlist()
-
-            # Public commands:
-            elif cmd == CONFIG['prefix'] + 'v':
-                threading.Thread(target=self.do_version).start()
-
-            elif cmd == CONFIG['prefix'] + 'help':
-                threading.Thread(target=self.do_help).start()
-
-            elif cmd == CONFIG['prefix'] + 'now':
-                threading.Thread(target=self.do_now_playing).start()
-
-            elif cmd == CONFIG['prefix'] + 'next':
-                threading.Thread(target=self.do_next_tune_in_playlist).start()
-
-            elif cmd == CONFIG['prefix'] + 'pls':
-                threading.Thread(target=self.do_playlist_status).start()
-
-            elif cmd == CONFIG['prefix'] + 'uptime':
-                self.do_uptime()
-
-            elif cmd == CONFIG['prefix'] + 'pmme':
-                self.do_pmme()
-
-            # - Private media commands:
-            elif cmd == CONFIG['prefix'] + 'ytme':
-                threading.Thread(target=self.do_play_private_media, args=(self.yt_type, cmd_arg, )).start()
-
-            elif cmd == CONFIG['prefix'] + 'scme':
-                threading.Thread(target=self.do_play_private_media, args=(self.sc_type, cmd_arg, )).start()
-
-            elif cmd == CONFIG['prefix'] + 'syncme':
-                threading.Thread(target=self.do_sync_media_user).start()
-
-            elif cmd == CONFIG['prefix'] + 'stopme':
-                threading.Thread(target=self.do_stop_private_media).start()
-
-            # TODO: Decide if more private media functions are required.
-            # [Private pause/rewind/seek procedures here (?)]
-
-            # API commands:
-            # - Tinychat API commands:
-            elif cmd == CONFIG['prefix'] + 'spy':
-                threading.Thread(target=self.do_spy, args=(cmd_arg, )).start()
-
-            elif cmd == CONFIG['prefix'] + 'acspy':
-                threading.Thread(target=self.do_account_spy, args=(cmd_arg, )).start()
-
-            # - External API commands:
-            elif cmd == CONFIG['prefix'] + 'urb':
-                threading.Thread(target=self.do_search_urban_dictionary, args=(cmd_arg, )).start()
-
-            elif cmd == CONFIG['prefix'] + 'wea':
-                threading.Thread(target=self.do_weather_search, args=(cmd_arg, )).start()
-
-            elif cmd == CONFIG['prefix'] + 'ip':
-                threading.Thread(target=self.do_whois_ip, args=(cmd_arg, )).start()
-
-            elif cmd == CONFIG['prefix'] + 'ddg':
-                threading.Thread(target=self.do_duckduckgo_search, args=(cmd_arg, )).start()
-
-            # TODO: Fix bug in wikipedia parsing.
-            elif cmd == CONFIG['prefix'] + 'wiki':
-                threading.Thread(target=self.do_wiki_search, args=(cmd_arg, )).start()
-
-            elif cmd == CONFIG['prefix'] + 'imdb':
-                threading.Thread(target=self.do_omdb_search, args=(cmd_arg, )).start()
-
-            elif cmd == CONFIG['prefix'] + 'etymo':
-                threading.Thread(target=self.do_etymonline_search, args=(cmd_arg, )).start()
-
-            # Entertainment/alternative media commands:
-            elif cmd == CONFIG['prefix'] + 'cn':
-                threading.Thread(target=self.do_chuck_norris).start()
-
-            elif cmd == CONFIG['prefix'] + '8ball':
-                self.do_8ball(cmd_arg)
-
-            elif cmd == CONFIG['prefix'] + 'yomama':
-                threading.Thread(target=self.do_yo_mama_joke).start()
-
-            elif cmd == CONFIG['prefix'] + 'advice':
-                threading.Thread(target=self.do_advice).start()
-
-            elif cmd == CONFIG['prefix'] + 'joke':
-                threading.Thread(target=self.do_one_liner, args=(cmd_arg, )).start()
-
-            elif cmd == CONFIG['prefix'] + 'time':
-                threading.Thread(target=self.do_time, args=(cmd_arg, )).start()
+            # ASCII commands take precedence over any command sharing the same name.
+            if command is None or command.ascii_fallback:
+                if CONFIG['ascii_chars'] and self.do_ascii(cmd):
+                    return
 
-            elif cmd == CONFIG['prefix'] + 'time+':
-                threading.Thread(target=self.do_time_additional, args=(cmd_arg, )).start()
+            if command is not None:
+                self.run_command(self.chat_commands, cmd, command, cmd_arg, parts)
 
             #  Print command to console.
             self.console_write(pinylib.COLOR['yellow'], self.user_obj.nick + ':' + cmd + ' ' + cmd_arg)
@@ -901,9 +981,8 @@ class TinychatBot(pinylib.TinychatRTMPClient):
             # Print chat message to console.
             self.console_write(pinylib.COLOR['green'], self.user_obj.nick + ':' + msg)
             # Only check chat msg for bad string if we are mod and the user is does not have privileges.
-            if self.is_client_mod and not self.user_obj.is_owner and not self.user_obj.is_super and not \
-                    self.user_obj.is_mod and not self.user_obj.has_power:
-                threading.Thread(target=self.check_msg_for_bad_string, args=(msg, )).start()
+            if self.is_client_mod and not self.user_obj.roles & PRIVILEGE_POWER:
+                self.run_task(self.check_msg_for_bad_string, msg, False, folded_msg)
 
         # Add msg to user object last_msg attribute.
         self.user_obj.last_msg = msg
@@ -915,17 +994,16 @@ class TinychatBot(pinylib.TinychatRTMPClient):
         :param account str the account to make a moderator.
         """
         if self.is_client_owner:
-            if self.user_obj.is_super:
-                if len(account) is 0:
-                    self.send_bot_msg('*Missing account name.*', self.is_client_mod)
-                else:
-                    tc_user = self.privacy_settings.make_moderator(account)
-                    if tc_user is None:
-                        self.send_bot_msg('*The account is invalid.*', self.is_client_mod)
-                    elif tc_user:
-                        self.send_bot_msg('*' + account + ' was made a room moderator.*', self.is_client_mod)
-                    elif not tc_user:
-                        self.send_bot_msg('*The account is already a moderator.*', self.is_client_mod)
+            if len(account) is 0:
+                self.send_bot_msg('*Missing account name.*', self.is_client_mod)
+            else:
+                tc_user = self.privacy_settings.make_moderator(account)
+                if tc_user is None:
+                    self.send_bot_msg('*The account is invalid.*', self.is_client_mod)
+                elif tc_user:
+                    self.send_bot_msg('*' + account + ' was made a room moderator.*', self.is_client_mod)
+                elif not tc_user:
+                    self.send_bot_msg('*The account is already a moderator.*', self.is_client_mod)
 
     def do_remove_mod(self, account):
         """
@@ -933,185 +1011,163 @@ class TinychatBot(pinylib.TinychatRTMPClient):
         :param account str the account to remove from the moderator list.
         """
         if self.is_client_owner:
-            if self.user_obj.is_super:
-                if len(account) is 0:
-                    self.send_bot_msg('*Missing account name.*', self.is_client_mod)
-                else:
-                    tc_user = self.privacy_settings.remove_moderator(account)
-                    if tc_user:
-                        self.send_bot_msg('*' + account + ' is no longer a room moderator.*', self.is_client_mod)
-                    elif not tc_user:
-                        self.send_bot_msg('*' + account + ' is not a room moderator.*', self.is_client_mod)
+            if len(account) is 0:
+                self.send_bot_msg('*Missing account name.*', self.is_client_mod)
+            else:
+                tc_user = self.privacy_settings.remove_moderator(account)
+                if tc_user:
+                    self.send_bot_msg('*' + account + ' is no longer a room moderator.*', self.is_client_mod)
+                elif not tc_user:
+                    self.send_bot_msg('*' + account + ' is not a room moderator.*', self.is_client_mod)
 
     def do_directory(self):
         """ Toggles if the room should be shown on the directory. """
         if self.is_client_owner:
-            if self.user_obj.is_super:
-                if self.privacy_settings.show_on_directory():
-                    self.send_bot_msg('*Room IS shown on the directory.*', self.is_client_mod)
-                else:
-                    self.send_bot_msg('*Room is NOT shown on the directory.*', self.is_client_mod)
+            if self.privacy_settings.show_on_directory():
+                self.send_bot_msg('*Room IS shown on the directory.*', self.is_client_mod)
+            else:
+                self.send_bot_msg('*Room is NOT shown on the directory.*', self.is_client_mod)
 
     def do_push2talk(self):
         """ Toggles if the room should be in push2talk mode. """
         if self.is_client_owner:
-            if self.user_obj.is_super:
-                if self.privacy_settings.set_push2talk():
-                    self.send_bot_msg('*Push2Talk is enabled.*', self.is_client_mod)
-                else:
-                    self.send_bot_msg('*Push2Talk is disabled.*', self.is_client_mod)
+            if self.privacy_settings.set_push2talk():
+                self.send_bot_msg('*Push2Talk is enabled.*', self.is_client_mod)
+            else:
+                self.send_bot_msg('*Push2Talk is disabled.*', self.is_client_mod)
 
     def do_green_room(self):
         """ Toggles if the room should be in greenroom mode. """
         if self.is_client_owner:
-            if self.user_obj.is_super:
-                if self.privacy_settings.set_greenroom():
-                    self.send_bot_msg('*Green room is enabled.*', self.is_client_mod)
-                else:
-                    self.send_bot_msg('*Green room is disabled.*', self.is_client_mod)
+            if self.privacy_settings.set_greenroom():
+                self.send_bot_msg('*Green room is enabled.*', self.is_client_mod)
+            else:
+                self.send_bot_msg('*Green room is disabled.*', self.is_client_mod)
 
     def do_clear_room_bans(self):
         """ Clear all room bans. """
         if self.is_client_owner:
-            if self.user_obj.is_super:
-                if self.privacy_settings.clear_bans():
-                    self.send_bot_msg('*All room bans was cleared.*', self.is_client_mod)
+            if self.privacy_settings.clear_bans():
+                self.send_bot_msg('*All room bans was cleared.*', self.is_client_mod)
 
     # == Owner And Super Mod Command Methods. ==
     def do_kill(self):
         """ Kills the bot. """
-        if self.user_obj.is_owner or self.user_obj.is_super:
-            threading.Thread(target=self.disconnect).start()
-            # Exit normally.
-            sys.exit(0)
+        threading.Thread(target=self.disconnect).start()
+        # Exit normally.
+        sys.exit(0)
 
     # == Owner And Mod Command Methods. ==
     def do_reboot(self):
         """ Reboots the bot. """
-        if self.user_obj.is_owner or self.user_obj.is_super or self.user_obj.is_mod:
-            self.reconnect()
+        self.reconnect()
 
     # == Owner/ Super Mod/ Mod/ Power users Command Methods. ==
     def do_media_info(self):
         """ Shows basic media info. """
         # This method was used while debugging the media player.
-        if self.user_obj.is_owner or self.user_obj.is_super or self.user_obj.is_mod or self.user_obj.has_power:
-            if self.is_client_mod:
-                self.send_owner_run_msg('*I Now Play:* ' + str(self.inowplay))
-                self.send_owner_run_msg('*Playlist Length:* ' + str(len(self.playlist)))
-                self.send_owner_run_msg('*Current Time Point:* ' + self.to_human_time(self.current_media_time_point()))
-                self.send_owner_run_msg('*Active Threads:* ' + str(threading.active_count()))
+        if self.is_client_mod:
+            self.send_owner_run_msg('*I Now Play:* ' + str(self.inowplay))
+            self.send_owner_run_msg('*Playlist Length:* ' + str(len(self.playlist)))
+            self.send_owner_run_msg('*Current Time Point:* ' + self.to_human_time(self.current_media_time_point()))
+            self.send_owner_run_msg('*Active Threads:* ' + str(threading.active_count()))
 
     # TODO: Possible sleep mode/night/inactive mode (?)
     def do_sleep(self):
         """ Toggles sleep so commands from normal users will be ignored. """
-        if self.user_obj.is_owner or self.user_obj.is_super or self.user_obj.is_mod or self.user_obj.has_power:
-            self.bot_listen = not self.bot_listen
-            self.send_bot_msg('*Bot listening set to*: *' + str(self.bot_listen) + '*', self.is_client_mod)
+        self.bot_listen = not self.bot_listen
+        self.send_bot_msg('*Bot listening set to*: *' + str(self.bot_listen) + '*', self.is_client_mod)
 
     def do_spam(self):
         """ Toggles spam prevention """
-        if self.user_obj.is_owner or self.user_obj.is_super or self.user_obj.is_mod or self.user_obj.has_power:
-            CONFIG['spam_prevention'] = not CONFIG['spam_prevention']
-            self.send_bot_msg('*Text Spam Prevention*: *' + str(CONFIG['spam_prevention']) + '*', self.is_client_mod)
+        CONFIG['spam_prevention'] = not CONFIG['spam_prevention']
+        self.send_bot_msg('*Text Spam Prevention*: *' + str(CONFIG['spam_prevention']) + '*', self.is_client_mod)
 
     def do_snapshot(self):
         """ Toggles 'snapshot' prevention. """
-        if self.user_obj.is_owner or self.user_obj.is_super or self.user_obj.is_mod or self.user_obj.has_power:
-            CONFIG['snapshot'] = not CONFIG['snapshot']
-            self.send_bot_msg('*Snapshot Prevention*: *' + str(CONFIG['snapshot']) + '*', self.is_client_mod)
+        CONFIG['snapshot'] = not CONFIG['snapshot']
+        self.send_bot_msg('*Snapshot Prevention*: *' + str(CONFIG['snapshot']) + '*', self.is_client_mod)
 
     def do_autoclose(self):
         """ Toggles autoclose. """
-        if self.user_obj.is_owner or self.user_obj.is_super or self.user_obj.is_mod or self.user_obj.has_power:
-            CONFIG['auto_close'] = not CONFIG['auto_close']
-            self.send_bot_msg('*Auto closing mobiles/guests/newusers*: *' + str(CONFIG['auto_close']) + '*',
-                              self.is_client_mod)
+        CONFIG['auto_close'] = not CONFIG['auto_close']
+        self.send_bot_msg('*Auto closing mobiles/guests/newusers*: *' + str(CONFIG['auto_close']) + '*',
+                          self.is_client_mod)
 
     def do_ban_mobiles(self):
         """ Toggles ban on all recognised, broadcasting mobile devices. """
-        if self.user_obj.is_owner or self.user_obj.is_super or self.user_obj.is_mod or self.user_obj.has_power:
-            CONFIG['ban_mobiles'] = not CONFIG['ban_mobiles']
-            self.send_bot_msg('*Banning mobile users on cam*: *' + str(CONFIG['ban_mobiles']) + '*', self.is_client_mod)
+        CONFIG['ban_mobiles'] = not CONFIG['ban_mobiles']
+        self.send_bot_msg('*Banning mobile users on cam*: *' + str(CONFIG['ban_mobiles']) + '*', self.is_client_mod)
 
     def do_auto_url_mode(self):
         """ Toggles auto url mode. """
-        if self.user_obj.is_owner or self.user_obj.is_super or self.user_obj.is_mod or self.user_obj.has_power:
-            self.auto_url_mode = not self.auto_url_mode
-            self.send_bot_msg('*Auto-Url Mode*: *' + str(self.auto_url_mode) + '*', self.is_client_mod)
+        self.auto_url_mode = not self.auto_url_mode
+        self.send_bot_msg('*Auto-Url Mode*: *' + str(self.auto_url_mode) + '*', self.is_client_mod)
 
     def do_playlist_mode(self):
         """ Toggles playlist mode. """
-        if self.user_obj.is_owner or self.user_obj.is_super or self.user_obj.is_mod or self.user_obj.has_power:
-            self.playlist_mode = not self.playlist_mode
-            self.send_bot_msg('*Playlist Mode: *' + str(self.playlist_mode), self.is_client_mod)
+        self.playlist_mode = not self.playlist_mode
+        self.send_bot_msg('*Playlist Mode: *' + str(self.playlist_mode), self.is_client_mod)
 
     def do_guest_nick_ban(self):
         """ Toggles guest nickname banning. """
-        if self.user_obj.is_owner or self.user_obj.is_super or self.user_obj.is_mod or self.user_obj.has_power:
-            CONFIG['guest_nick_ban'] = not CONFIG['guest_nick_ban']
-            self.send_bot_msg('*Banning "guests-"*: *' + str(CONFIG['guest_nick_ban']) + '*', self.is_client_mod)
+        CONFIG['guest_nick_ban'] = not CONFIG['guest_nick_ban']
+        self.send_bot_msg('*Banning "guests-"*: *' + str(CONFIG['guest_nick_ban']) + '*', self.is_client_mod)
 
     def do_newuser_user_ban(self):
         """ Toggles new user banning. """
-        if self.user_obj.is_owner or self.user_obj.is_super or self.user_obj.is_mod or self.user_obj.has_power:
-            CONFIG['new_user_ban'] = not CONFIG['new_user_ban']
-            self.send_bot_msg('*Newuser banning*: *' + str(CONFIG['new_user_ban']) + '*', self.is_client_mod)
+        CONFIG['new_user_ban'] = not CONFIG['new_user_ban']
+        self.send_bot_msg('*Newuser banning*: *' + str(CONFIG['new_user_ban']) + '*', self.is_client_mod)
 
     def do_camblock(self, on_block):
         """
         Adds a user to the cam-blocked list to prevent them from camming up temporarily.
         :param: on_block: str the nick name of the user who may or may not be in the blocked list.
         """
-        if self.user_obj.is_owner or self.user_obj.is_super or self.user_obj.is_mod or self.user_obj.has_power:
-            if len(on_block) is 0:
-                self.send_bot_msg(special_unicode['indicate'] + ' Please state a user to cam block.',
-                                  self.is_client_mod)
-            else:
-                user = self.find_user_info(on_block)
-                if user is not None:
-                    if user.nick not in self.cam_blocked:
-                        self.cam_blocked.append(user.nick)
-                        self.send_close_user_msg(user.nick)
-                        self.send_bot_msg(special_unicode['check_mark'] + ' *' + special_unicode['no_width'] +
-                                          user.nick + special_unicode['no_width'] + '* is now cam blocked.',
-                                          self.is_client_mod)
-                    else:
-                        self.cam_blocked.remove(user.nick)
-                        self.send_bot_msg(special_unicode['cross_mark'] + ' *' + special_unicode['no_width'] +
-                                          user.nick + special_unicode['no_width'] + '* is no longer cam blocked.',
-                                          self.is_client_mod)
+        if len(on_block) is 0:
+            self.send_bot_msg(special_unicode['indicate'] + ' Please state a user to cam block.',
+                              self.is_client_mod)
+        else:
+            user = self.find_user_info(on_block)
+            if user is not None:
+                if user.nick not in self.cam_blocked:
+                    self.cam_blocked.append(user.nick)
+                    self.send_close_user_msg(user.nick)
+                    self.send_bot_msg(special_unicode['check_mark'] + ' *' + special_unicode['no_width'] +
+                                      user.nick + special_unicode['no_width'] + '* is now cam blocked.',
+                                      self.is_client_mod)
                 else:
-                    self.send_bot_msg(special_unicode['indicate'] + ' The user you stated does not exist.',
+                    self.cam_blocked.remove(user.nick)
+                    self.send_bot_msg(special_unicode['cross_mark'] + ' *' + special_unicode['no_width'] +
+                                      user.nick + special_unicode['no_width'] + '* is no longer cam blocked.',
                                       self.is_client_mod)
+            else:
+                self.send_bot_msg(special_unicode['indicate'] + ' The user you stated does not exist.',
+                                  self.is_client_mod)
 
     def do_mute(self):
         """ Sends a room mute microphone message to all broadcasting users. """
-        if self.user_obj.is_owner or self.user_obj.is_super or self.user_obj.is_mod or self.user_obj.has_power:
-            self.send_mute_msg()
+        self.send_mute_msg()
 
     def do_instant_push2talk(self):
         """ Sets microphones broadcasts to 'push2talk'. """
-        if self.user_obj.is_owner or self.user_obj.is_super or self.user_obj.is_mod or self.user_obj.has_power:
-            self.send_push2talk_msg()
+        self.send_push2talk_msg()
 
     def do_auto_pm(self):
         """ Toggles on the automatic room private message. """
-        if self.user_obj.is_owner or self.user_obj.is_super or self.user_obj.is_mod or self.user_obj.has_power:
-            if len(CONFIG['pm_msg']) is not 0:
-                CONFIG['auto_pm'] = not CONFIG['auto_pm']
-                self.send_bot_msg('*Auto PM*: *' + str(CONFIG['auto_pm']) + '*', self.is_client_mod)
-            else:
-                self.send_bot_msg(special_unicode['no_width'] + ' There is no PM message set in the configuraton.',
-                                  self.is_client_mod)
+        if len(CONFIG['pm_msg']) is not 0:
+            CONFIG['auto_pm'] = not CONFIG['auto_pm']
+            self.send_bot_msg('*Auto PM*: *' + str(CONFIG['auto_pm']) + '*', self.is_client_mod)
+        else:
+            self.send_bot_msg(special_unicode['no_width'] + ' There is no PM message set in the configuraton.',
+                              self.is_client_mod)
 
 
     def do_private_room(self):
         """" Sets room to private room. """
-        if self.user_obj.is_owner or self.user_obj.is_super or self.user_obj.is_mod or self.user_obj.has_power:
-            self.send_private_room_msg()
-            self.private_room = not self.private_room
-            self.send_bot_msg('Private Room is now set to: *' + str(self.private_room) + '*', self.is_client_mod)
+        self.send_private_room_msg()
+        self.private_room = not self.private_room
+        self.send_bot_msg('Private Room is now set to: *' + str(self.private_room) + '*', self.is_client_mod)
 
     def do_botter(self, new_botter):
         """
@@ -1121,49 +1177,40 @@ class TinychatBot(pinylib.TinychatRTMPClient):
         :param new_botter: str the nick name of the user to bot.
         """
 
-        if self.user_obj.is_owner or self.user_obj.is_super or self.user_obj.is_mod:
-            if len(new_botter) is 0:
-                self.send_bot_msg(special_unicode['indicate'] + ' Please state a nickname to bot.', self.is_client_mod)
-            else:
-                bot_user = self.find_user_info(new_botter)
-                if not bot_user.is_owner or not bot_user.is_mod:
-                    if bot_user is not None:
-
-                        # Adding new botters
-                        if bot_user.user_account and bot_user.user_account not in self.botteraccounts:
-                            self.botteraccounts.append(bot_user.user_account)
-                            pinylib.fh.file_writer(CONFIG['path'], CONFIG['botteraccounts'],
-                                                    str(bot_user.user_account))
-                            self.send_bot_msg(special_unicode['black_star'] + " *" + new_botter + '*' +
-                                              ' was added as a botter.', self.is_client_mod)
-
-                        elif not bot_user.user_account and bot_user.nick not in self.botters:
-                            self.botters.append(bot_user.nick)
-                            self.send_bot_msg(special_unicode['black_star'] + " *" + new_botter + '*' +
-                                              ' was added as a temporary botter.', self.is_client_mod)
+        if len(new_botter) is 0:
+            self.send_bot_msg(special_unicode['indicate'] + ' Please state a nickname to bot.', self.is_client_mod)
+        else:
+            bot_user = self.find_user_info(new_botter)
+            if bot_user is None:
+                self.send_bot_msg(special_unicode['indicate'] + ' No user named: ' + new_botter,
+                                  self.is_client_mod)
+            elif not bot_user.roles & PRIVILEGE_MOD:
+
+                # Adding new botters
+                if bot_user.user_account and bot_user.user_account not in self.botteraccounts:
+                    self.botteraccounts.add(str(bot_user.user_account))
+                    bot_user.has_power = True
+                    self.send_bot_msg(special_unicode['black_star'] + " *" + new_botter + '*' +
+                                      ' was added as a botter.', self.is_client_mod)
+
+                elif not bot_user.user_account and bot_user.nick not in self.botters:
+                    self.botters.add(bot_user.nick)
+                    bot_user.has_power = True
+                    self.send_bot_msg(special_unicode['black_star'] + " *" + new_botter + '*' +
+                                      ' was added as a temporary botter.', self.is_client_mod)
 
-                        else:
-                            # Removing existing botters
-                            if bot_user.user_account:
-                                for x in range(len(self.botteraccounts)):
-                                    if self.botteraccounts[x] == bot_user.user_account:
-                                        del self.botteraccounts[x]
-                                        pinylib.fh.remove_from_file(CONFIG['path'], CONFIG['botteraccounts'],
-                                                                    str(bot_user.nick))
-                                        break
-                            else:
-                                for x in range(len(self.botters)):
-                                    if self.botters[x] == bot_user.nick:
-                                        del self.botters[x]
-                                        break
-                            self.send_bot_msg(special_unicode['white_star'] + ' *' + new_botter +
-                                              '* was removed from botting.', self.is_client_mod)
-                    else:
-                        self.send_bot_msg(special_unicode['indicate'] + ' No user named: ' + new_botter,
-                                          self.is_client_mod)
                 else:
-                    self.send_bot_msg(special_unicode['indicate'] +
-                                      ' This user already has privileges. No need to bot.', self.is_client_mod)
+                    # Removing existing botters
+                    if bot_user.user_account:
+                        self.botteraccounts.remove(str(bot_user.user_account))
+                    else:
+                        self.botters.discard(bot_user.nick)
+                    bot_user.has_power = False
+                    self.send_bot_msg(special_unicode['white_star'] + ' *' + new_botter +
+                                      '* was removed from botting.', self.is_client_mod)
+            else:
+                self.send_bot_msg(special_unicode['indicate'] +
+                                  ' This user already has privileges. No need to bot.', self.is_client_mod)
 
     def do_autoforgive(self, new_autoforgive):
         """
@@ -1172,97 +1219,86 @@ class TinychatBot(pinylib.TinychatRTMPClient):
         :param new_autoforgive: str the nick name of the user to add to autoforgive.
         """
 
-        if self.user_obj.is_owner or self.user_obj.is_super or self.user_obj.is_mod:
-            if len(new_autoforgive) is not 0:
-                autoforgive_user = self.find_user_info(new_autoforgive)
-                if autoforgive_user is not None:
-                    if autoforgive_user.user_account and autoforgive_user.user_account not in self.autoforgive:
-                        self.autoforgive.append(autoforgive_user.user_account)
-                        self.send_bot_msg(special_unicode['black_heart'] + ' *' + special_unicode['no_width'] +
-                                          new_autoforgive + special_unicode['no_width'] + '*' +
-                                          ' is now protected.', self.is_client_mod)
-                        pinylib.fh.file_writer(CONFIG['path'], CONFIG['autoforgive'], autoforgive_user.user_account)
-                    elif not autoforgive_user.user_account:
-                        self.send_bot_msg(
-                            special_unicode['indicate'] + ' Protection is only available to users with accounts.',
-                            self.is_client_mod)
-                    else:
-                        for x in range(len(self.autoforgive)):
-                            if self.autoforgive[x] == autoforgive_user.user_account:
-                                del self.autoforgive[x]
-                                pinylib.fh.remove_from_file(CONFIG['path'], CONFIG['autoforgive'],
-                                                            autoforgive_user.user_account)
-                                self.send_bot_msg(special_unicode['white_heart'] + ' *' + special_unicode['no_width'] +
-                                                  new_autoforgive + special_unicode['no_width'] +
-                                                  '* is no longer protected.', self.is_client_mod)
-                                break
+        if len(new_autoforgive) is not 0:
+            autoforgive_user = self.find_user_info(new_autoforgive)
+            if autoforgive_user is not None:
+                if autoforgive_user.user_account and autoforgive_user.user_account not in self.autoforgive:
+                    self.autoforgive.add(autoforgive_user.user_account)
+                    self.send_bot_msg(special_unicode['black_heart'] + ' *' + special_unicode['no_width'] +
+                                      new_autoforgive + special_unicode['no_width'] + '*' +
+                                      ' is now protected.', self.is_client_mod)
+                elif not autoforgive_user.user_account:
+                    self.send_bot_msg(
+                        special_unicode['indicate'] + ' Protection is only available to users with accounts.',
+                        self.is_client_mod)
                 else:
-                    self.send_bot_msg(special_unicode['indicate'] + ' No user named: ' + new_autoforgive,
-                                      self.is_client_mod)
+                    if self.autoforgive.remove(autoforgive_user.user_account):
+                        self.send_bot_msg(special_unicode['white_heart'] + ' *' + special_unicode['no_width'] +
+                                          new_autoforgive + special_unicode['no_width'] +
+                                          '* is no longer protected.', self.is_client_mod)
             else:
-                self.send_bot_msg(special_unicode['indicate'] + ' Please state a nickname to protect.',
+                self.send_bot_msg(special_unicode['indicate'] + ' No user named: ' + new_autoforgive,
                                   self.is_client_mod)
+        else:
+            self.send_bot_msg(special_unicode['indicate'] + ' Please state a nickname to protect.',
+                              self.is_client_mod)
 
     def do_close_broadcast(self, nick_name):
         """
         Close a user broadcasting.
         :param nick_name: str the nickname to close.
         """
-        if self.user_obj.is_owner or self.user_obj.is_super or self.user_obj.is_mod or self.user_obj.has_power:
-            if self.is_client_mod:
-                if len(nick_name) is 0:
-                    self.send_bot_msg(special_unicode['indicate'] + ' Missing nickname.', self.is_client_mod)
+        if self.is_client_mod:
+            if len(nick_name) is 0:
+                self.send_bot_msg(special_unicode['indicate'] + ' Missing nickname.', self.is_client_mod)
+            else:
+                user = self.find_user_info(nick_name)
+                if user is not None:
+                    self.send_close_user_msg(nick_name)
                 else:
-                    user = self.find_user_info(nick_name)
-                    if user is not None:
-                        self.send_close_user_msg(nick_name)
-                    else:
-                        self.send_bot_msg(special_unicode['indicate'] + ' No nickname called: ' +
-                                          nick_name, self.is_client_mod)
+                    self.send_bot_msg(special_unicode['indicate'] + ' No nickname called: ' +
+                                      nick_name, self.is_client_mod)
 
     def do_clear(self):
         """ Clears the chat-box. """
-        if self.user_obj.is_owner or self.user_obj.is_super or self.user_obj.is_mod or self.user_obj.has_power:
-            if self.is_client_mod:
-                for x in range(0, 25):
-                    self.send_owner_run_msg(' ')
-            else:
-                clear = '133,133,133,133,133,133,133,133,133,133,133,133,133,133,133,133,133,133,133' \
-                        '133,133,133,133,133,133,133,133,133,133,133,133,133,133,133,133,133,133,133'
-                self._send_command('privmsg', [clear, u'#262626,en'])
-            self.send_bot_msg(special_unicode['state'] + ' *The chat was cleared by ' + str(self.user_obj.nick) + '*',
-                              self.is_client_mod)
+        if self.is_client_mod:
+            for x in range(0, 25):
+                self.send_owner_run_msg(' ')
+        else:
+            clear = '133,133,133,133,133,133,133,133,133,133,133,133,133,133,133,133,133,133,133' \
+                    '133,133,133,133,133,133,133,133,133,133,133,133,133,133,133,133,133,133,133'
+            self._send_command('privmsg', [clear, u'#262626,en'])
+        self.send_bot_msg(special_unicode['state'] + ' *The chat was cleared by ' + str(self.user_obj.nick) + '*',
+                          self.is_client_mod)
 
     def do_nick(self, new_nick):
         """
         Set a new nick for the bot.
         :param new_nick: str the new nick.
         """
-        if self.user_obj.is_owner or self.user_obj.is_super or self.user_obj.is_mod or self.user_obj.has_power:
-            if len(new_nick) is 0:
-                self.client_nick = pinylib.create_random_string(5, 25)
+        if len(new_nick) is 0:
+            self.client_nick = pinylib.create_random_string(5, 25)
+            self.set_nick()
+        else:
+            if re.match('^[][\{\}a-zA-Z0-9_-]{1,25}$', new_nick):
+                self.client_nick = new_nick
                 self.set_nick()
-            else:
-                if re.match('^[][\{\}a-zA-Z0-9_-]{1,25}$', new_nick):
-                    self.client_nick = new_nick
-                    self.set_nick()
 
     def do_topic(self, topic):
         """
         Sets the room topic.
         :param topic: str the new topic.
         """
-        if self.user_obj.is_owner or self.user_obj.is_super or self.user_obj.is_mod or self.user_obj.has_power:
-            if self.is_client_mod:
-                if len(topic) is 0:
-                    self.send_topic_msg('')
-                    self.send_bot_msg('Topic was *cleared&.', self.is_client_mod)
-                else:
-                    self.send_topic_msg(topic)
-                    self.send_bot_msg(special_unicode['state'] + ' The *room topic* was set to: ' + topic,
-                                      self.is_client_mod)
+        if self.is_client_mod:
+            if len(topic) is 0:
+                self.send_topic_msg('')
+                self.send_bot_msg('Topic was *cleared&.', self.is_client_mod)
             else:
-                self.send_bot_msg('Command not enabled.')
+                self.send_topic_msg(topic)
+                self.send_bot_msg(special_unicode['state'] + ' The *room topic* was set to: ' + topic,
+                                  self.is_client_mod)
+        else:
+            self.send_bot_msg('Command not enabled.')
 
     def do_current_topic(self):
         """ Replies to the user what the current room topic is. """
@@ -1275,73 +1311,71 @@ class TinychatBot(pinylib.TinychatRTMPClient):
         :param ban: boolean True/False respectively if the user should be banned or not.
         :param discrete: boolean True/False respectively if the user to ban should be banned discretely.
         """
-        if self.user_obj.is_owner or self.user_obj.is_super or self.user_obj.is_mod or self.user_obj.has_power:
-            if self.is_client_mod:
-                if len(nick_name) is 0:
-                    if not discrete:
-                        self.send_bot_msg(special_unicode['indicate'] + ' Missing nickname.', self.is_client_mod)
-                elif nick_name == self.client_nick:
-                    if not discrete:
-                        self.send_bot_msg(special_unicode['indicate'] + ' Action not allowed.', self.is_client_mod)
-                else:
-                    user = self.find_user_info(nick_name)
-                    if user is not None:
-                        if user.is_owner or user.is_super or user.is_mod:
+        if self.is_client_mod:
+            if len(nick_name) is 0:
+                if not discrete:
+                    self.send_bot_msg(special_unicode['indicate'] + ' Missing nickname.', self.is_client_mod)
+            elif nick_name == self.client_nick:
+                if not discrete:
+                    self.send_bot_msg(special_unicode['indicate'] + ' Action not allowed.', self.is_client_mod)
+            else:
+                user = self.find_user_info(nick_name)
+                if user is not None:
+                    if user.roles & PRIVILEGE_MOD:
+                        if not discrete:
+                            self.send_bot_msg(special_unicode['indicate'] +
+                                              ' You cannot kick/ban a user with privileges.', self.is_client_mod)
+                        return
+
+                    if not self.user_obj.roles & PRIVILEGE_MOD:
+                        if user.nick in self.botters:
                             if not discrete:
                                 self.send_bot_msg(special_unicode['indicate'] +
-                                                  ' You cannot kick/ban a user with privileges.', self.is_client_mod)
+                                                  ' You cannot kick/ban a botter.', self.is_client_mod)
                             return
-
-                        if not self.user_obj.is_owner or not self.user_obj.is_super or not self.user_obj.is_mod:
-                            if user.nick in self.botters:
+                        elif user.user_account:
+                            if user.user_account in self.botteraccounts:
                                 if not discrete:
                                     self.send_bot_msg(special_unicode['indicate'] +
-                                                      ' You cannot kick/ban a botter.', self.is_client_mod)
+                                                      ' You cannot kick/ban a verified botter.', self.is_client_mod)
                                 return
-                            elif user.user_account:
-                                if user.user_account in self.botteraccounts:
-                                    if not discrete:
-                                        self.send_bot_msg(special_unicode['indicate'] +
-                                                          ' You cannot kick/ban a verified botter.', self.is_client_mod)
-                                    return
 
-                        self.send_ban_msg(user.nick, user.id)
-                        if not ban:
-                            self.send_forgive_msg(user.id)
+                    self.send_ban_msg(user.nick, user.id)
+                    if not ban:
+                        self.send_forgive_msg(user.id)
 
-                    else:
-                        if not discrete:
-                            self.send_bot_msg(special_unicode['indicate'] + ' No user named: *' +
-                                              special_unicode['no_width'] + nick_name + special_unicode['no_width'] +
-                                              '*', self.is_client_mod)
-            else:
-                if not discrete:
-                    self.send_bot_msg('Command not enabled.')
+                else:
+                    if not discrete:
+                        self.send_bot_msg(special_unicode['indicate'] + ' No user named: *' +
+                                          special_unicode['no_width'] + nick_name + special_unicode['no_width'] +
+                                          '*', self.is_client_mod)
+        else:
+            if not discrete:
+                self.send_bot_msg('Command not enabled.')
 
     def do_forgive(self, nick_name):
         """
         Forgive a user based on if their user id (uid) is found in the room's ban list.
         :param nick_name: str the nick name of the user that was banned.
         """
-        if self.user_obj.is_owner or self.user_obj.is_super or self.user_obj.is_mod or self.user_obj.has_power:
-            if len(self.room_banlist) > 0:
-                if len(nick_name) is not 0:
-                    if nick_name in self.room_banlist:
-                        uid = self.room_banlist[nick_name]
-                        self.send_forgive_msg(str(uid))
-                        self.send_bot_msg('*' + special_unicode['no_width'] + nick_name + special_unicode['no_width'] +
-                                          '* has been forgiven.', self.is_client_mod)
-                    else:
-                        self.send_bot_msg(special_unicode['indicate'] + ' The user was not found in the banlist.', self.is_client_mod)
+        if len(self.room_banlist) > 0:
+            if len(nick_name) is not 0:
+                if nick_name in self.room_banlist:
+                    uid = self.room_banlist[nick_name]
+                    self.send_forgive_msg(str(uid))
+                    self.send_bot_msg('*' + special_unicode['no_width'] + nick_name + special_unicode['no_width'] +
+                                      '* has been forgiven.', self.is_client_mod)
                 else:
-                    self.send_bot_msg(special_unicode['indicate'] + ' Please state a nick to forgive from the ban list.',
-                                      self.is_client_mod)
+                    self.send_bot_msg(special_unicode['indicate'] + ' The user was not found in the banlist.', self.is_client_mod)
             else:
-                self.send_bot_msg('The *banlist is empty*. No one to forgive.', self.is_client_mod)
+                self.send_bot_msg(special_unicode['indicate'] + ' Please state a nick to forgive from the ban list.',
+                                  self.is_client_mod)
+        else:
+            self.send_bot_msg('The *banlist is empty*. No one to forgive.', self.is_client_mod)
 
     def do_forgive_all(self):
         """ Forgive all the user in the banlist. """
-        if self.user_obj.is_owner or self.user_obj.is_super or self.user_obj.is_mod or self.user_obj.has_power:
+        if self.user_obj.roles & PRIVILEGE_POWER:
             if not self.forgive_all:
                 self.send_undercover_msg(self.user_obj.nick, 'Now *forgiving all* users in the banlist...')
                 self.forgive_all = True
@@ -1357,114 +1391,97 @@ class TinychatBot(pinylib.TinychatRTMPClient):
         Adds a bad username to the bad nicks file.
         :param bad_nick: str the bad nick to write to file.
         """
-        if self.user_obj.is_owner or self.user_obj.is_super or self.user_obj.is_mod or self.user_obj.has_power:
-            if self.is_client_mod:
-                if len(bad_nick) is 0:
-                    self.send_bot_msg(special_unicode['indicate'] + ' Missing nickname.', self.is_client_mod)
+        if self.is_client_mod:
+            if len(bad_nick) is 0:
+                self.send_bot_msg(special_unicode['indicate'] + ' Missing nickname.', self.is_client_mod)
+            else:
+                if not self.bad_nicks.add(bad_nick):
+                    self.send_bot_msg(bad_nick + ' is already in list.', self.is_client_mod)
                 else:
-                    badnicks = pinylib.fh.file_reader(CONFIG['path'], CONFIG['badnicks'])
-                    if badnicks is None:
-                        pinylib.fh.file_writer(CONFIG['path'], CONFIG['badnicks'], bad_nick)
-                    else:
-                        if bad_nick in badnicks:
-                            self.send_bot_msg(bad_nick + ' is already in list.', self.is_client_mod)
-                        else:
-                            pinylib.fh.file_writer(CONFIG['path'], CONFIG['badnicks'], bad_nick)
-                            self.send_bot_msg('*' + bad_nick + '* was added to file.', self.is_client_mod)
-                            if bad_nick in self.room_users.keys():
-                                bn_user = self.find_user_info(bad_nick)
-                                self.send_ban_msg(bn_user.nick, bn_user.id)
+                    self.send_bot_msg('*' + bad_nick + '* was added to file.', self.is_client_mod)
+                    bn_user = self.find_user_info(bad_nick)
+                    if bn_user is not None:
+                        self.send_ban_msg(bn_user.nick, bn_user.id)
 
     def do_remove_bad_nick(self, bad_nick):
         """
         Removes a bad nick from bad nicks file.
         :param bad_nick: str the bad nick to remove from file.
         """
-        if self.user_obj.is_owner or self.user_obj.is_super or self.user_obj.is_mod or self.user_obj.has_power:
-            if self.is_client_mod:
-                if len(bad_nick) is 0:
-                    self.send_bot_msg(special_unicode['indicate'] + ' Missing nickname', self.is_client_mod)
-                else:
-                    rem = pinylib.fh.remove_from_file(CONFIG['path'], CONFIG['badnicks'], bad_nick)
-                    if rem:
-                        self.send_bot_msg(bad_nick + ' was removed.', self.is_client_mod)
+        if self.is_client_mod:
+            if len(bad_nick) is 0:
+                self.send_bot_msg(special_unicode['indicate'] + ' Missing nickname', self.is_client_mod)
+            else:
+                if self.bad_nicks.remove(bad_nick):
+                    self.send_bot_msg(bad_nick + ' was removed.', self.is_client_mod)
 
     def do_bad_string(self, bad_string):
         """
         Adds a bad string to the bad strings file.
         :param bad_string: str the bad string to add to file.
         """
-        if self.user_obj.is_owner or self.user_obj.is_super or self.user_obj.is_mod or self.user_obj.has_power:
-            if self.is_client_mod:
-                if len(bad_string) is 0:
-                    self.send_bot_msg(special_unicode['indicate'] + ' Bad string can\'t be blank.', self.is_client_mod)
-                elif len(bad_string) < 3:
-                    self.send_bot_msg(special_unicode['indicate'] + ' Bad string to short: ' + str(len(bad_string)), self.is_client_mod)
+        if self.is_client_mod:
+            if len(bad_string) is 0:
+                self.send_bot_msg(special_unicode['indicate'] + ' Bad string can\'t be blank.', self.is_client_mod)
+            elif len(bad_string) < 3:
+                self.send_bot_msg(special_unicode['indicate'] + ' Bad string to short: ' + str(len(bad_string)), self.is_client_mod)
+            else:
+                bad_strings = pinylib.fh.file_reader(CONFIG['path'], CONFIG['badstrings'])
+                if bad_strings is None:
+                    pinylib.fh.file_writer(CONFIG['path'], CONFIG['badstrings'], bad_string)
+                    self.bad_strings.invalidate()
                 else:
-                    bad_strings = pinylib.fh.file_reader(CONFIG['path'], CONFIG['badstrings'])
-                    if bad_strings is None:
-                        pinylib.fh.file_writer(CONFIG['path'], CONFIG['badstrings'], bad_string)
+                    if bad_string in bad_strings:
+                        self.send_bot_msg(bad_string + ' is already in list.', self.is_client_mod)
                     else:
-                        if bad_string in bad_strings:
-                            self.send_bot_msg(bad_string + ' is already in list.', self.is_client_mod)
-                        else:
-                            pinylib.fh.file_writer(CONFIG['path'], CONFIG['badstrings'], bad_string)
-                            self.send_bot_msg('*' + bad_string + '* was added to file.', self.is_client_mod)
+                        pinylib.fh.file_writer(CONFIG['path'], CONFIG['badstrings'], bad_string)
+                        self.bad_strings.invalidate()
+                        self.send_bot_msg('*' + bad_string + '* was added to file.', self.is_client_mod)
 
     def do_remove_bad_string(self, bad_string):
         """
         Removes a bad string from the bad strings file.
         :param bad_string: str the bad string to remove from file.
         """
-        if self.user_obj.is_owner or self.user_obj.is_super or self.user_obj.is_mod or self.user_obj.has_power:
-            if self.is_client_mod:
-                if len(bad_string) is 0:
-                    self.send_bot_msg(special_unicode['indicate'] + ' Missing word string.', self.is_client_mod)
-                else:
-                    rem = pinylib.fh.remove_from_file(CONFIG['path'], CONFIG['badstrings'], bad_string)
-                    if rem:
-                        self.send_bot_msg(bad_string + ' was removed.', self.is_client_mod)
+        if self.is_client_mod:
+            if len(bad_string) is 0:
+                self.send_bot_msg(special_unicode['indicate'] + ' Missing word string.', self.is_client_mod)
+            else:
+                rem = pinylib.fh.remove_from_file(CONFIG['path'], CONFIG['badstrings'], bad_string)
+                if rem:
+                    self.bad_strings.invalidate()
+                    self.send_bot_msg(bad_string + ' was removed.', self.is_client_mod)
 
     def do_bad_account(self, bad_account_name):
         """
         Adds a bad account name to the bad accounts file.
         :param bad_account_name: str the bad account name to file.
         """
-        if self.user_obj.is_owner or self.user_obj.is_super or self.user_obj.is_mod or self.user_obj.has_power:
-            if self.is_client_mod:
-                if len(bad_account_name) is 0:
-                    self.send_bot_msg(special_unicode['indicate'] + ' Account can\'t be blank.', self.is_client_mod)
-                elif len(bad_account_name) < 3:
-                    self.send_bot_msg(special_unicode['indicate'] + ' Account to short: ' + str(len(bad_account_name)), self.is_client_mod)
+        if self.is_client_mod:
+            if len(bad_account_name) is 0:
+                self.send_bot_msg(special_unicode['indicate'] + ' Account can\'t be blank.', self.is_client_mod)
+            elif len(bad_account_name) < 3:
+                self.send_bot_msg(special_unicode['indicate'] + ' Account to short: ' + str(len(bad_account_name)), self.is_client_mod)
+            else:
+                if not self.bad_accounts.add(bad_account_name):
+                    self.send_bot_msg(bad_account_name + ' is already in list.', self.is_client_mod)
                 else:
-                    bad_accounts = pinylib.fh.file_reader(CONFIG['path'], CONFIG['badaccounts'])
-                    if bad_accounts is None:
-                        pinylib.fh.file_writer(CONFIG['path'], CONFIG['badaccounts'], bad_account_name)
-                    else:
-                        if bad_account_name in bad_accounts:
-                            self.send_bot_msg(bad_account_name + ' is already in list.', self.is_client_mod)
-                        else:
-                            pinylib.fh.file_writer(CONFIG['path'], CONFIG['badaccounts'], bad_account_name)
-                            self.send_bot_msg('*' + bad_account_name + '* was added to file.', self.is_client_mod)
-                            for key in self.room_users.keys():
-                                user = self.find_user_info(key)
-                                if user.user_account == bad_account_name:
-                                    self.send_ban_msg(user.nick, user.id)
-                                    break
+                    self.send_bot_msg('*' + bad_account_name + '* was added to file.', self.is_client_mod)
+                    user = self.room_users.find_by_account(bad_account_name)
+                    if user is not None:
+                        self.send_ban_msg(user.nick, user.id)
 
     def do_remove_bad_account(self, bad_account):
         """
         Removes a bad account from the bad accounts file.
         :param bad_account: str the bad account name to remove from file.
         """
-        if self.user_obj.is_owner or self.user_obj.is_super or self.user_obj.is_mod or self.user_obj.has_power:
-            if self.is_client_mod:
-                if len(bad_account) is 0:
-                    self.send_bot_msg(special_unicode['indicate'] + ' Missing account.', self.is_client_mod)
-                else:
-                    rem = pinylib.fh.remove_from_file(CONFIG['path'], CONFIG['badaccounts'], bad_account)
-                    if rem:
-                        self.send_bot_msg(bad_account + ' was removed.', self.is_client_mod)
+        if self.is_client_mod:
+            if len(bad_account) is 0:
+                self.send_bot_msg(special_unicode['indicate'] + ' Missing account.', self.is_client_mod)
+            else:
+                if self.bad_accounts.remove(bad_account):
+                    self.send_bot_msg(bad_account + ' was removed.', self.is_client_mod)
 
     # TODO: Enhance this function by making only request to the right type of list that is
     #       required, so the file reader code line is stated once in the procedure.
@@ -1473,192 +1490,185 @@ class TinychatBot(pinylib.TinychatRTMPClient):
         Shows info of different lists/files.
         :param list_type: str the type of list to find info for.
         """
-        if self.user_obj.is_owner or self.user_obj.is_super or self.user_obj.is_mod or self.user_obj.has_power:
-            if self.is_client_mod:
-                if len(list_type) is 0:
-                    self.send_bot_msg(special_unicode['indicate'] + ' Missing list type.', self.is_client_mod)
-                else:
-                    if list_type.lower() == 'bn':
-                        bad_nicks = pinylib.fh.file_reader(CONFIG['path'], CONFIG['badnicks'])
-                        if bad_nicks is None:
-                            self.send_bot_msg(special_unicode['indicate'] + ' No items in this list.',
-                                              self.is_client_mod)
-                        else:
-                            self.send_bot_msg(str(len(bad_nicks)) + ' bad nicks in list.', self.is_client_mod)
+        if self.is_client_mod:
+            if len(list_type) is 0:
+                self.send_bot_msg(special_unicode['indicate'] + ' Missing list type.', self.is_client_mod)
+            else:
+                if list_type.lower() == 'bn':
+                    if not len(self.bad_nicks):
+                        self.send_bot_msg(special_unicode['indicate'] + ' No items in this list.',
+                                          self.is_client_mod)
+                    else:
+                        self.send_bot_msg(str(len(self.bad_nicks)) + ' bad nicks in list.', self.is_client_mod)
 
-                    elif list_type.lower() == 'bs':
-                        bad_strings = pinylib.fh.file_reader(CONFIG['path'], CONFIG['badstrings'])
-                        if bad_strings is None:
-                            self.send_bot_msg(special_unicode['indicate'] + ' No items in this list.',
-                                              self.is_client_mod)
-                        else:
-                            self.send_bot_msg(str(len(bad_strings)) + ' bad strings in list.', self.is_client_mod)
+                elif list_type.lower() == 'bs':
+                    bad_strings = pinylib.fh.file_reader(CONFIG['path'], CONFIG['badstrings'])
+                    if bad_strings is None:
+                        self.send_bot_msg(special_unicode['indicate'] + ' No items in this list.',
+                                          self.is_client_mod)
+                    else:
+                        self.send_bot_msg(str(len(bad_strings)) + ' bad strings in list.', self.is_client_mod)
 
-                    elif list_type.lower() == 'ba':
-                        bad_accounts = pinylib.fh.file_reader(CONFIG['path'], CONFIG['badaccounts'])
-                        if bad_accounts is None:
-                            self.send_bot_msg(special_unicode['indicate'] + ' No items in this list.',
-                                              self.is_client_mod)
-                        else:
-                            self.send_bot_msg(str(len(bad_accounts)) + ' bad accounts in list.', self.is_client_mod)
-
-                    elif list_type.lower() == 'pl':
-                        if len(self.playlist) is not 0:
-                            i_count = 0
-                            for i in range(self.inowplay, len(self.playlist)):
-                                v_time = self.to_human_time(self.playlist[i]['video_time'])
-                                v_title = self.playlist[i]['video_title']
-                                if i_count <= 4:
-                                    if i_count == 0:
-                                        self.send_owner_run_msg(
-                                            special_unicode['state'] + ' (%s) *Next tune:*  *%s* %s' % (
-                                                i, v_title, v_time))
-                                    else:
-                                        self.send_owner_run_msg('(%s) *%s* %s' % (i, v_title, v_time))
-                                    i_count += 1
-                        else:
-                            self.send_owner_run_msg(special_unicode['indicate'] + ' No items in the playlist.')
+                elif list_type.lower() == 'ba':
+                    if not len(self.bad_accounts):
+                        self.send_bot_msg(special_unicode['indicate'] + ' No items in this list.',
+                                          self.is_client_mod)
+                    else:
+                        self.send_bot_msg(str(len(self.bad_accounts)) + ' bad accounts in list.',
+                                          self.is_client_mod)
 
-                    elif list_type.lower() == 'mods':
-                        if self.is_client_owner and self.user_obj.is_super:
-                            if len(self.privacy_settings.room_moderators) is 0:
-                                self.send_bot_msg('*There is currently no moderators for this room.*',
-                                                  self.is_client_mod)
-                            elif len(self.privacy_settings.room_moderators) is not 0:
-                                mods = ', '.join(self.privacy_settings.room_moderators)
-                                self.send_bot_msg('*Moderators:* ' + mods, self.is_client_mod)
+                elif list_type.lower() == 'pl':
+                    if len(self.playlist) is not 0:
+                        i_count = 0
+                        for i in range(self.inowplay, len(self.playlist)):
+                            v_time = self.to_human_time(self.playlist[i]['video_time'])
+                            v_title = self.playlist[i]['video_title']
+                            if i_count <= 4:
+                                if i_count == 0:
+                                    self.send_owner_run_msg(
+                                        special_unicode['state'] + ' (%s) *Next tune:*  *%s* %s' % (
+                                            i, v_title, v_time))
+                                else:
+                                    self.send_owner_run_msg('(%s) *%s* %s' % (i, v_title, v_time))
+                                i_count += 1
+                    else:
+                        self.send_owner_run_msg(special_unicode['indicate'] + ' No items in the playlist.')
+
+                elif list_type.lower() == 'mods':
+                    if self.is_client_owner and self.user_obj.is_super:
+                        if len(self.privacy_settings.room_moderators) is 0:
+                            self.send_bot_msg('*There is currently no moderators for this room.*',
+                                              self.is_client_mod)
+                        elif len(self.privacy_settings.room_moderators) is not 0:
+                            mods = ', '.join(self.privacy_settings.room_moderators)
+                            self.send_bot_msg('*Moderators:* ' + mods, self.is_client_mod)
 
     def do_user_info(self, nick_name):
         """
         Shows user object info for a given user name.
         :param nick_name: str the nick name of the user to show the info for.
         """
-        if self.user_obj.is_owner or self.user_obj.is_super or self.user_obj.is_mod or self.user_obj.has_power:
-            if self.is_client_mod:
-                if len(nick_name) is 0:
-                    self.send_bot_msg(special_unicode['indicate'] + ' Missing nickname.', self.is_client_mod)
+        if self.is_client_mod:
+            if len(nick_name) is 0:
+                self.send_bot_msg(special_unicode['indicate'] + ' Missing nickname.', self.is_client_mod)
+            else:
+                user = self.find_user_info(nick_name)
+                if user is None:
+                    self.send_bot_msg(special_unicode['indicate'] + ' No user named: ' + nick_name,
+                                      self.is_client_mod)
                 else:
-                    user = self.find_user_info(nick_name)
-                    if user is None:
-                        self.send_bot_msg(special_unicode['indicate'] + ' No user named: ' + nick_name,
-                                          self.is_client_mod)
-                    else:
-                        self.send_owner_run_msg('*ID:* %s' % user.id)
-                        self.send_owner_run_msg('*Owner:* %s' % user.is_owner)
-                        self.send_owner_run_msg('*Is Mod:* %s' % user.is_mod)
-                        self.send_owner_run_msg('*Device Type:* %s' % user.device_type)
-                        if not user.is_owner and not user.is_super and not user.is_mod:
-                            if user.nick or user.user_account in self.botters or self.botteraccounts:
-                                self.send_owner_run_msg('*Bot Privileges:* %s' % user.has_power)
-                        # TODO: It doesn't print user account type or account gift points.
-                        if user.tinychat_id is not None:
-                            self.send_undercover_msg(self.user_obj.nick, '*User Account Type:* %s'
-                                                     % str(user.user_account_type))
-                            self.send_undercover_msg(self.user_obj.nick, '*User Account Gift Points:* %s'
-                                                     % str(user.user_account_giftpoints))
-                            self.send_undercover_msg(self.user_obj.nick, '*Account:* $s' % str(user.user_account))
-                            self.send_undercover_msg(self.user_obj.nick, '*Tinychat ID:* %s' % str(user.tinychat_id))
-                            self.send_undercover_msg(self.user_obj.nick, '*Last login:* %s' % str(user.last_login))
-                        self.send_owner_run_msg('*Last message:* %s' % str(user.last_msg))
+                    self.send_owner_run_msg('*ID:* %s' % user.id)
+                    self.send_owner_run_msg('*Owner:* %s' % user.is_owner)
+                    self.send_owner_run_msg('*Is Mod:* %s' % user.is_mod)
+                    self.send_owner_run_msg('*Device Type:* %s' % user.device_type)
+                    if not user.roles & PRIVILEGE_MOD:
+                        if user.nick in self.botters or user.user_account in self.botteraccounts:
+                            self.send_owner_run_msg('*Bot Privileges:* %s' % user.has_power)
+                    # TODO: It doesn't print user account type or account gift points.
+                    if user.user_account and user.tinychat_id is None:
+                        self.load_user_info(user)
+                    if user.tinychat_id is not None:
+                        self.send_undercover_msg(self.user_obj.nick, '*User Account Type:* %s'
+                                                 % str(user.user_account_type))
+                        self.send_undercover_msg(self.user_obj.nick, '*User Account Gift Points:* %s'
+                                                 % str(user.user_account_giftpoints))
+                        self.send_undercover_msg(self.user_obj.nick, '*Account:* $s' % str(user.user_account))
+                        self.send_undercover_msg(self.user_obj.nick, '*Tinychat ID:* %s' % str(user.tinychat_id))
+                        self.send_undercover_msg(self.user_obj.nick, '*Last login:* %s' % str(user.last_login))
+                    self.send_owner_run_msg('*Last message:* %s' % str(user.last_msg))
 
     def do_youtube_search(self, search_str):
         """
         Searches youtube for a given search term, and adds the results to a list.
         :param search_str: str the search term to search for.
         """
-        if self.user_obj.is_owner or self.user_obj.is_super or self.user_obj.is_mod or self.user_obj.has_power:
-            if self.is_client_mod:
-                if len(search_str) is 0:
-                    self.send_bot_msg(special_unicode['indicate'] + ' Missing search term.', self.is_client_mod)
+        if self.is_client_mod:
+            if len(search_str) is 0:
+                self.send_bot_msg(special_unicode['indicate'] + ' Missing search term.', self.is_client_mod)
+            else:
+                self.search_list = youtube.youtube_search_list(search_str, results=5)
+                if len(self.search_list) is not 0:
+                    for i in range(0, len(self.search_list)):
+                        v_time = self.to_human_time(self.search_list[i]['video_time'])
+                        v_title = self.search_list[i]['video_title']
+                        self.send_owner_run_msg('(%s) *%s* %s' % (i, v_title, v_time))
                 else:
-                    self.search_list = youtube.youtube_search_list(search_str, results=5)
-                    if len(self.search_list) is not 0:
-                        for i in range(0, len(self.search_list)):
-                            v_time = self.to_human_time(self.search_list[i]['video_time'])
-                            v_title = self.search_list[i]['video_title']
-                            self.send_owner_run_msg('(%s) *%s* %s' % (i, v_title, v_time))
-                    else:
-                        self.send_bot_msg(special_unicode['indicate'] + ' Could not find: ' + search_str,
-                                          self.is_client_mod)
+                    self.send_bot_msg(special_unicode['indicate'] + ' Could not find: ' + search_str,
+                                      self.is_client_mod)
 
     def do_play_youtube_search(self, int_choice):
         """
         Plays a youtube from the search list.
         :param int_choice: int the index in the search list to play.
         """
-        if self.user_obj.is_owner or self.user_obj.is_super or self.user_obj.is_mod or self.user_obj.has_power:
-            if self.is_client_mod:
-                if len(self.search_list) > 0:
-                    try:
-                        index_choice = int(int_choice)
-                        if 0 <= index_choice <= 4:
-                            if self.media_timer_thread is not None and self.media_timer_thread.is_alive()\
-                                    and self.playlist_mode:
-                                self.playlist.append(self.search_list[index_choice])
-                                v_time = self.to_human_time(self.search_list[index_choice]['video_time'])
-                                v_title = self.search_list[index_choice]['video_title']
-                                self.send_bot_msg('*(' + str(len(self.playlist) - 1) + ') Added:* ' +
-                                                  v_title + ' *to playlist.* ' + v_time)
-                            else:
-                                self.last_played_media = self.search_list[index_choice]
-                                self.send_media_broadcast_start(self.search_list[index_choice]['type'],
-                                                                self.search_list[index_choice]['video_id'])
-                                self.media_event_timer(self.search_list[index_choice]['video_time'])
+        if self.is_client_mod:
+            if len(self.search_list) > 0:
+                try:
+                    index_choice = int(int_choice)
+                    if 0 <= index_choice <= 4:
+                        if self.media_timer_thread is not None and self.media_timer_thread.is_alive()\
+                                and self.playlist_mode:
+                            self.playlist.append(self.search_list[index_choice])
+                            v_time = self.to_human_time(self.search_list[index_choice]['video_time'])
+                            v_title = self.search_list[index_choice]['video_title']
+                            self.send_bot_msg('*(' + str(len(self.playlist) - 1) + ') Added:* ' +
+                                              v_title + ' *to playlist.* ' + v_time)
                         else:
-                            self.send_bot_msg(special_unicode['indicate'] + ' Please make a choice between 0-4',
-                                              self.is_client_mod)
-                    except ValueError:
-                        self.send_bot_msg(special_unicode['indicate'] + ' Only numbers allowed.', self.is_client_mod)
+                            self.last_played_media = self.search_list[index_choice]
+                            self.send_media_broadcast_start(self.search_list[index_choice]['type'],
+                                                            self.search_list[index_choice]['video_id'])
+                            self.media_event_timer(self.search_list[index_choice]['video_time'])
+                    else:
+                        self.send_bot_msg(special_unicode['indicate'] + ' Please make a choice between 0-4',
+                                          self.is_client_mod)
+                except ValueError:
+                    self.send_bot_msg(special_unicode['indicate'] + ' Only numbers allowed.', self.is_client_mod)
 
     def do_clear_playlist(self):
         """ Clear all media in the playlist. """
-        if self.user_obj.is_owner or self.user_obj.is_super or self.user_obj.is_mod or self.user_obj.has_power:
-            if len(self.playlist) is not 0:
-                pl_length = str(len(self.playlist))
-                self.playlist[:] = []
-                self.inowplay = 0
-                self.send_bot_msg(special_unicode['scissors'] + ' *Deleted* ' + pl_length + ' *items* in the playlist.',
-                                  self.is_client_mod)
-            else:
-                self.send_bot_msg(special_unicode['indicate'] + ' The playlist is empty, *nothing to clear*.',
-                                  self.is_client_mod)
+        if len(self.playlist) is not 0:
+            pl_length = str(len(self.playlist))
+            self.playlist[:] = []
+            self.inowplay = 0
+            self.send_bot_msg(special_unicode['scissors'] + ' *Deleted* ' + pl_length + ' *items* in the playlist.',
+                              self.is_client_mod)
+        else:
+            self.send_bot_msg(special_unicode['indicate'] + ' The playlist is empty, *nothing to clear*.',
+                              self.is_client_mod)
 
     def do_media_replay(self):
         """ Replays the last played media. """
-        if self.user_obj.is_owner or self.user_obj.is_super or self.user_obj.is_mod or self.user_obj.has_power:
-            if self.media_timer_thread is not None:
-                self.cancel_media_event_timer()
-            self.send_media_broadcast_start(self.last_played_media['type'], self.last_played_media['video_id'])
-            self.media_event_timer(self.last_played_media['video_time'])
+        if self.media_timer_thread is not None:
+            self.cancel_media_event_timer()
+        self.send_media_broadcast_start(self.last_played_media['type'], self.last_played_media['video_id'])
+        self.media_event_timer(self.last_played_media['video_time'])
 
     def do_skip(self):
         """ Play the next item in the playlist. """
-        if self.user_obj.is_owner or self.user_obj.is_super or self.user_obj.is_mod or self.user_obj.has_power:
-            if len(self.playlist) is not 0:
-                if self.inowplay >= len(self.playlist):
-                    self.send_bot_msg(special_unicode['state'] + ' This is the *last tune* in the playlist.',
-                                      self.is_client_mod)
-                else:
-                    self.cancel_media_event_timer()
-                    self.last_played_media = self.playlist[self.inowplay]
-                    self.send_media_broadcast_start(self.playlist[self.inowplay]['type'],
-                                                    self.playlist[self.inowplay]['video_id'])
-                    self.media_event_timer(self.playlist[self.inowplay]['video_time'])
-                    self.inowplay += 1  # Prepare the next tune in the playlist.
-            else:
-                self.send_bot_msg(special_unicode['indicate'] + ' *No tunes to skip. The playlist is empty.*',
+        if len(self.playlist) is not 0:
+            if self.inowplay >= len(self.playlist):
+                self.send_bot_msg(special_unicode['state'] + ' This is the *last tune* in the playlist.',
                                   self.is_client_mod)
+            else:
+                self.cancel_media_event_timer()
+                self.last_played_media = self.playlist[self.inowplay]
+                self.send_media_broadcast_start(self.playlist[self.inowplay]['type'],
+                                                self.playlist[self.inowplay]['video_id'])
+                self.media_event_timer(self.playlist[self.inowplay]['video_time'])
+                self.inowplay += 1  # Prepare the next tune in the playlist.
+        else:
+            self.send_bot_msg(special_unicode['indicate'] + ' *No tunes to skip. The playlist is empty.*',
+                              self.is_client_mod)
 
     def do_close_media(self):
         """
         Stops any media playing in the room.
         NOTE: The default stop is from whichever type of media is playing in the playlist.
         """
-        if self.user_obj.is_owner or self.user_obj.is_super or self.user_obj.is_mod or self.user_obj.has_power:
-            if self.media_timer_thread is not None and self.media_timer_thread.is_alive():
-                self.cancel_media_event_timer()
-                self.send_media_broadcast_close(self.last_played_media['type'])
-                self.console_write(pinylib.COLOR['bright_magenta'], 'Closed the ' + self.last_played_media['type'])
+        if self.media_timer_thread is not None and self.media_timer_thread.is_alive():
+            self.cancel_media_event_timer()
+            self.send_media_broadcast_close(self.last_played_media['type'])
+            self.console_write(pinylib.COLOR['bright_magenta'], 'Closed the ' + self.last_played_media['type'])
 
     # TODO: These need to be integrated into a media handling class.
     # def do_pause_media(self):
@@ -1813,7 +1823,7 @@ class TinychatBot(pinylib.TinychatRTMPClient):
         :param search_str: str the search term.
         """
         log.info('User: %s:%s is searching %s: %s' % (self.user_obj.nick, self.user_obj.id, media_type, search_str))
-        if self.user_obj.is_owner or self.user_obj.is_super or self.user_obj.is_mod or self.user_obj.has_power:
+        if self.user_obj.roles & PRIVILEGE_POWER:
             if self.is_client_mod:
                 type_str = ''
                 if media_type == self.yt_type:
@@ -1859,40 +1869,39 @@ class TinychatBot(pinylib.TinychatRTMPClient):
         :param search_str: str the search term.
         """
         if self.is_client_mod:
-            if self.user_obj.is_owner or self.user_obj.is_super or self.user_obj.is_mod or self.user_obj.has_power:
-                type_str = ''
+            type_str = ''
+            if media_type == self.yt_type:
+                type_str = 'YouTube'
+            elif media_type == self.sc_type:
+                type_str = 'SoundCloud'
+
+            if len(search_str) is 0:
+                self.send_bot_msg(
+                    special_unicode['indicate'] + ' Please specify *' + type_str + ' title, id or link.*',
+                    self.is_client_mod)
+            else:
+                # Search for the specified media.
+                _media = None
                 if media_type == self.yt_type:
-                    type_str = 'YouTube'
+                    _media = youtube.youtube_search(search_str)
                 elif media_type == self.sc_type:
-                    type_str = 'SoundCloud'
+                    _media = soundcloud.soundcloud_search(search_str)
 
-                if len(search_str) is 0:
-                    self.send_bot_msg(
-                        special_unicode['indicate'] + ' Please specify *' + type_str + ' title, id or link.*',
-                        self.is_client_mod)
+                # Handle starting media playback.
+                if _media is None:
+                    self.send_bot_msg(special_unicode['indicate'] + ' Could not find media: ' + search_str,
+                                      self.is_client_mod)
                 else:
-                    # Search for the specified media.
-                    _media = None
-                    if media_type == self.yt_type:
-                        _media = youtube.youtube_search(search_str)
-                    elif media_type == self.sc_type:
-                        _media = soundcloud.soundcloud_search(search_str)
-
-                    # Handle starting media playback.
-                    if _media is None:
-                        self.send_bot_msg(special_unicode['indicate'] + ' Could not find media: ' + search_str,
-                                          self.is_client_mod)
+                    if self.media_timer_thread is not None and self.media_timer_thread.is_alive() \
+                            and self.playlist_mode:
+                        self.playlist.append(_media)
+                        self.send_bot_msg(special_unicode['pencil'] + ' ' + special_unicode['musical_note'] + ' *' +
+                                          str(_media['video_title']) + ' ' + special_unicode['musical_note'] +
+                                          ' at #' + str(len(self.playlist)) + '*', self.is_client_mod)
                     else:
-                        if self.media_timer_thread is not None and self.media_timer_thread.is_alive() \
-                                and self.playlist_mode:
-                            self.playlist.append(_media)
-                            self.send_bot_msg(special_unicode['pencil'] + ' ' + special_unicode['musical_note'] + ' *' +
-                                              str(_media['video_title']) + ' ' + special_unicode['musical_note'] +
-                                              ' at #' + str(len(self.playlist)) + '*', self.is_client_mod)
-                        else:
-                            self.last_played_media = _media
-                            self.send_media_broadcast_start(_media['type'], _media['video_id'])
-                            self.media_event_timer(_media['video_time'])
+                        self.last_played_media = _media
+                        self.send_media_broadcast_start(_media['type'], _media['video_id'])
+                        self.media_event_timer(_media['video_time'])
         else:
             self.send_bot_msg('Not enabled right now.')
 
@@ -1946,24 +1955,23 @@ class TinychatBot(pinylib.TinychatRTMPClient):
 
     def do_sync_media(self):
         """ Syncs the media that is currently being playing to all the users within the room. """
-        if self.user_obj.is_owner or self.user_obj.is_super or self.user_obj.is_mod or self.user_obj.has_power:
-            if not self.syncing:
-                if self.media_timer_thread is not None and self.media_timer_thread.is_alive():
-                    self.syncing = True
-                    for user in self.room_users.keys():
-                        # Send the media at the correct start time from the playlist to the user.
-                        if user != self.client_nick:
-                            self.send_media_broadcast_start(self.last_played_media['type'],
-                                                            self.last_played_media['video_id'],
-                                                            self.current_media_time_point(), private_nick=user)
-                    pinylib.time.sleep(0.9)
-                    self.syncing = False
-                else:
-                    self.send_bot_msg(special_unicode['indicate'] +
-                                      ' No media is playing to *sync* at the moment.', self.is_client_mod)
+        if not self.syncing:
+            if self.media_timer_thread is not None and self.media_timer_thread.is_alive():
+                self.syncing = True
+                for user in self.room_users.keys():
+                    # Send the media at the correct start time from the playlist to the user.
+                    if user != self.client_nick:
+                        self.send_media_broadcast_start(self.last_played_media['type'],
+                                                        self.last_played_media['video_id'],
+                                                        self.current_media_time_point(), private_nick=user)
+                pinylib.time.sleep(0.9)
+                self.syncing = False
             else:
-                self.send_bot_msg(special_unicode['indicate'] + ' A room sync request is currently being processed.',
-                                  self.is_client_mod)
+                self.send_bot_msg(special_unicode['indicate'] +
+                                  ' No media is playing to *sync* at the moment.', self.is_client_mod)
+        else:
+            self.send_bot_msg(special_unicode['indicate'] + ' A room sync request is currently being processed.',
+                              self.is_client_mod)
 
     def do_sync_media_user(self):
         """ Syncs the media that is currently being playing to the user who requested it. """
@@ -1980,47 +1988,46 @@ class TinychatBot(pinylib.TinychatRTMPClient):
         Add all the videos from the given playlist.
         :param: playlist: str the playlist or playlist ID.
         """
-        if self.user_obj.is_owner or self.user_obj.is_super or self.user_obj.is_mod or self.user_obj.has_power:
-            if len(playlist) is 0:
-                self.send_bot_msg(special_unicode['indicate'] +
-                                  ' Please enter a playlist url or playlist ID.', self.is_client_mod)
+        if len(playlist) is 0:
+            self.send_bot_msg(special_unicode['indicate'] +
+                              ' Please enter a playlist url or playlist ID.', self.is_client_mod)
+        else:
+            # Get only the playlist ID from the provided link.
+            playlist_id = ''
+            if '=' in str(playlist):
+                location_equal = str(playlist).index('=')
+                playlist_id = playlist[location_equal + 1:len(playlist)]
             else:
-                # Get only the playlist ID from the provided link.
-                playlist_id = ''
-                if '=' in str(playlist):
-                    location_equal = str(playlist).index('=')
-                    playlist_id = playlist[location_equal + 1:len(playlist)]
-                else:
-                    if 'http' or 'www' or 'youtube' not in playlist:
-                        playlist_id = str(playlist)
+                if 'http' or 'www' or 'youtube' not in playlist:
+                    playlist_id = str(playlist)
 
-                self.send_bot_msg(special_unicode['state'] +
-                                  ' *Just a minute* while we fetch the videos in the playlist...', self.is_client_mod)
+            self.send_bot_msg(special_unicode['state'] +
+                              ' *Just a minute* while we fetch the videos in the playlist...', self.is_client_mod)
 
-                video_list, non_public = youtube.youtube_playlist_videos(playlist_id)
-                if len(video_list) is 0:
-                    self.send_bot_msg(special_unicode['indicate'] +
-                                      ' No videos in playlist or none were found.', self.is_client_mod)
+            video_list, non_public = youtube.youtube_playlist_videos(playlist_id)
+            if len(video_list) is 0:
+                self.send_bot_msg(special_unicode['indicate'] +
+                                  ' No videos in playlist or none were found.', self.is_client_mod)
+            else:
+                if non_public > 0:
+                    playlist_message = special_unicode['pencil'] +\
+                                       ' Added *' + str(len(video_list)) + ' videos* to the playlist. ' +\
+                                       'There were *' + str(non_public) + '* non-public videos.'
                 else:
-                    if non_public > 0:
-                        playlist_message = special_unicode['pencil'] +\
-                                           ' Added *' + str(len(video_list)) + ' videos* to the playlist. ' +\
-                                           'There were *' + str(non_public) + '* non-public videos.'
-                    else:
-                        playlist_message = special_unicode['pencil'] +\
-                                           ' Added *' + str(len(video_list)) + ' videos* to the playlist.'
+                    playlist_message = special_unicode['pencil'] +\
+                                       ' Added *' + str(len(video_list)) + ' videos* to the playlist.'
 
-                    if self.media_timer_thread is not None and self.media_timer_thread.is_alive():
-                        self.playlist.extend(video_list)
-                        self.send_bot_msg(playlist_message, self.is_client_mod)
-                    else:
-                        self.playlist.extend(video_list)
-                        self.last_played_media = self.playlist[self.inowplay]
-                        self.send_media_broadcast_start(self.playlist[self.inowplay]['type'],
-                                                        self.playlist[self.inowplay]['video_id'])
-                        self.media_event_timer(self.playlist[self.inowplay]['video_time'])
-                        self.inowplay += 1  # Prepare the next tune in the playlist.
-                        self.send_bot_msg(playlist_message, self.is_client_mod)
+                if self.media_timer_thread is not None and self.media_timer_thread.is_alive():
+                    self.playlist.extend(video_list)
+                    self.send_bot_msg(playlist_message, self.is_client_mod)
+                else:
+                    self.playlist.extend(video_list)
+                    self.last_played_media = self.playlist[self.inowplay]
+                    self.send_media_broadcast_start(self.playlist[self.inowplay]['type'],
+                                                    self.playlist[self.inowplay]['video_id'])
+                    self.media_event_timer(self.playlist[self.inowplay]['video_time'])
+                    self.inowplay += 1  # Prepare the next tune in the playlist.
+                    self.send_bot_msg(playlist_message, self.is_client_mod)
 
     def do_youtube_playlist_search(self, playlist_search):
         """
@@ -2029,210 +2036,203 @@ class TinychatBot(pinylib.TinychatRTMPClient):
         """
         log.info('User %s:%s is searching a YouTube playlist: %s' % (self.user_obj.nick, self.user_obj.id,
                                                                      playlist_search))
-        if self.user_obj.is_owner or self.user_obj.is_super or self.user_obj.is_mod or self.user_obj.has_power:
-            if len(playlist_search) is 0:
+        if len(playlist_search) is 0:
+            self.send_bot_msg(special_unicode['indicate'] +
+                              ' Please enter a playlist search query.', self.is_client_mod)
+        else:
+            self.search_play_lists = youtube.youtube_playlist_search(playlist_search, results=4)
+            if self.search_play_lists is None:
+                log.warning('The search returned an error.')
                 self.send_bot_msg(special_unicode['indicate'] +
-                                  ' Please enter a playlist search query.', self.is_client_mod)
+                                  '  There was an error while fetching the results.', self.is_client_mod)
+            elif len(self.search_play_lists) is 0:
+                self.send_bot_msg(special_unicode['indicate'] +
+                                  ' The search returned no results.', self.is_client_mod)
             else:
-                self.search_play_lists = youtube.youtube_playlist_search(playlist_search, results=4)
-                if self.search_play_lists is None:
-                    log.warning('The search returned an error.')
-                    self.send_bot_msg(special_unicode['indicate'] +
-                                      '  There was an error while fetching the results.', self.is_client_mod)
-                elif len(self.search_play_lists) is 0:
-                    self.send_bot_msg(special_unicode['indicate'] +
-                                      ' The search returned no results.', self.is_client_mod)
-                else:
-                    log.info('YouTube playlist were found: %s' % self.search_play_lists)
-                    for x in range(len(self.search_play_lists)):
-                        self.send_undercover_msg(self.user_obj.nick, '*' + str(x + 1) + '. ' +
-                                                 self.search_play_lists[x]['playlist_title'] + ' - ' +
-                                                 self.search_play_lists[x]['playlist_id'] + '*')
-                        pinylib.time.sleep(0.2)
+                log.info('YouTube playlist were found: %s' % self.search_play_lists)
+                for x in range(len(self.search_play_lists)):
+                    self.send_undercover_msg(self.user_obj.nick, '*' + str(x + 1) + '. ' +
+                                             self.search_play_lists[x]['playlist_title'] + ' - ' +
+                                             self.search_play_lists[x]['playlist_id'] + '*')
+                    pinylib.time.sleep(0.2)
 
     def do_youtube_playlist_search_choice(self, index_choice):
         """
         Starts a playlist from the search list.
         :param index_choice: int the index in the play lists to start.
         """
-        if self.user_obj.is_owner or self.user_obj.is_super or self.user_obj.is_mod or self.user_obj.has_power:
-            if len(self.search_play_lists) is 0:
-                self.send_bot_msg(special_unicode['indicate'] +
-                                  ' No previous playlist search committed to confirm ID. Please do *!plsh*.',
-                                  self.is_client_mod)
-            elif len(index_choice) is 0:
-                self.send_bot_msg(special_unicode['indicate'] +
-                                  ' Please choose your selection from the playlist IDs,  e.g. *!pladd 2*',
-                                  self.is_client_mod)
-            else:
-                if 0 <= int(index_choice) <= 4:
-                    threading.Thread(target=self.do_youtube_playlist_videos,
-                                     args=(self.search_play_lists[int(index_choice) - 1]['playlist_id'],)).start()
+        if len(self.search_play_lists) is 0:
+            self.send_bot_msg(special_unicode['indicate'] +
+                              ' No previous playlist search committed to confirm ID. Please do *!plsh*.',
+                              self.is_client_mod)
+        elif len(index_choice) is 0:
+            self.send_bot_msg(special_unicode['indicate'] +
+                              ' Please choose your selection from the playlist IDs,  e.g. *!pladd 2*',
+                              self.is_client_mod)
+        else:
+            if 0 <= int(index_choice) <= 4:
+                self.do_youtube_playlist_videos(self.search_play_lists[int(index_choice) - 1]['playlist_id'])
 
     def do_charts(self):
         """ Retrieves the Top40 songs list and adds the songs to the playlist. """
-        if self.user_obj.is_owner or self.user_obj.is_super or self.user_obj.is_mod or self.user_obj.has_power:
-            self.send_bot_msg(special_unicode['state'] +
-                              ' *Hang on* while we retrieve the Top40 songs...', self.is_client_mod)
+        self.send_bot_msg(special_unicode['state'] +
+                          ' *Hang on* while we retrieve the Top40 songs...', self.is_client_mod)
+
+        songs_list = other_apis.top40()
+        top40_list = list(reversed(songs_list))
+        if songs_list is None:
+            self.send_bot_msg(special_unicode['indicate'] +
+                              ' We could not fetch the Top40 songs list.', self.is_client_mod)
+        elif len(songs_list) is 0:
+            self.send_bot_msg(special_unicode['indicate'] + ' No songs were found.', self.is_client_mod)
+        else:
+            video_list = []
+            for x in range(len(top40_list)):
+                search_str = top40_list[x][0] + ' - ' + top40_list[x][1]
+                _youtube = youtube.youtube_search(search_str)
+                if _youtube is not None:
+                    video_list.append(_youtube)
 
-            songs_list = other_apis.top40()
-            top40_list = list(reversed(songs_list))
-            if songs_list is None:
-                self.send_bot_msg(special_unicode['indicate'] +
-                                  ' We could not fetch the Top40 songs list.', self.is_client_mod)
-            elif len(songs_list) is 0:
-                self.send_bot_msg(special_unicode['indicate'] + ' No songs were found.', self.is_client_mod)
-            else:
-                video_list = []
-                for x in range(len(top40_list)):
-                    search_str = top40_list[x][0] + ' - ' + top40_list[x][1]
-                    _youtube = youtube.youtube_search(search_str)
-                    if _youtube is not None:
-                        video_list.append(_youtube)
-
-                if len(video_list) > 0:
-                    self.send_bot_msg(special_unicode['pencil'] + ' *Added Top40* songs (40 --> 1) to playlist.',
-                                      self.is_client_mod)
+            if len(video_list) > 0:
+                self.send_bot_msg(special_unicode['pencil'] + ' *Added Top40* songs (40 --> 1) to playlist.',
+                                  self.is_client_mod)
 
-                    if self.media_timer_thread is not None and self.media_timer_thread.is_alive():
-                        self.playlist.extend(video_list)
-                    else:
-                        self.playlist.extend(video_list)
-                        self.last_played_media = self.playlist[self.inowplay]
-                        self.send_media_broadcast_start(self.playlist[self.inowplay]['type'],
-                                                        self.playlist[self.inowplay]['video_id'])
-                        self.media_event_timer(self.playlist[self.inowplay]['video_time'])
-                        self.inowplay += 1  # Prepare the next tune in the playlist.
+                if self.media_timer_thread is not None and self.media_timer_thread.is_alive():
+                    self.playlist.extend(video_list)
+                else:
+                    self.playlist.extend(video_list)
+                    self.last_played_media = self.playlist[self.inowplay]
+                    self.send_media_broadcast_start(self.playlist[self.inowplay]['type'],
+                                                    self.playlist[self.inowplay]['video_id'])
+                    self.media_event_timer(self.playlist[self.inowplay]['video_time'])
+                    self.inowplay += 1  # Prepare the next tune in the playlist.
 
     def do_lastfm_chart(self, chart_items):
         """
         Makes a playlist from the currently most played tunes on Last.fm.
         :param chart_items: int the amount of tunes we want.
         """
-        if self.user_obj.is_owner or self.user_obj.is_super or self.user_obj.is_mod or self.user_obj.has_power:
-            if self.is_client_mod:
-                if chart_items is 0 or chart_items is None:
-                    self.send_bot_msg(special_unicode['indicate'] + ' Please specify the amount of tunes you want.',
-                                      self.is_client_mod)
+        if self.is_client_mod:
+            if chart_items is 0 or chart_items is None:
+                self.send_bot_msg(special_unicode['indicate'] + ' Please specify the amount of tunes you want.',
+                                  self.is_client_mod)
+            else:
+                try:
+                    _items = int(chart_items)
+                except ValueError:
+                    self.send_bot_msg(special_unicode['indicate'] + ' Only numbers allowed.', self.is_client_mod)
                 else:
-                    try:
-                        _items = int(chart_items)
-                    except ValueError:
-                        self.send_bot_msg(special_unicode['indicate'] + ' Only numbers allowed.', self.is_client_mod)
-                    else:
-                        if _items > 0:
-                            if _items > 30:
-                                self.send_bot_msg(special_unicode['indicate'] + ' No more than 30 tunes.',
-                                                  self.is_client_mod)
-                            else:
-                                self.send_bot_msg(
-                                    special_unicode['state'] + ' *Please wait* while creating a playlist...',
-                                    self.is_client_mod)
-                                last = lastfm.get_lastfm_chart(_items)
-
-                                if last is not None:
-                                    if self.media_timer_thread is not None and self.media_timer_thread.is_alive():
-                                        self.playlist.extend(last)
-                                        self.send_bot_msg(special_unicode['pencil'] + ' *Added:* ' + str(len(last)) +
-                                                          ' *tunes from last.fm chart.*', self.is_client_mod)
-                                    else:
-                                        self.playlist.extend(last)
-                                        self.send_bot_msg(special_unicode['pencil'] + '*Added:* ' + str(len(last)) +
-                                                          ' *tunes from last.fm chart.*', self.is_client_mod)
-                                        self.last_played_media = self.playlist[self.inowplay]
-                                        self.send_media_broadcast_start(self.playlist[self.inowplay]['type'],
-                                                                        self.playlist[self.inowplay]['video_id'])
-                                        self.media_event_timer(self.playlist[self.inowplay]['video_time'])
-                                        self.inowplay += 1  # Prepare the next tune in the playlist.
+                    if _items > 0:
+                        if _items > 30:
+                            self.send_bot_msg(special_unicode['indicate'] + ' No more than 30 tunes.',
+                                              self.is_client_mod)
+                        else:
+                            self.send_bot_msg(
+                                special_unicode['state'] + ' *Please wait* while creating a playlist...',
+                                self.is_client_mod)
+                            last = lastfm.get_lastfm_chart(_items)
+
+                            if last is not None:
+                                if self.media_timer_thread is not None and self.media_timer_thread.is_alive():
+                                    self.playlist.extend(last)
+                                    self.send_bot_msg(special_unicode['pencil'] + ' *Added:* ' + str(len(last)) +
+                                                      ' *tunes from last.fm chart.*', self.is_client_mod)
                                 else:
-                                    self.send_bot_msg(special_unicode['indicate'] +
-                                                      ' Failed to retrieve a result from last.fm.', self.is_client_mod)
-            else:
-                self.send_bot_msg('Not enabled right now.')
+                                    self.playlist.extend(last)
+                                    self.send_bot_msg(special_unicode['pencil'] + '*Added:* ' + str(len(last)) +
+                                                      ' *tunes from last.fm chart.*', self.is_client_mod)
+                                    self.last_played_media = self.playlist[self.inowplay]
+                                    self.send_media_broadcast_start(self.playlist[self.inowplay]['type'],
+                                                                    self.playlist[self.inowplay]['video_id'])
+                                    self.media_event_timer(self.playlist[self.inowplay]['video_time'])
+                                    self.inowplay += 1  # Prepare the next tune in the playlist.
+                            else:
+                                self.send_bot_msg(special_unicode['indicate'] +
+                                                  ' Failed to retrieve a result from last.fm.', self.is_client_mod)
+        else:
+            self.send_bot_msg('Not enabled right now.')
 
     def do_lastfm_random_tunes(self, max_tunes):
         """
         Creates a playlist from what other people are listening to on Last.fm.
         :param max_tunes: int the max amount of tunes.
         """
-        if self.user_obj.is_owner or self.user_obj.is_super or self.user_obj.is_mod or self.user_obj.has_power:
-            if self.is_client_mod:
-                if max_tunes is 0 or max_tunes is None:
-                    self.send_bot_msg(special_unicode['indicate'] + ' Please specify the max amount of tunes you want.',
-                                      self.is_client_mod)
+        if self.is_client_mod:
+            if max_tunes is 0 or max_tunes is None:
+                self.send_bot_msg(special_unicode['indicate'] + ' Please specify the max amount of tunes you want.',
+                                  self.is_client_mod)
+            else:
+                try:
+                    _items = int(max_tunes)
+                except ValueError:
+                    self.send_bot_msg(special_unicode['indicate'] + ' Only numbers allowed.', self.is_client_mod)
                 else:
-                    try:
-                        _items = int(max_tunes)
-                    except ValueError:
-                        self.send_bot_msg(special_unicode['indicate'] + ' Only numbers allowed.', self.is_client_mod)
-                    else:
-                        if _items > 0:
-                            if _items > 25:
-                                self.send_bot_msg(special_unicode['indicate'] + ' No more than 25 tunes.',
-                                                  self.is_client_mod)
+                    if _items > 0:
+                        if _items > 25:
+                            self.send_bot_msg(special_unicode['indicate'] + ' No more than 25 tunes.',
+                                              self.is_client_mod)
+                        else:
+                            self.send_bot_msg(
+                                special_unicode['state'] + ' *Please wait* while creating a playlist...',
+                                self.is_client_mod)
+                            last = lastfm.lastfm_listening_now(max_tunes)
+
+                            if last is not None:
+                                if self.media_timer_thread is not None and self.media_timer_thread.is_alive():
+                                    self.playlist.extend(last)
+                                    self.send_bot_msg(special_unicode['pencil'] + ' Added *' + str(
+                                        len(last)) + '* tunes from *last.fm*',
+                                                      self.is_client_mod)
+                                else:
+                                    self.playlist.extend(last)
+                                    self.send_bot_msg(special_unicode['pencil'] + ' Added *' + str(len(last)) +
+                                                      ' * tunes from *last.fm*', self.is_client_mod)
+                                    self.last_played_media = self.playlist[self.inowplay]
+                                    self.send_media_broadcast_start(self.playlist[self.inowplay]['type'],
+                                                                    self.playlist[self.inowplay]['video_id'])
+                                    self.media_event_timer(self.playlist[self.inowplay]['video_time'])
+                                    self.inowplay += 1  # Prepare the next tune in the playlist.
                             else:
                                 self.send_bot_msg(
-                                    special_unicode['state'] + ' *Please wait* while creating a playlist...',
+                                    special_unicode['indicate'] + ' Failed to retrieve a result from last.fm.',
                                     self.is_client_mod)
-                                last = lastfm.lastfm_listening_now(max_tunes)
-
-                                if last is not None:
-                                    if self.media_timer_thread is not None and self.media_timer_thread.is_alive():
-                                        self.playlist.extend(last)
-                                        self.send_bot_msg(special_unicode['pencil'] + ' Added *' + str(
-                                            len(last)) + '* tunes from *last.fm*',
-                                                          self.is_client_mod)
-                                    else:
-                                        self.playlist.extend(last)
-                                        self.send_bot_msg(special_unicode['pencil'] + ' Added *' + str(len(last)) +
-                                                          ' * tunes from *last.fm*', self.is_client_mod)
-                                        self.last_played_media = self.playlist[self.inowplay]
-                                        self.send_media_broadcast_start(self.playlist[self.inowplay]['type'],
-                                                                        self.playlist[self.inowplay]['video_id'])
-                                        self.media_event_timer(self.playlist[self.inowplay]['video_time'])
-                                        self.inowplay += 1  # Prepare the next tune in the playlist.
-                                else:
-                                    self.send_bot_msg(
-                                        special_unicode['indicate'] + ' Failed to retrieve a result from last.fm.',
-                                        self.is_client_mod)
-            else:
-                self.send_bot_msg('Not enabled right now.')
+        else:
+            self.send_bot_msg('Not enabled right now.')
 
     def search_lastfm_by_tag(self, search_str):
         """
         Searches last.fm for tunes matching the search term and creates a playlist from them.
         :param search_str: str the search term to search for.
         """
-        if self.user_obj.is_owner or self.user_obj.is_super or self.user_obj.is_mod or self.user_obj.has_power:
-            if self.is_client_mod:
-                if len(search_str) is 0:
-                    self.send_bot_msg(special_unicode['indicate'] + ' Missing search tag.', self.is_client_mod)
-                else:
-                    self.send_bot_msg(special_unicode['state'] + ' *Please wait* while creating playlist...',
-                                      self.is_client_mod)
-                    last = lastfm.search_lastfm_by_tag(search_str)
+        if self.is_client_mod:
+            if len(search_str) is 0:
+                self.send_bot_msg(special_unicode['indicate'] + ' Missing search tag.', self.is_client_mod)
+            else:
+                self.send_bot_msg(special_unicode['state'] + ' *Please wait* while creating playlist...',
+                                  self.is_client_mod)
+                last = lastfm.search_lastfm_by_tag(search_str)
 
-                    if last is not None:
-                        if self.media_timer_thread is not None and self.media_timer_thread.is_alive():
-                            self.playlist.extend(last)
-                            self.send_bot_msg(
-                                special_unicode['pencil'] + ' Added *' + str(len(last)) + '* tunes from *last.fm*',
-                                self.is_client_mod)
-                        else:
-                            self.playlist.extend(last)
-                            self.send_bot_msg(
-                                special_unicode['pencil'] + ' Added *' + str(len(last)) + '* tunes from *last.fm*',
-                                self.is_client_mod)
-                            self.last_played_media = self.playlist[self.inowplay]
-                            self.send_media_broadcast_start(self.playlist[self.inowplay]['type'],
-                                                            self.playlist[self.inowplay]['video_id'])
-                            self.media_event_timer(self.playlist[self.inowplay]['video_time'])
-                            self.inowplay += 1  # Prepare the next tune in the playlist.
+                if last is not None:
+                    if self.media_timer_thread is not None and self.media_timer_thread.is_alive():
+                        self.playlist.extend(last)
+                        self.send_bot_msg(
+                            special_unicode['pencil'] + ' Added *' + str(len(last)) + '* tunes from *last.fm*',
+                            self.is_client_mod)
                     else:
-                        self.send_bot_msg(special_unicode['indicate'] + ' Failed to retrieve a result from last.fm.',
-                                          self.is_client_mod)
-            else:
-                self.send_bot_msg('Not enabled right now.')
+                        self.playlist.extend(last)
+                        self.send_bot_msg(
+                            special_unicode['pencil'] + ' Added *' + str(len(last)) + '* tunes from *last.fm*',
+                            self.is_client_mod)
+                        self.last_played_media = self.playlist[self.inowplay]
+                        self.send_media_broadcast_start(self.playlist[self.inowplay]['type'],
+                                                        self.playlist[self.inowplay]['video_id'])
+                        self.media_event_timer(self.playlist[self.inowplay]['video_time'])
+                        self.inowplay += 1  # Prepare the next tune in the playlist.
+                else:
+                    self.send_bot_msg(special_unicode['indicate'] + ' Failed to retrieve a result from last.fm.',
+                                      self.is_client_mod)
+        else:
+            self.send_bot_msg('Not enabled right now.')
 
     def do_delete_playlist_item(self, to_delete):
         """
@@ -2241,64 +2241,63 @@ class TinychatBot(pinylib.TinychatRTMPClient):
         """
         usage = '*' + CONFIG['prefix'] + 'del 1* or *' + CONFIG['prefix'] + 'del 1,2,4* or *' \
                 + CONFIG['prefix'] + 'del 2:8*'
-        if self.user_obj.is_owner or self.user_obj.is_super or self.user_obj.is_mod or self.user_obj.has_power:
-            if len(self.playlist) is 0:
-                self.send_undercover_msg(self.user_obj.nick, 'The playlist is empty.')
-            if len(to_delete) is 0:
-                self.send_undercover_msg(self.user_obj.nick, usage)
+        if len(self.playlist) is 0:
+            self.send_undercover_msg(self.user_obj.nick, 'The playlist is empty.')
+        if len(to_delete) is 0:
+            self.send_undercover_msg(self.user_obj.nick, usage)
+        else:
+            indexes = None
+            deleted_by_range = False
+            playlist_copy = list(self.playlist)
+            # using : as a separator.
+            if ':' in to_delete:
+                try:
+                    range_indexes = map(int, to_delete.split(':'))
+                    temp_indexes = range(range_indexes[0], range_indexes[1])
+                except ValueError:
+                    self.send_undercover_msg(self.user_obj.nick, usage)
+                else:
+                    indexes = []
+                    for i in temp_indexes:
+                        if i < len(self.playlist):
+                            if i not in indexes:
+                                indexes.append(i)
+                    if len(indexes) > 1:
+                        deleted_by_range = True
             else:
-                indexes = None
-                deleted_by_range = False
-                playlist_copy = list(self.playlist)
-                # using : as a separator.
-                if ':' in to_delete:
-                    try:
-                        range_indexes = map(int, to_delete.split(':'))
-                        temp_indexes = range(range_indexes[0], range_indexes[1])
-                    except ValueError:
-                        self.send_undercover_msg(self.user_obj.nick, usage)
-                    else:
-                        indexes = []
-                        for i in temp_indexes:
-                            if i < len(self.playlist):
-                                if i not in indexes:
-                                    indexes.append(i)
-                        if len(indexes) > 1:
-                            deleted_by_range = True
+                try:
+                    temp_indexes = map(int, to_delete.split(','))
+                except ValueError:
+                    self.send_undercover_msg(self.user_obj.nick, usage)
                 else:
-                    try:
-                        temp_indexes = map(int, to_delete.split(','))
-                    except ValueError:
-                        self.send_undercover_msg(self.user_obj.nick, usage)
-                    else:
-                        indexes = []
-                        for i in temp_indexes:
-                            if i < len(self.playlist):
-                                if i not in indexes:
-                                    indexes.append(i)
-                deleted_indexes = []
-                if indexes is not None and len(indexes) is not 0:
-                    if len(self.playlist) is not 0:
-                        for i in sorted(indexes, reverse=True):
-                            if self.inowplay <= i < len(self.playlist):
-                                del self.playlist[i]
-                                deleted_indexes.append(str(i))
-                        deleted_indexes.reverse()
-                        if len(deleted_indexes) > 0:
-                            if deleted_by_range:
-                                self.send_bot_msg('*deleted: index range from (and including)* ' +
-                                                  str(deleted_indexes[0]) + ' to ' + str(deleted_indexes[-1]),
-                                                  self.is_client_mod)
-                            elif len(deleted_indexes) is 1:
-                                self.send_bot_msg('Deleted: *' + playlist_copy[int(deleted_indexes[0])]['video_title'] +
-                                                  '*', self.is_client_mod)
-                            else:
-                                self.send_bot_msg('*Deleted tracks at index:* ' + ', '.join(deleted_indexes),
-                                                  self.is_client_mod)
+                    indexes = []
+                    for i in temp_indexes:
+                        if i < len(self.playlist):
+                            if i not in indexes:
+                                indexes.append(i)
+            deleted_indexes = []
+            if indexes is not None and len(indexes) is not 0:
+                if len(self.playlist) is not 0:
+                    for i in sorted(indexes, reverse=True):
+                        if self.inowplay <= i < len(self.playlist):
+                            del self.playlist[i]
+                            deleted_indexes.append(str(i))
+                    deleted_indexes.reverse()
+                    if len(deleted_indexes) > 0:
+                        if deleted_by_range:
+                            self.send_bot_msg('*deleted: index range from (and including)* ' +
+                                              str(deleted_indexes[0]) + ' to ' + str(deleted_indexes[-1]),
+                                              self.is_client_mod)
+                        elif len(deleted_indexes) is 1:
+                            self.send_bot_msg('Deleted: *' + playlist_copy[int(deleted_indexes[0])]['video_title'] +
+                                              '*', self.is_client_mod)
                         else:
-                            self.send_bot_msg('Nothing was deleted.', self.is_client_mod)
+                            self.send_bot_msg('*Deleted tracks at index:* ' + ', '.join(deleted_indexes),
+                                              self.is_client_mod)
                     else:
-                        self.send_bot_msg('The playlist is empty, no tracks to delete.', self.is_client_mod)
+                        self.send_bot_msg('Nothing was deleted.', self.is_client_mod)
+                else:
+                    self.send_bot_msg('The playlist is empty, no tracks to delete.', self.is_client_mod)
 
     # == Tinychat API Command Methods. ==
     def do_spy(self, room_name):
@@ -2320,7 +2319,7 @@ class TinychatBot(pinylib.TinychatRTMPClient):
                                              '*mods:* ' + spy_info['mod_count'] +
                                              ' *Broadcasters:* ' + spy_info['broadcaster_count'] +
                                              ' *Users:* ' + spy_info['total_count'])
-                    if self.user_obj.is_owner or self.user_obj.is_mod or self.user_obj.has_power:
+                    if self.user_obj.roles & PRIVILEGE_POWER:
                         users = ', '.join(spy_info['users'])
                         self.send_undercover_msg(self.user_obj.nick, '*' + users + '*')
         else:
@@ -2335,7 +2334,7 @@ class TinychatBot(pinylib.TinychatRTMPClient):
             if len(account) is 0:
                 self.send_undercover_msg(self.user_obj.nick, 'Missing username to search for.')
             else:
-                tc_usr = pinylib.tinychat_api.tinychat_user_info(account)
+                tc_usr = self.user_info.lookup(account)
                 if tc_usr is None:
                     self.send_undercover_msg(self.user_obj.nick, 'Could not find Tinychat info for: %s' % account)
                 else:
@@ -2500,25 +2499,15 @@ class TinychatBot(pinylib.TinychatRTMPClient):
         else:
             self.send_bot_msg('*8Ball:* ' + eightball(), self.is_client_mod)
 
-    def do_auto_url(self, msg):
+    def do_auto_url(self, link):
         """
         Retrieve header information for a given link.
-        :param msg: str complete message by the user.
-        """
-        if 'http' in msg or 'https' in msg:
-            if '!' not in msg and 'tinychat.com' not in msg:
-                url = None
-                if msg.startswith('http://'):
-                    url = msg.split('http://')[1]
-                    msgs = url.split(' ')[0]
-                    url = auto_url.auto_url('http://' + msgs)
-                elif msg.startswith('https://'):
-                    url = msg.split('https://')[1]
-                    msgs = url.split(' ')[0]
-                    url = auto_url.auto_url('https://' + msgs)
-                if url is not None:
-                    self.send_bot_msg('*[ ' + url + ' ]*', self.is_client_mod)
-                    self.console_write(pinylib.COLOR['cyan'], self.user_obj.nick + ' posted a URL: ' + url)
+        :param link: str the link (with http:// or https://) found in the message, allowed by the link policy.
+        """
+        url = auto_url.auto_url(link)
+        if url is not None:
+            self.send_bot_msg('*[ ' + url + ' ]*', self.is_client_mod)
+            self.console_write(pinylib.COLOR['cyan'], self.user_obj.nick + ' posted a URL: ' + url)
 
     def do_yo_mama_joke(self):
         """ Shows the reply from a 'Yo Mama' joke API. """
@@ -2602,17 +2591,11 @@ class TinychatBot(pinylib.TinychatRTMPClient):
         Shows the appropriate ASCII message in relation to the ASCII dictionary.
         :param ascii_id: str the ASCII keyword/command.
         """
-        if '!' in ascii_id:
-            parts = ascii_id.split('!')
-            if len(parts) > 1:
-                key = parts[1]
-                if key in ascii_dict:
-                    self.send_bot_msg('*' + ascii_dict[key] + '*', self.is_client_mod)
-                    return True
-                else:
-                    return None
-        else:
-            return None
+        key = ascii_key(ascii_id)
+        if key in ascii_dict:
+            self.send_bot_msg('*' + ascii_dict[key] + '*', self.is_client_mod)
+            return True
+        return None
 
     def private_message_handler(self, msg_sender, private_msg):
         """
@@ -2632,84 +2615,25 @@ class TinychatBot(pinylib.TinychatRTMPClient):
             # The rest is a command argument.
             pm_arg = ' '.join(pm_parts[1:]).strip()
 
-            # Super mod commands.
-            if pm_cmd == CONFIG['prefix'] + 'rp':
-                threading.Thread(target=self.do_set_room_pass, args=(pm_arg, )).start()
-
-            elif pm_cmd == CONFIG['prefix'] + 'bp':
-                threading.Thread(target=self.do_set_broadcast_pass, args=(pm_arg, )).start()
-
-            # Owner and super mod commands.
-            elif pm_cmd == CONFIG['prefix'] + 'key':
-                threading.Thread(target=self.do_key, args=(pm_arg, )).start()
-
-            elif pm_cmd == CONFIG['prefix'] + 'clrbn':
-                threading.Thread(target=self.do_clear_bad_nicks).start()
-
-            elif pm_cmd == CONFIG['prefix'] + 'clrbs':
-                threading.Thread(target=self.do_clear_bad_strings).start()
-
-            elif pm_cmd == CONFIG['prefix'] + 'clrba':
-                threading.Thread(target=self.do_clear_bad_accounts).start()
-
-            # Mod and bot controller commands.
-            elif pm_cmd == CONFIG['prefix'] + 'disconnect':
-                self.do_pm_disconnect(pm_arg)
-
-            elif pm_cmd == CONFIG['prefix'] + 'op':
-                threading.Thread(target=self.do_op_user, args=(pm_parts, )).start()
-
-            elif pm_cmd == CONFIG['prefix'] + 'deop':
-                threading.Thread(target=self.do_deop_user, args=(pm_parts, )).start()
-
-            elif pm_cmd == CONFIG['prefix'] + 'up':
-                threading.Thread(target=self.do_cam_up, args=(pm_arg, )).start()
-
-            elif pm_cmd == CONFIG['prefix'] + 'down':
-                threading.Thread(target=self.do_cam_down, args=(pm_arg, )).start()
-
-            elif pm_cmd == CONFIG['prefix'] + 'nick':
-                self.do_nick(pm_arg)
-
-            elif pm_cmd == CONFIG['prefix'] + 'ban':
-                threading.Thread(target=self.do_kick, args=(pm_arg, True, True, )).start()
-
-            elif pm_cmd == CONFIG['prefix'] + 'nocam':
-                threading.Thread(target=self.do_nocam, args=(pm_arg, )).start()
-
-            elif pm_cmd == CONFIG['prefix'] + 'noguest':
-                threading.Thread(target=self.do_no_guest, args=(pm_arg, )).start()
-
-            elif pm_cmd == CONFIG['prefix'] + 'notice':
-                if self.is_client_mod:
-                    threading.Thread(target=self.send_owner_run_msg, args=(pm_arg, )).start()
-                else:
-                    threading.Thread(target=self.send_private_msg, args=('Not enabled.', msg_sender)).start()
-
-            elif pm_cmd == CONFIG['prefix'] + 'say':
-                threading.Thread(target=self.send_chat_msg, args=(pm_arg, )).start()
-
-            elif pm_cmd == CONFIG['prefix'] + 'setpm':
-                threading.Thread(target=self.do_set_auto_pm, args=(pm_arg, )).start()
-
-            elif pm_cmd == CONFIG['prefix'] + 'pmall':
-                threading.Thread(target=self.do_pm_all, args=(pm_arg, )).start()
-
-            # Public commands.
-            elif pm_cmd == CONFIG['prefix'] + 'sudo':
-                threading.Thread(target=self.do_super_user, args=(pm_arg, )).start()
-
-            elif pm_cmd == CONFIG['prefix'] + 'opme':
-                threading.Thread(target=self.do_opme, args=(pm_arg, )).start()
-
-            elif pm_cmd == CONFIG['prefix'] + 'pm':
-                threading.Thread(target=self.do_pm_bridge, args=(pm_parts, )).start()
+            command = self.pm_commands.lookup(pm_cmd)
+            if command is not None:
+                self.run_command(self.pm_commands, pm_cmd, command, pm_arg, pm_parts)
 
         # Print to console.
         self.console_write(pinylib.COLOR['white'], 'Private message from ' + msg_sender + ': ' + str(private_msg)
                            .replace(self.key, '***KEY***')
                            .replace(CONFIG['super_key'], '***SUPER KEY***'))
 
+    def do_pm_notice(self, notice_msg):
+        """
+        Send a notice to the room on behalf of the room owner.
+        :param notice_msg: str the notice.
+        """
+        if self.is_client_mod:
+            self.send_owner_run_msg(notice_msg)
+        else:
+            self.send_private_msg('Not enabled.', self.user_obj.nick)
+
     # == Super Mod Command Methods. ==
     def do_set_room_pass(self, password):
         """
@@ -2717,17 +2641,16 @@ class TinychatBot(pinylib.TinychatRTMPClient):
         :param password: str the room password
         """
         if self.is_client_owner:
-            if self.user_obj.is_super:
-                if not password:
-                    self.privacy_settings.set_room_password()
-                    self.send_bot_msg('*The room password was removed.*', self.is_client_mod)
-                    pinylib.time.sleep(1)
-                    self.send_private_msg('The room password was removed.', self.user_obj.nick)
-                elif len(password) > 1:
-                    self.privacy_settings.set_room_password(password)
-                    self.send_private_msg('*The room password is now:* ' + password, self.user_obj.nick)
-                    pinylib.time.sleep(1)
-                    self.send_bot_msg('*The room is now password protected.*', self.is_client_mod)
+            if not password:
+                self.privacy_settings.set_room_password()
+                self.send_bot_msg('*The room password was removed.*', self.is_client_mod)
+                pinylib.time.sleep(1)
+                self.send_private_msg('The room password was removed.', self.user_obj.nick)
+            elif len(password) > 1:
+                self.privacy_settings.set_room_password(password)
+                self.send_private_msg('*The room password is now:* ' + password, self.user_obj.nick)
+                pinylib.time.sleep(1)
+                self.send_bot_msg('*The room is now password protected.*', self.is_client_mod)
 
     def do_set_broadcast_pass(self, password):
         """
@@ -2735,17 +2658,16 @@ class TinychatBot(pinylib.TinychatRTMPClient):
         :param password: str the password
         """
         if self.is_client_owner:
-            if self.user_obj.is_super:
-                if not password:
-                    self.privacy_settings.set_broadcast_password()
-                    self.send_bot_msg('*The broadcast password was removed.*', self.is_client_mod)
-                    pinylib.time.sleep(1)
-                    self.send_private_msg('The broadcast password was removed.', self.user_obj.nick)
-                elif len(password) > 1:
-                    self.privacy_settings.set_broadcast_password(password)
-                    self.send_private_msg('*The broadcast password is now:* ' + password, self.user_obj.nick)
-                    pinylib.time.sleep(1)
-                    self.send_bot_msg('*Broadcast password is enabled.*', self.is_client_mod)
+            if not password:
+                self.privacy_settings.set_broadcast_password()
+                self.send_bot_msg('*The broadcast password was removed.*', self.is_client_mod)
+                pinylib.time.sleep(1)
+                self.send_private_msg('The broadcast password was removed.', self.user_obj.nick)
+            elif len(password) > 1:
+                self.privacy_settings.set_broadcast_password(password)
+                self.send_private_msg('*The broadcast password is now:* ' + password, self.user_obj.nick)
+                pinylib.time.sleep(1)
+                self.send_bot_msg('*Broadcast password is enabled.*', self.is_client_mod)
 
     # == Owner And Super Mod Command Methods. ==
     def do_key(self, new_key):
@@ -2753,30 +2675,48 @@ class TinychatBot(pinylib.TinychatRTMPClient):
         Shows or sets a new secret key.
         :param new_key: str the new secret key.
         """
-        if self.user_obj.is_owner or self.user_obj.is_super:
-            if len(new_key) is 0:
-                self.send_private_msg('The current key is: *' + self.key + '*', self.user_obj.nick)
-            elif len(new_key) < 6:
-                self.send_private_msg('Key must be at least 6 characters long: ' + str(len(self.key)),
-                                          self.user_obj.nick)
-            elif len(new_key) >= 6:
-                self.key = new_key
-                self.send_private_msg('The key was changed to: *' + self.key + '*', self.user_obj.nick)
+        if len(new_key) is 0:
+            self.send_private_msg('The current key is: *' + self.key + '*', self.user_obj.nick)
+        elif len(new_key) < 6:
+            self.send_private_msg('Key must be at least 6 characters long: ' + str(len(self.key)),
+                                      self.user_obj.nick)
+        elif len(new_key) >= 6:
+            self.key = new_key
+            self.send_private_msg('The key was changed to: *' + self.key + '*', self.user_obj.nick)
 
     def do_clear_bad_nicks(self):
         """ Clears the bad nicks file. """
-        if self.user_obj.is_owner or self.user_obj.is_super:
-            pinylib.fh.delete_file_content(CONFIG['path'], CONFIG['badnicks'])
+        self.bad_nicks.clear()
 
     def do_clear_bad_strings(self):
         """ Clears the bad strings file. """
-        if self.user_obj.is_owner or self.user_obj.is_super:
-            pinylib.fh.delete_file_content(CONFIG['path'], CONFIG['badstrings'])
+        pinylib.fh.delete_file_content(CONFIG['path'], CONFIG['badstrings'])
+        self.bad_strings.invalidate()
 
     def do_clear_bad_accounts(self):
         """ Clears the bad accounts file. """
-        if self.user_obj.is_owner or self.user_obj.is_super:
-            pinylib.fh.delete_file_content(CONFIG['path'], CONFIG['badaccounts'])
+        self.bad_accounts.clear()
+
+    def do_stats(self):
+        """ Sends the hit counts and timings of the spam rules, commands and callbacks, and logs them in full. """
+        spam = self.spam_filter.stats()
+        commands = self.chat_commands.stats()
+        commands.update(self.pm_commands.stats())
+        callbacks = self.callback_registry.stats()
+        workers = self.workers.stats()
+        log.info('Stats: spam %s, commands %s, callbacks %s, workers %s' % (spam, commands, callbacks, workers))
+
+        hits = ', '.join('%s %d' % item for item in sorted(spam['hits'].iteritems())) or 'none'
+        self.send_private_msg('*Spam checks:* %d, %.0fus on average, hits: %s' %
+                              (spam['checks'], spam['average'] * 1e6, hits), self.user_obj.nick)
+        for name, timings in (('Commands', commands), ('Callbacks', callbacks)):
+            # The five taking the most time in total.
+            slowest = sorted(timings.iteritems(), key=lambda item: item[1][1], reverse=True)[:5]
+            self.send_private_msg('*%s:* %s' % (name, ', '.join('%s %dx %.1fms' % (cmd, count, average * 1000)
+                                                                for cmd, (count, total, average) in slowest) or
+                                                 'none'), self.user_obj.nick)
+        self.send_private_msg('*Workers:* %(active)d active, %(queued)d queued, %(rejected)d rejected, '
+                              '%(completed)d completed' % workers, self.user_obj.nick)
 
     # == Mod And Bot Controller Command Methods. ==
     def do_pm_disconnect(self, key):
@@ -2784,19 +2724,18 @@ class TinychatBot(pinylib.TinychatRTMPClient):
         Disconnects the bot via PM.
         :param key: str the key to access the command.
         """
-        if self.user_obj.is_owner or self.user_obj.is_super or self.user_obj.is_mod or self.user_obj.has_power:
-            if len(key) is 0:
-                self.send_private_msg('Missing key.', self.user_obj.nick)
+        if len(key) is 0:
+            self.send_private_msg('Missing key.', self.user_obj.nick)
+        else:
+            if key == self.key:
+                log.info('User %s:%s commenced remote disconnect.' % (self.user_obj.nick, self.user_obj.id))
+                self.send_private_msg('The bot will disconnect from the room.', self.user_obj.nick)
+                self.console_write(pinylib.COLOR['red'], 'Disconnected by %s.' % self.user_obj.nick)
+                threading.Thread(target=self.disconnect).start()
+                # Exit with a normal status code.
+                sys.exit(1)
             else:
-                if key == self.key:
-                    log.info('User %s:%s commenced remote disconnect.' % (self.user_obj.nick, self.user_obj.id))
-                    self.send_private_msg('The bot will disconnect from the room.', self.user_obj.nick)
-                    self.console_write(pinylib.COLOR['red'], 'Disconnected by %s.' % self.user_obj.nick)
-                    threading.Thread(target=self.disconnect).start()
-                    # Exit with a normal status code.
-                    sys.exit(1)
-                else:
-                    self.send_private_msg('Wrong key.', self.user_obj.nick)
+                self.send_private_msg('Wrong key.', self.user_obj.nick)
 
     def do_op_user(self, msg_parts):
         """
@@ -2804,7 +2743,7 @@ class TinychatBot(pinylib.TinychatRTMPClient):
         NOTE: Mods or bot controllers will have to provide a key, the owner does not.
         :param msg_parts: list the pm message as a list.
         """
-        if self.user_obj.is_owner or self.user_obj.is_super:
+        if self.user_obj.roles & PRIVILEGE_OWNER:
             if len(msg_parts) == 1:
                 self.send_private_msg('Missing username.', self.user_obj.nick)
             elif len(msg_parts) == 2:
@@ -2819,7 +2758,7 @@ class TinychatBot(pinylib.TinychatRTMPClient):
                 else:
                     self.send_private_msg('No user named: ' + msg_parts[1], self.user_obj.nick)
 
-        elif self.user_obj.is_mod or self.user_obj.has_power:
+        elif self.user_obj.roles & PRIVILEGE_KEY:
             if len(msg_parts) == 1:
                 self.send_private_msg('Missing username.', self.user_obj.nick)
             elif len(msg_parts) == 2:
@@ -2846,7 +2785,7 @@ class TinychatBot(pinylib.TinychatRTMPClient):
         NOTE: Mods or bot controllers will have to provide a key, owner does not.
         :param msg_parts: list the pm message as a list.
         """
-        if self.user_obj.is_owner or self.user_obj.is_super:
+        if self.user_obj.roles & PRIVILEGE_OWNER:
             if len(msg_parts) == 1:
                 self.send_private_msg('Missing username.', self.user_obj.nick)
             elif len(msg_parts) == 2:
@@ -2861,7 +2800,7 @@ class TinychatBot(pinylib.TinychatRTMPClient):
                 else:
                     self.send_private_msg('No user named: ' + msg_parts[1], self.user_obj.nick)
 
-        elif self.user_obj.is_mod or self.user_obj.has_power:
+        elif self.user_obj.roles & PRIVILEGE_KEY:
             if len(msg_parts) == 1:
                 self.send_private_msg('Missing username.', self.user_obj.nick)
             elif len(msg_parts) == 2:
@@ -2889,10 +2828,10 @@ class TinychatBot(pinylib.TinychatRTMPClient):
         Makes the bot cam up.
         :param key str the key needed for moderators/bot controllers.
         """
-        if self.user_obj.is_owner or self.user_obj.is_super:
+        if self.user_obj.roles & PRIVILEGE_OWNER:
             self.send_bauth_msg()
             self._set_stream()
-        elif self.user_obj.is_mod or self.user_obj.has_power:
+        elif self.user_obj.roles & PRIVILEGE_KEY:
             if len(key) is 0:
                 self.send_private_msg('Missing key.', self.user_obj.nick)
             elif key == self.key:
@@ -2906,9 +2845,9 @@ class TinychatBot(pinylib.TinychatRTMPClient):
         Makes the bot cam down.
         :param key: str the key needed for moderators/bot controllers.
         """
-        if self.user_obj.is_owner or self.user_obj.is_super:
+        if self.user_obj.roles & PRIVILEGE_OWNER:
             self._set_stream(False)
-        elif self.user_obj.is_mod or self.user_obj.has_power:
+        elif self.user_obj.roles & PRIVILEGE_KEY:
             if len(key) is 0:
                 self.send_private_msg('Missing key.', self.user_obj.nick)
             elif key == self.key:
@@ -2923,10 +2862,10 @@ class TinychatBot(pinylib.TinychatRTMPClient):
         :param key: str secret key.
         """
         if self.no_cam:
-            if self.user_obj.is_owner or self.user_obj.is_super:
+            if self.user_obj.roles & PRIVILEGE_OWNER:
                 self.no_cam = False
                 self.send_private_msg('*Broadcasting is allowed.*', self.user_obj.nick)
-            elif self.user_obj.is_mod or self.user_obj.has_power:
+            elif self.user_obj.roles & PRIVILEGE_KEY:
                 if len(key) is 0:
                     self.send_private_msg('Missing key.', self.user_obj.nick)
                 elif key == self.key:
@@ -2935,10 +2874,10 @@ class TinychatBot(pinylib.TinychatRTMPClient):
                 else:
                     self.send_private_msg('Wrong key.', self.user_obj.nick)
         else:
-            if self.user_obj.is_owner or self.user_obj.is_super:
+            if self.user_obj.roles & PRIVILEGE_OWNER:
                 self.no_cam = True
                 self.send_private_msg('*Broadcasting is NOT allowed.*', self.user_obj.nick)
-            elif self.user_obj.is_mod or self.user_obj.has_power:
+            elif self.user_obj.roles & PRIVILEGE_KEY:
                 if len(key) is 0:
                     self.send_private_msg('Missing key.', self.user_obj.nick)
                 elif key == self.key:
@@ -2958,10 +2897,10 @@ class TinychatBot(pinylib.TinychatRTMPClient):
         :param key: str secret key.
         """
         if self.no_guests:
-            if self.user_obj.is_owner:
+            if self.user_obj.roles & ROLE_OWNER:
                 self.no_guests = False
                 self.send_private_msg('*Guests ARE allowed to join the room.*', self.user_obj.nick)
-            elif self.user_obj.is_mod or self.user_obj.has_power:
+            elif self.user_obj.roles & PRIVILEGE_KEY:
                 if len(key) is 0:
                     self.send_private_msg('Missing key.', self.user_obj.nick)
                 elif key == self.key:
@@ -2970,10 +2909,10 @@ class TinychatBot(pinylib.TinychatRTMPClient):
                 else:
                     self.send_private_msg('Wrong key.', self.user_obj.nick)
         else:
-            if self.user_obj.is_owner or self.user_obj.is_super:
+            if self.user_obj.roles & PRIVILEGE_OWNER:
                 self.no_guests = True
                 self.send_private_msg('*Guests are NOT allowed to join the room.*', self.user_obj.nick)
-            elif self.user_obj.is_mod or self.user_obj.has_power:
+            elif self.user_obj.roles & PRIVILEGE_KEY:
                 if len(key) is 0:
                     self.send_private_msg('Missing key.', self.user_obj.nick)
                 elif key == self.key:
@@ -2987,34 +2926,32 @@ class TinychatBot(pinylib.TinychatRTMPClient):
         Allows for owners/moderators/botters to change the room private message.
         :param message: str the new private message to be sent automatically to everyone upon entering the room.
         """
-        if self.user_obj.is_mod or self.user_obj.has_power or self.user_obj.is_owner:
-            if CONFIG['auto_pm']:
-                if len(message) is 0:
-                    self.send_private_msg('Please enter a new Room Private Message.', self.user_obj.nick)
-                else:
-                    CONFIG['pm_msg'] = message
-                    self.send_private_msg('Room private message now set to: ' + str(CONFIG['pm_msg']), self.user_obj.nick)
+        if CONFIG['auto_pm']:
+            if len(message) is 0:
+                self.send_private_msg('Please enter a new Room Private Message.', self.user_obj.nick)
             else:
-                self.send_private_msg('Automatic private message feature is not enabled in the configuration.',
-                                      self.user_obj.nick)
+                CONFIG['pm_msg'] = message
+                self.send_private_msg('Room private message now set to: ' + str(CONFIG['pm_msg']), self.user_obj.nick)
+        else:
+            self.send_private_msg('Automatic private message feature is not enabled in the configuration.',
+                                  self.user_obj.nick)
 
     def do_pm_all(self, message):
         """
         Sends a private bot message to everyone in the room.
         :param message: str the message you want to send to everyone.
         """
-        if self.user_obj.is_mod or self.user_obj.has_power or self.user_obj.is_owner:
-            if not self.pmming_all:
-                if len(message) is 0:
-                    self.send_private_msg('Please enter a message to send to all users.', self.user_obj.nick)
-                else:
-                    self.pmming_all = True
-                    for user in self.room_users.keys():
-                        self.send_private_msg(str(message), str(user))
-                        pinylib.time.sleep(1.2)
-                    self.pmming_all = False
+        if not self.pmming_all:
+            if len(message) is 0:
+                self.send_private_msg('Please enter a message to send to all users.', self.user_obj.nick)
             else:
-                self.send_private_msg('There is already a private being sent to all users in the room.', self.is_client_mod)
+                self.pmming_all = True
+                for user in self.room_users.keys():
+                    self.send_private_msg(str(message), str(user))
+                    pinylib.time.sleep(1.2)
+                self.pmming_all = False
+        else:
+            self.send_private_msg('There is already a private being sent to all users in the room.', self.is_client_mod)
 
     # == Public PM Command Methods. ==
     def do_super_user(self, super_key):
@@ -3241,23 +3178,20 @@ class TinychatBot(pinylib.TinychatRTMPClient):
             human_time = '%d Day(s) %d:%02d:%02d' % (d, h, m, s)
         return human_time
 
-    def check_msg_for_bad_string(self, msg, pm=False):
+    def check_msg_for_bad_string(self, msg, pm=False, folded_msg=None):
         """
         Checks the chat message for bad string.
         :param msg: str the chat message.
         :param pm: boolean true/false if the check is for a pm or not.
+        :param folded_msg: unicode the message folded by matcher.fold, if it was.
         """
-        msg_words = msg.split(' ')
-        bad_strings = pinylib.fh.file_reader(CONFIG['path'], CONFIG['badstrings'])
-        if bad_strings is not None:
-            for word in msg_words:
-                if word in bad_strings:
-                    self.send_ban_msg(self.user_obj.nick, self.user_obj.id)
-                    if not pm:
-                        self.send_bot_msg(special_unicode['toxic'] + ' *Auto-banned*: (bad string in message)',
-                                          self.is_client_mod)
-                    if CONFIG['bsforgive']:
-                        self.send_forgive_msg(self.user_obj.id)
+        if self.bad_strings.search(msg, folded_msg) is not None:
+            self.send_ban_msg(self.user_obj.nick, self.user_obj.id)
+            if not pm:
+                self.send_bot_msg(special_unicode['toxic'] + ' *Auto-banned*: (bad string in message)',
+                                  self.is_client_mod)
+            if CONFIG['bsforgive']:
+                self.send_forgive_msg(self.user_obj.id)
 
     def connection_info(self):
         """ Prints connection information regarding the bot into the console. """
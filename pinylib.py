@@ -10,6 +10,7 @@ import threading
 import random
 import traceback
 import logging
+from collections import deque, namedtuple
 
 import os
 import sys
@@ -101,31 +102,704 @@ def set_window_title(window_message):
     os.system(window_title)
 
 
-class RoomUser:
+def _intern(value):
+    """
+    Intern a byte string, so the many copies of a nick or account share one object.
+    :param value: str, unicode or None.
+    :return: the interned string, or the value as it was if it is not a byte string.
+    """
+    if type(value) is str:
+        return intern(value)
+    return value
+
+
+# The roles of a user, as bit flags in RoomUser.roles.
+ROLE_OWNER = 1
+ROLE_SUPER = 2
+ROLE_MOD = 4
+ROLE_POWER = 8
+
+
+def _role_property(role):
+    """
+    Make a bool property for one of the role flags of a RoomUser.
+    :param role: int the ROLE_* flag.
+    :return: property reading and setting the flag in the roles of the user.
+    """
+    def getter(self):
+        return self.roles & role != 0
+
+    def setter(self, value):
+        if value:
+            self.roles |= role
+        else:
+            self.roles &= ~role
+
+    return property(getter, setter)
+
+
+class RoomUser(object):
     """
     A object to hold info about a user.
     Each user will have a object associated with there username.
     The object is used to store information about the user.
+
+    The nick, id and user_account are indexed by the RoomUserRegistry holding the user;
+    setting them keeps the indexes up to date. The roles of the user are kept as ROLE_* bit flags
+    in roles, so a privilege check is a single AND; is_owner, is_super, is_mod and has_power
+    read and set the single flags.
     """
+    __slots__ = ('_nick', '_id', '_user_account', '_registry', 'last_msg', 'user_account_type',
+                 'user_account_giftpoints', 'roles', 'tinychat_id', 'last_login', 'device_type',
+                 'reading_only', 'private_media', 'flood')
+
+    is_owner = _role_property(ROLE_OWNER)
+    is_super = _role_property(ROLE_SUPER)
+    is_mod = _role_property(ROLE_MOD)
+    has_power = _role_property(ROLE_POWER)
+
     def __init__(self, nick, uid=None, last_msg=None):
-        self.nick = nick
-        self.id = uid
+        self._registry = None
+        self._nick = _intern(nick)
+        self._id = uid
+        self._user_account = None
         self.last_msg = last_msg
-        self.user_account = None
         self.user_account_type = None
         self.user_account_giftpoints = None
-        self.is_owner = False
-        self.is_super = False
-        self.is_mod = False
-        self.has_power = False
+        self.roles = 0
         self.tinychat_id = None
         self.last_login = None
         self.device_type = ''
         self.reading_only = False
+        self.private_media = None
+        # The message history a flood detector keeps for the user, if any.
+        self.flood = None
+
+    @property
+    def nick(self):
+        return self._nick
+
+    @nick.setter
+    def nick(self, nick):
+        if self._registry is None:
+            self._nick = _intern(nick)
+        else:
+            self._registry._set_nick(self, _intern(nick))
+
+    @property
+    def id(self):
+        return self._id
+
+    @id.setter
+    def id(self, uid):
+        if self._registry is None:
+            self._id = uid
+        else:
+            self._registry._set_id(self, uid)
+
+    @property
+    def user_account(self):
+        return self._user_account
+
+    @user_account.setter
+    def user_account(self, account):
+        if self._registry is None:
+            self._user_account = _intern(account)
+        else:
+            self._registry._set_account(self, _intern(account))
+
+
+class RoomUserRegistry(object):
+    """
+    The users in the room, keyed by nick, with secondary indexes by id, account and case folded nick.
+
+    Lookups are dict lookups, and a rename moves the user between keys in one step. The registry
+    can be used like the dict of nick to RoomUser it replaces.
+    """
+
+    def __init__(self):
+        self._users = {}
+        self._by_id = {}
+        self._by_account = {}
+        self._by_folded_nick = {}
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._users)
+
+    def __contains__(self, nick):
+        return nick in self._users
+
+    def __getitem__(self, nick):
+        return self._users[nick]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def keys(self):
+        """
+        Get the nicks of the users.
+        :return: list a copy of the nicks, safe to iterate while users join and leave.
+        """
+        with self._lock:
+            return self._users.keys()
+
+    def values(self):
+        """
+        Get the users.
+        :return: list a copy of the RoomUser objects.
+        """
+        with self._lock:
+            return self._users.values()
+
+    def add(self, nick):
+        """
+        Get the user with a nick, adding a new user if there is none.
+        :param nick: str the nick of the user.
+        :return: RoomUser the user.
+        """
+        with self._lock:
+            user = self._users.get(nick)
+            if user is None:
+                user = RoomUser(nick)
+                self._users[user.nick] = user
+                self._by_folded_nick[user.nick.lower()] = user
+                user._registry = self
+            return user
+
+    def add_many(self, nicks):
+        """
+        Get the users with the nicks, adding new users for the nicks there are none for, in one go.
+        :param nicks: list the nicks of the users.
+        :return: list the RoomUser objects, in the same order as the nicks.
+        """
+        users = []
+        with self._lock:
+            for nick in nicks:
+                user = self._users.get(nick)
+                if user is None:
+                    user = RoomUser(nick)
+                    self._users[user.nick] = user
+                    self._by_folded_nick[user.nick.lower()] = user
+                    user._registry = self
+                users.append(user)
+        return users
+
+    def find(self, nick):
+        """
+        Find a user by nick.
+        :param nick: str the nick of the user.
+        :return: RoomUser or None if there is no user with the nick.
+        """
+        return self._users.get(nick)
+
+    def find_folded(self, nick):
+        """
+        Find a user by nick, ignoring the case.
+        :param nick: str the nick of the user.
+        :return: RoomUser or None if there is no user with the nick.
+        """
+        return self._by_folded_nick.get(nick.lower())
+
+    def find_by_id(self, uid):
+        """
+        Find a user by id.
+        :param uid: int the id of the user.
+        :return: RoomUser or None if there is no user with the id.
+        """
+        return self._by_id.get(uid)
+
+    def find_by_account(self, account):
+        """
+        Find a user by account name.
+        :param account: str the account name of the user.
+        :return: RoomUser or None if no user is logged in with the account.
+        """
+        return self._by_account.get(account)
+
+    def rename(self, old, new):
+        """
+        Change the nick of a user.
+        :param old: str the current nick of the user.
+        :param new: str the new nick of the user.
+        :return: RoomUser the renamed user, or None if there is no user with the old nick.
+        """
+        with self._lock:
+            user = self._users.get(old)
+            if user is not None:
+                user.nick = new
+            return user
+
+    def remove(self, nick):
+        """
+        Remove a user.
+        :param nick: str the nick of the user.
+        :return: RoomUser the removed user, or None if there is no user with the nick.
+        """
+        with self._lock:
+            user = self._users.pop(nick, None)
+            if user is not None:
+                self._discard(self._by_folded_nick, user.nick.lower(), user)
+                self._discard(self._by_id, user.id, user)
+                self._discard(self._by_account, user.user_account, user)
+                user._registry = None
+            return user
+
+    def clear(self):
+        """ Remove all the users. """
+        with self._lock:
+            for user in self._users.itervalues():
+                user._registry = None
+            self._users.clear()
+            self._by_id.clear()
+            self._by_account.clear()
+            self._by_folded_nick.clear()
+
+    @staticmethod
+    def _discard(index, key, user):
+        if index.get(key) is user:
+            del index[key]
+
+    def _set_nick(self, user, nick):
+        with self._lock:
+            if user._nick == nick:
+                return
+            if self._users.get(user._nick) is user:
+                del self._users[user._nick]
+                self._discard(self._by_folded_nick, user._nick.lower(), user)
+            # Whoever had the nick before has left.
+            if nick in self._users:
+                self.remove(nick)
+            user._nick = nick
+            self._users[nick] = user
+            self._by_folded_nick[nick.lower()] = user
+
+    def _set_id(self, user, uid):
+        with self._lock:
+            self._discard(self._by_id, user._id, user)
+            user._id = uid
+            if uid is not None:
+                self._by_id[uid] = user
+
+    def _set_account(self, user, account):
+        with self._lock:
+            self._discard(self._by_account, user._user_account, user)
+            user._user_account = account
+            if account:
+                self._by_account[account] = user
+
+
+class WorkerPool:
+    """
+    A fixed amount of worker threads running tasks from a bounded queue.
+
+    Tasks which can not be queued because the queue is full (or the pool has been shut down)
+    are rejected and counted, so a flood of commands or joins never piles up threads.
+    """
+
+    def __init__(self, size, max_depth, name='worker'):
+        """
+        Initialize the pool and start the worker threads.
+        :param size: int the amount of worker threads.
+        :param max_depth: int the maximum amount of tasks that may be waiting for a worker.
+        :param name: str the name prefix of the worker threads.
+        """
+        self.size = max(size, 1)
+        self.max_depth = max_depth
+        self.closed = False
+        self.active = 0
+        self.rejected = 0
+        self.completed = 0
+        self.high_water = 0
+
+        self._tasks = deque()
+        self._condition = threading.Condition()
+        self._workers = []
+        for number in xrange(self.size):
+            worker = threading.Thread(target=self._work, name='%s-%d' % (name, number))
+            worker.daemon = True
+            worker.start()
+            self._workers.append(worker)
+
+    def __len__(self):
+        return len(self._tasks)
+
+    def is_worker(self):
+        """
+        Check if the calling thread is one of the worker threads.
+        :return: bool True if called from a worker thread.
+        """
+        return threading.current_thread() in self._workers
+
+    def submit(self, func, *args, **kwargs):
+        """
+        Queue a task for the workers.
+        :param func: callable the task.
+        :return: bool True if the task was queued, False if it was rejected.
+        """
+        with self._condition:
+            if self.closed or len(self._tasks) >= self.max_depth:
+                self.rejected += 1
+                return False
+
+            self._tasks.append((func, args, kwargs))
+            if len(self._tasks) > self.high_water:
+                self.high_water = len(self._tasks)
+            self._condition.notify()
+            return True
+
+    def _work(self):
+        """ Run queued tasks until the pool is shut down. """
+        while True:
+            with self._condition:
+                while not self._tasks and not self.closed:
+                    self._condition.wait()
+                if not self._tasks:
+                    return
+                func, args, kwargs = self._tasks.popleft()
+                self.active += 1
+
+            try:
+                func(*args, **kwargs)
+            except Exception as ex:
+                log.error('Worker task error: %s' % ex, exc_info=True)
+                if CONFIG['debug_mode']:
+                    traceback.print_exc()
+            finally:
+                with self._condition:
+                    self.active -= 1
+                    self.completed += 1
+
+    def shutdown(self):
+        """ Stop accepting tasks, the workers exit once the queued tasks have run. """
+        with self._condition:
+            self.closed = True
+            self._condition.notify_all()
+
+    def stats(self):
+        """
+        Get the state of the pool.
+        :return: dict the amount of active, queued, rejected and completed tasks.
+        """
+        with self._condition:
+            return {
+                'size': self.size,
+                'active': self.active,
+                'queued': len(self._tasks),
+                'high_water': self.high_water,
+                'rejected': self.rejected,
+                'completed': self.completed
+            }
+
+
+class EventQueue:
+    """
+    A bounded queue of the application events read from the server, waiting to be dispatched.
+
+    What happens when the queue is full depends on the overflow policy: OVERFLOW_BLOCK makes the
+    reader wait for the dispatcher, OVERFLOW_DROP_NEWEST drops the new event and OVERFLOW_DROP_OLDEST
+    drops the longest waiting event to make room for it.
+    """
+
+    OVERFLOW_BLOCK = 'block'
+    OVERFLOW_DROP_NEWEST = 'drop_newest'
+    OVERFLOW_DROP_OLDEST = 'drop_oldest'
+
+    def __init__(self, max_depth, overflow=OVERFLOW_BLOCK):
+        """
+        Initialize the event queue.
+        :param max_depth: int the maximum amount of events that may be waiting.
+        :param overflow: str the overflow policy.
+        """
+        if overflow not in (self.OVERFLOW_BLOCK, self.OVERFLOW_DROP_NEWEST, self.OVERFLOW_DROP_OLDEST):
+            log.warning('Unknown event queue overflow policy %s, using %s.' % (overflow, self.OVERFLOW_BLOCK))
+            overflow = self.OVERFLOW_BLOCK
+
+        self.max_depth = max(max_depth, 1)
+        self.overflow = overflow
+        self.closed = False
+        self.high_water = 0
+        self.dropped = 0
+        self.blocked = 0
+
+        self._events = deque()
+        self._condition = threading.Condition()
+
+    def __len__(self):
+        return len(self._events)
+
+    def put(self, event):
+        """
+        Add an event to the end of the queue, applying the overflow policy if the queue is full.
+        :param event: dict the event.
+        :return: bool True if the event was queued, False if it was dropped.
+        """
+        with self._condition:
+            if len(self._events) >= self.max_depth and not self.closed:
+                if self.overflow == self.OVERFLOW_BLOCK:
+                    self.blocked += 1
+                    while len(self._events) >= self.max_depth and not self.closed:
+                        self._condition.wait()
+                elif self.overflow == self.OVERFLOW_DROP_OLDEST:
+                    self._events.popleft()
+                    self.dropped += 1
+                else:
+                    self.dropped += 1
+                    return False
+
+            if self.closed:
+                self.dropped += 1
+                return False
+
+            self._events.append(event)
+            if len(self._events) > self.high_water:
+                self.high_water = len(self._events)
+            self._condition.notify_all()
+            return True
+
+    def get(self):
+        """
+        Wait for the next event.
+        :return: dict the event, or None once the queue is closed and empty.
+        """
+        with self._condition:
+            while not self._events and not self.closed:
+                self._condition.wait()
+            if not self._events:
+                return None
+            event = self._events.popleft()
+            self._condition.notify_all()
+            return event
+
+    def close(self):
+        """ Stop accepting events, the events already waiting can still be taken out. """
+        with self._condition:
+            self.closed = True
+            self._condition.notify_all()
+
+    def stats(self):
+        """
+        Get the state of the queue.
+        :return: dict the amount of waiting events, the high water mark, dropped and blocked puts.
+        """
+        with self._condition:
+            return {
+                'queued': len(self._events),
+                'high_water': self.high_water,
+                'dropped': self.dropped,
+                'blocked': self.blocked
+            }
+
+
+class UserEventScheduler:
+    """
+    Runs the events of every user in the order they arrived, on the threads of a WorkerPool.
+
+    Events of different users run in parallel, the events of a single user never do. A worker
+    handles at most batch_size events of a user before the rest of them are queued behind the
+    other waiting tasks, so one busy user can not hold on to a worker.
+    """
+
+    def __init__(self, workers, max_depth, batch_size=8):
+        """
+        Initialize the scheduler.
+        :param workers: WorkerPool the pool running the events.
+        :param max_depth: int the maximum amount of events that may be waiting per user.
+        :param batch_size: int the amount of events of a user handled in one go.
+        """
+        self.workers = workers
+        self.max_depth = max_depth
+        self.batch_size = batch_size
+        self.dropped = 0
+        self.inline = 0
+
+        # User key to the deque of waiting events, the key is present while its events are being handled.
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(events) for events in self._pending.itervalues())
+
+    def submit(self, key, func, *args):
+        """
+        Queue an event of a user.
+        :param key: the key identifying the user.
+        :param func: callable handling the event.
+        :return: bool True if the event was queued, False if it was dropped.
+        """
+        with self._lock:
+            events = self._pending.get(key)
+            if events is not None:
+                if len(events) >= self.max_depth:
+                    self.dropped += 1
+                    return False
+                events.append((func, args))
+                return True
+            self._pending[key] = deque([(func, args)])
+
+        if not self.workers.submit(self._drain, key):
+            # The pool is saturated; handle the events here, which holds up the caller until the workers catch up.
+            self.inline += 1
+            self._drain(key, inline=True)
+        return True
+
+    def _drain(self, key, inline=False):
+        """
+        Handle the waiting events of a user.
+        :param key: the key identifying the user.
+        :param inline: bool True if not running on a worker thread.
+        """
+        handled = 0
+        while True:
+            with self._lock:
+                events = self._pending[key]
+                if not events:
+                    del self._pending[key]
+                    return
+                if handled >= self.batch_size and not inline:
+                    if self.workers.submit(self._drain, key):
+                        return
+                func, args = events.popleft()
+
+            try:
+                func(*args)
+            except Exception as ex:
+                log.error('User event error: %s' % ex, exc_info=True)
+                if CONFIG['debug_mode']:
+                    traceback.print_exc()
+            handled += 1
+
+    def stats(self):
+        """
+        Get the state of the scheduler.
+        :return: dict the amount of users with waiting events, waiting events, dropped and inline handled events.
+        """
+        with self._lock:
+            return {
+                'users': len(self._pending),
+                'queued': sum(len(events) for events in self._pending.itervalues()),
+                'dropped': self.dropped,
+                'inline': self.inline
+            }
+
+
+class CallbackRegistry:
+    """
+    Maps the names of the commands sent by the server to the methods handling them.
+    Keeps a hit count and the total handling time of every command.
+    """
+    def __init__(self, client, callbacks):
+        """
+        Initialize the registry.
+        :param client: TinychatRTMPClient the client the handler methods are looked up on.
+        :param callbacks: dict command name to the name of the handler method.
+        """
+        self.handlers = {}
+        self.hits = {}
+        self.timings = {}
+
+        for cmd, method_name in callbacks.iteritems():
+            self.register(cmd, getattr(client, method_name))
+
+    def register(self, cmd, handler):
+        """
+        Register (or override) the handler of a command.
+        :param cmd: str the command name.
+        :param handler: callable taking the decoded command list.
+        """
+        self.handlers[cmd] = handler
+        self.hits.setdefault(cmd, 0)
+        self.timings.setdefault(cmd, 0.0)
+
+    def unregister(self, cmd):
+        """
+        Remove the handler of a command, the command will be reported as unknown.
+        :param cmd: str the command name.
+        """
+        self.handlers.pop(cmd, None)
+
+    def dispatch(self, cmd, amf0_cmd):
+        """
+        Call the handler of a command.
+        :param cmd: str the command name.
+        :param amf0_cmd: list the decoded command.
+        :return: bool True if a handler was found.
+        """
+        handler = self.handlers.get(cmd)
+        if handler is None:
+            return False
+
+        start = time.time()
+        try:
+            handler(amf0_cmd)
+        finally:
+            self.hits[cmd] += 1
+            self.timings[cmd] += time.time() - start
+        return True
+
+    def stats(self):
+        """
+        Get the hit count and timings of every command which has been handled.
+        :return: dict command name to a (hits, total seconds, average seconds) tuple.
+        """
+        return dict((cmd, (hits, self.timings[cmd], self.timings[cmd] / hits))
+                    for cmd, hits in self.hits.iteritems() if hits)
+
 
+# The immutable context a chat or private message event is handled in.
+MessageContext = namedtuple('MessageContext', 'user msg msg_sender received')
 
-class TinychatRTMPClient:
+
+class TinychatRTMPClient(object):
     """ Manages a single room connection to a given room. """
+
+    # The server commands and the names of the methods unpacking them. Subclasses can extend
+    # this (or override the methods), and handlers can be added at run time via callback_registry.
+    callbacks = {
+        '_result': '_cb_result',
+        '_error': '_cb_error',
+        'onBWDone': '_cb_bwdone',
+        'onStatus': '_cb_status',
+        'registered': '_cb_registered',
+        'join': '_cb_join',
+        'joins': '_cb_joins',
+        'joinsdone': '_cb_joinsdone',
+        'oper': '_cb_oper',
+        'deop': '_cb_deop',
+        'owner': '_cb_owner',
+        'avons': '_cb_avons',
+        'pros': '_cb_pros',
+        'nick': '_cb_nick',
+        'nickinuse': '_cb_nickinuse',
+        'quit': '_cb_quit',
+        'kick': '_cb_kick',
+        'banned': '_cb_banned',
+        'banlist': '_cb_banlist',
+        'startbanlist': '_cb_startbanlist',
+        'topic': '_cb_topic',
+        'gift': '_cb_print',
+        'prepare_gift_profile': '_cb_print',
+        'from_owner': '_cb_from_owner',
+        'doublesignon': '_cb_doublesignon',
+        'privmsg': '_cb_privmsg',
+        'notice': '_cb_notice',
+        'private_room': '_cb_private_room'
+    }
+
+    # The amount of accounts whose tinychat info is fetched by one worker task.
+    user_info_batch_size = 8
+
+    # The outbound traffic class of each command, commands not listed here are sent as chat.
+    command_priorities = {
+        'cauth': rtmp_protocol.SendPriority.CONTROL,
+        'bauth': rtmp_protocol.SendPriority.CONTROL,
+        'nick': rtmp_protocol.SendPriority.CONTROL,
+        'kick': rtmp_protocol.SendPriority.MODERATION,
+        'forgive': rtmp_protocol.SendPriority.MODERATION,
+        'banlist': rtmp_protocol.SendPriority.MODERATION
+    }
+
     def __init__(self, room, tcurl=None, app=None, room_type=None, nick=None, account=None,
                  password=None, room_pass=None, ip=None, port=None, proxy=None):
 
@@ -158,8 +832,7 @@ class TinychatRTMPClient:
         self.is_connected = False
         self.is_client_owner = False
         self.is_client_mod = False
-        self.room_users = {}
-        self.user_obj = object
+        self.room_users = RoomUserRegistry()
         self.room_banlist = {}
         self.is_reconnected = False
         self.topic_msg = None
@@ -174,6 +847,58 @@ class TinychatRTMPClient:
         self.play_audio = False
         self.play_video = False
 
+        # Server command dispatch.
+        self.callback_registry = CallbackRegistry(self, self.callbacks)
+
+        # Shared worker threads for event handlers and commands which may block.
+        self.workers = WorkerPool(CONFIG['worker_pool_size'], CONFIG['worker_queue_depth'])
+        # Chat and private message events, in order per user.
+        self.user_events = UserEventScheduler(self.workers, CONFIG['user_queue_depth'])
+        self._context = threading.local()
+        # Events read from the server, waiting for the callback loop.
+        self.events = None
+        # Tinychat account info, shared by the joins and the commands looking it up.
+        self.user_info = tinychat_api.UserInfoCache(CONFIG['user_info_cache_ttl'], CONFIG['user_info_cache_size'],
+                                                    CONFIG['user_info_cache_file'])
+
+    @property
+    def context(self):
+        """ The MessageContext of the event being handled by the calling thread, or None. """
+        return getattr(self._context, 'current', None)
+
+    @property
+    def user_obj(self):
+        """ The RoomUser who sent the message being handled by the calling thread, or None. """
+        context = getattr(self._context, 'current', None)
+        if context is None:
+            return None
+        return context.user
+
+    def run_in_context(self, context, func, *args):
+        """
+        Run a function in a message context.
+        :param context: MessageContext the context.
+        :param func: callable the function to run.
+        """
+        previous = getattr(self._context, 'current', None)
+        self._context.current = context
+        try:
+            return func(*args)
+        finally:
+            self._context.current = previous
+
+    def run_task(self, func, *args):
+        """
+        Run a task which may block off the reader thread, in the current message context.
+        On a worker thread the task runs right away, keeping the events of a user in order.
+        :param func: callable the task.
+        :return: bool True if the task was run or queued, False if the worker pool is saturated.
+        """
+        if self.workers.is_worker():
+            func(*args)
+            return True
+        return self.workers.submit(self.run_in_context, self.context, func, *args)
+
     # TODO: Implement decode procedure utilised by the bot here, so an array
     #       of unicode can be parsed without any further unicode errors.
     def console_write(self, color, message):
@@ -271,7 +996,8 @@ class TinychatRTMPClient:
                 self.connection = rtmp_protocol.RtmpClient(self._ip, self._port, self._tc_url, self._embed_url,
                                                            self._swf_url, self._app, self._swf_version, self._roomtype,
                                                            self._prefix, self.roomname, self._desktop_version,
-                                                           cauth_cookie, self.account, self.proxy)
+                                                           cauth_cookie, self.account, self.proxy,
+                                                           CONFIG['send_queue_depth'])
                 self.connection.connect([])
 
                 # After-hand connection settings.
@@ -303,6 +1029,7 @@ class TinychatRTMPClient:
             #       variable for the connection?
             self.uptime = 0
 
+            self.user_info.save()
             self.connection.shutdown()
         except Exception as ex:
             log.error('Disconnect error: %s' % ex, exc_info=True)
@@ -354,243 +1081,259 @@ class TinychatRTMPClient:
                 del self.streams[stream_item]
 
     def _callback(self):
-        """ Callback loop that reads from the RTMP stream. """
+        """
+        Callback loop that dispatches the events read from the RTMP stream.
+        The stream is read on a separate thread (see _read_loop), so slow handlers do not hold up
+        answering the protocol level packets sent by the server.
+        """
         log.info('Starting the callback loop.')
-        failures = 0
-        amf0_data_type = 0  # TODO: Should be a -1(?)
-        amf0_data = None
-        while self.is_connected:
+        connection = self.connection
+        events = self.events = EventQueue(CONFIG['event_queue_depth'], CONFIG['event_queue_overflow'])
+        read_failed = threading.Event()
+        reader = threading.Thread(target=self._read_loop, args=(connection, events, read_failed),
+                                  name='rtmp-reader')
+        reader.daemon = True
+        reader.start()
+
+        while True:
+            amf0_data = events.get()
+            if amf0_data is None:
+                break
+
             try:
-                amf0_data = self.connection.reader.next()
-                amf0_data_type = amf0_data['msg']
+                try:
+                    amf0_cmd = amf0_data['command']
+                    cmd = amf0_cmd[0]
+                except (Exception, KeyError):
+                    traceback.print_exc()
+                    continue
 
-                if CONFIG['amf_reply']:
-                    self.console_write(COLOR['white'], 'REPLY --> %s' % amf0_data)
+                if not self.callback_registry.dispatch(cmd, amf0_cmd):
+                    self.console_write(COLOR['bright_red'], 'Unknown command: %s' % cmd)
 
             except Exception as ex:
-                failures += 1
-                log.info('amf data read error count: %s %s' % (failures, ex), exc_info=True)
-                if failures == 2:
-                    if CONFIG['debug_mode']:
-                        traceback.print_exc()
-                    self.reconnect()
-                    break
-            else:
-                failures = 0
-            try:
-                handled = self.connection.handle_packet(amf0_data)
-                if handled:
-                    msg = 'Handled packet of type: %s Packet data: %s' % (amf0_data_type, amf0_data)
-                    log.info(msg)
-                    if CONFIG['debug_mode']:
-                        self.console_write(COLOR['white'], msg)
-                    continue
+                log.error('General callback error: %s' % ex, exc_info=True)
+                if CONFIG['debug_mode']:
+                    traceback.print_exc()
+
+        # Only reconnect if the connection was not replaced (or closed) in the meantime.
+        if read_failed.is_set() and self.connection is connection:
+            self.reconnect()
+
+    def _read_loop(self, connection, events, read_failed):
+        """
+        Read loop that answers the protocol level packets and queues the application events.
+        The loop is bound to the connection it was started for, and stops once that connection
+        is closed or replaced, so a reader left over from a reconnect never reads the new stream.
+        :param connection: RtmpClient the connection to read from.
+        :param events: EventQueue the queue the callback loop takes the events from.
+        :param read_failed: threading.Event set if reading failed while the connection was in use.
+        """
+        failures = 0
+        amf0_data_type = 0  # TODO: Should be a -1(?)
+        try:
+            while self.is_connected and self.connection is connection:
+                try:
+                    amf0_data = connection.reader.next()
+                    amf0_data_type = amf0_data['msg']
 
+                    if CONFIG['amf_reply']:
+                        self.console_write(COLOR['white'], 'REPLY --> %s' % amf0_data)
+
+                except Exception as ex:
+                    failures += 1
+                    log.info('amf data read error count: %s %s' % (failures, ex), exc_info=True)
+                    if failures == 2:
+                        if CONFIG['debug_mode']:
+                            traceback.print_exc()
+                        # A connection closed on purpose is not a failure.
+                        if self.is_connected and self.connection is connection:
+                            read_failed.set()
+                        break
+                    continue
                 else:
+                    failures = 0
+
+                try:
+                    handled = connection.handle_packet(amf0_data)
+                    if handled:
+                        msg = 'Handled packet of type: %s Packet data: %s' % (amf0_data_type, amf0_data)
+                        log.info(msg)
+                        if CONFIG['debug_mode']:
+                            self.console_write(COLOR['white'], msg)
+
                     # This is specific to Tinychat.
-                    if amf0_data_type == rtmp_protocol.DataTypes.USER_CONTROL:
+                    elif amf0_data_type == rtmp_protocol.DataTypes.USER_CONTROL:
                         if amf0_data['event_type'] == rtmp_protocol.UserControlTypes.PING_RESPONSE:
                             self.console_write(COLOR['white'], 'Server sent \'PING_RESPONSE\'.')
 
-                    else:
-                        try:
-                            amf0_cmd = amf0_data['command']
-                            cmd = amf0_cmd[0]
-                            iparam0 = 0
-                        except (Exception, KeyError):
-                            traceback.print_exc()
-                            continue
-
-                        # ----------------------- ROOM CALLBACKS -----------------------
-                        # These are most of the room callbacks that are identified within
-                        # the SWF; the defunct callbacks have been omitted for the library
-                        # to be in correspondence with the currently established and working
-                        # Tinychat protocol.
-
-                        if cmd == '_result':
-                            if self.stream_sort:
-                                # Set streams for the client.
-                                self.client_manager(amf0_cmd)
-                            else:
-                                # Handle the initial NetConnection _result message.
-                                try:
-                                    _result_info = {
-                                        'Capabilities': str(amf0_cmd[2]['capabilities']),
-                                        'FmsVer': amf0_cmd[2]['fmsVer'],
-                                        'Code': amf0_cmd[3]['code'],
-                                        'ObjectEncoding': str(amf0_cmd[3]['objectEncoding']),
-                                        'Description': amf0_cmd[3]['description'],
-                                        'Level': amf0_cmd[3]['level']
-                                    }
-                                    self.on_result(_result_info)
-                                except (Exception, KeyError):
-                                    log.error('"_result" callback error occured: %s' % amf0_cmd)
-                                    self.console_write(COLOR['green'], str(amf0_cmd))
-
-                        elif cmd == '_error':
-                            try:
-                                _error_info = {
-                                    'Code': amf0_cmd[3]['code'],
-                                    'Description': amf0_cmd[3]['description'],
-                                    'Level': amf0_cmd[3]['level']
-                                }
-                                self.on_error(_error_info)
-                            except (Exception, KeyError):
-                                log.error('"_error" callback error occured: %s' % amf0_cmd)
-                                self.console_write(COLOR['red'], str(amf0_cmd))
-
-                        elif cmd == 'onBWDone':
-                            self.on_bwdone()
-
-                        elif cmd == 'onStatus':
-                            try:
-                                self.stream_sort = False
-                                _status_info = {
-                                    'Level': amf0_cmd[3]['level'],
-                                    'Code': amf0_cmd[3]['code'],
-                                    'Details': amf0_cmd[3]['details'],
-                                    'Clientid': amf0_cmd[3]['clientid'],
-                                    'Description': amf0_cmd[3]['description']
-                                }
-                                self.on_status(_status_info)
-                            except (Exception, KeyError):
-                                log.error('"onStatus" callback error occured: %s' % amf0_cmd)
-                                self.console_write(COLOR['magenta'], str(amf0_cmd))
-
-                        elif cmd == 'registered':
-                            client_info_dict = amf0_cmd[3]
-                            self.on_registered(client_info_dict)
-
-                        elif cmd == 'join':
-                            usr_join_info_dict = amf0_cmd[3]
-                            threading.Thread(target=self.on_join, args=(usr_join_info_dict, )).start()
-
-                        elif cmd == 'joins':
-                            current_room_users_info_list = amf0_cmd[3:]
-                            if len(current_room_users_info_list) is not 0:
-                                while iparam0 < len(current_room_users_info_list):
-                                    self.on_joins(current_room_users_info_list[iparam0])
-                                    iparam0 += 1
-
-                        elif cmd == 'joinsdone':
-                            self.on_joinsdone()
-
-                        elif cmd == 'oper':
-                            oper_id_name = amf0_cmd[3:]
-                            while iparam0 < len(oper_id_name):
-                                oper_id = str(oper_id_name[iparam0]).split('.0')
-                                oper_name = oper_id_name[iparam0 + 1]
-                                if len(oper_id) == 1:
-                                    self.on_oper(oper_id[0], oper_name)
-                                iparam0 += 2
-
-                        elif cmd == 'deop':
-                            deop_id = amf0_cmd[3]
-                            deop_nick = amf0_cmd[4]
-                            self.on_deop(deop_id, deop_nick)
-
-                        elif cmd == 'owner':
-                            self.on_owner()
-
-                        elif cmd == 'avons':
-                            avons_id_name = amf0_cmd[4:]
-                            if len(avons_id_name) is not 0:
-                                while iparam0 < len(avons_id_name):
-                                    avons_id = avons_id_name[iparam0]
-                                    avons_name = avons_id_name[iparam0 + 1]
-                                    self.on_avon(avons_id, avons_name)
-                                    iparam0 += 2
-
-                        elif cmd == 'pros':
-                            pro_ids = amf0_cmd[4:]
-                            if len(pro_ids) is not 0:
-                                for pro_id in pro_ids:
-                                    pro_id = str(pro_id).replace('.0', '')
-                                    self.on_pro(pro_id)
-
-                        elif cmd == 'nick':
-                            old_nick = amf0_cmd[3]
-                            new_nick = amf0_cmd[4]
-                            nick_id = int(amf0_cmd[5])
-                            self.on_nick(old_nick, new_nick, nick_id)
-
-                        elif cmd == 'nickinuse':
-                            self.on_nickinuse()
-
-                        elif cmd == 'quit':
-                            quit_name = amf0_cmd[3]
-                            quit_id = amf0_cmd[4]
-                            self.on_quit(quit_id, quit_name)
-
-                        elif cmd == 'kick':
-                            kick_id = amf0_cmd[3]
-                            kick_name = amf0_cmd[4]
-                            self.on_kick(kick_id, kick_name)
-
-                        elif cmd == 'banned':
-                            self.on_banned()
-
-                        elif cmd == 'banlist':
-                            banlist_id_nick = amf0_cmd[3:]
-                            if len(banlist_id_nick) is not 0:
-                                while iparam0 < len(banlist_id_nick):
-                                    banned_id = banlist_id_nick[iparam0]
-                                    banned_nick = banlist_id_nick[iparam0 + 1]
-                                    self.on_banlist(banned_id, banned_nick)
-                                    iparam0 += 2
-
-                        elif cmd == 'startbanlist':
-                            self.on_startbanlist()
-
-                        elif cmd == 'topic':
-                            topic = amf0_cmd[3]
-                            self.on_topic(topic)
-
-                        elif cmd == 'gift':
-                            self.console_write(COLOR['white'], str(amf0_cmd))
-
-                        elif cmd == 'prepare_gift_profile':
-                            self.console_write(COLOR['white'], str(amf0_cmd))
-
-                        elif cmd == 'from_owner':
-                            owner_msg = amf0_cmd[3]
-                            self.on_from_owner(owner_msg)
-
-                        elif cmd == 'doublesignon':
-                            self.on_doublesignon()
-
-                        elif cmd == 'privmsg':
-                            # self.msg_raw = amf0_cmd[4]
-                            msg_text = self._decode_msg(u'' + amf0_cmd[4])
-                            msg_sender = str(amf0_cmd[6])
-                            self.on_privmsg(msg_text, msg_sender)
-
-                        elif cmd == 'notice':
-                            notice_msg = amf0_cmd[3]
-                            notice_msg_id = amf0_cmd[4]
-                            if notice_msg == 'avon':
-                                avon_name = amf0_cmd[5]
-                                self.on_avon(notice_msg_id, avon_name)
-                            elif notice_msg == 'pro':
-                                self.on_pro(notice_msg_id)
-
-                        elif cmd == 'private_room':
-                            private_status = str(amf0_cmd[3])
-                            if private_status == 'yes':
-                                self.private_room = True
-                            elif private_status == 'no':
-                                self.private_room = False
-                            self.on_private_room()
-
-                        else:
-                            self.console_write(COLOR['bright_red'], 'Unknown command: %s' % cmd)
+                    elif not events.put(amf0_data):
+                        log.warning('Event queue full, event dropped: %s' % amf0_data_type)
 
-            except Exception as ex:
-                log.error('General callback error: %s' % ex, exc_info=True)
-                if CONFIG['debug_mode']:
-                    traceback.print_exc()
+                except Exception as ex:
+                    log.error('General read error: %s' % ex, exc_info=True)
+                    if CONFIG['debug_mode']:
+                        traceback.print_exc()
+        finally:
+            events.close()
+
+    # ----------------------- ROOM CALLBACKS -----------------------
+    # These are most of the room callbacks that are identified within
+    # the SWF; the defunct callbacks have been omitted for the library
+    # to be in correspondence with the currently established and working
+    # Tinychat protocol. Each callback unpacks the arguments of the command
+    # and hands them to the matching event method.
+
+    def _cb_result(self, amf0_cmd):
+        if self.stream_sort:
+            # Set streams for the client.
+            self.client_manager(amf0_cmd)
+        else:
+            # Handle the initial NetConnection _result message.
+            try:
+                _result_info = {
+                    'Capabilities': str(amf0_cmd[2]['capabilities']),
+                    'FmsVer': amf0_cmd[2]['fmsVer'],
+                    'Code': amf0_cmd[3]['code'],
+                    'ObjectEncoding': str(amf0_cmd[3]['objectEncoding']),
+                    'Description': amf0_cmd[3]['description'],
+                    'Level': amf0_cmd[3]['level']
+                }
+            except (IndexError, KeyError, TypeError):
+                log.error('"_result" callback error occured: %s' % amf0_cmd)
+                self.console_write(COLOR['green'], str(amf0_cmd))
+            else:
+                self.on_result(_result_info)
+
+    def _cb_error(self, amf0_cmd):
+        try:
+            _error_info = {
+                'Code': amf0_cmd[3]['code'],
+                'Description': amf0_cmd[3]['description'],
+                'Level': amf0_cmd[3]['level']
+            }
+        except (IndexError, KeyError, TypeError):
+            log.error('"_error" callback error occured: %s' % amf0_cmd)
+            self.console_write(COLOR['red'], str(amf0_cmd))
+        else:
+            self.on_error(_error_info)
+
+    def _cb_bwdone(self, amf0_cmd):
+        self.on_bwdone()
+
+    def _cb_status(self, amf0_cmd):
+        self.stream_sort = False
+        try:
+            _status_info = {
+                'Level': amf0_cmd[3]['level'],
+                'Code': amf0_cmd[3]['code'],
+                'Details': amf0_cmd[3]['details'],
+                'Clientid': amf0_cmd[3]['clientid'],
+                'Description': amf0_cmd[3]['description']
+            }
+        except (IndexError, KeyError, TypeError):
+            log.error('"onStatus" callback error occured: %s' % amf0_cmd)
+            self.console_write(COLOR['magenta'], str(amf0_cmd))
+        else:
+            self.on_status(_status_info)
+
+    def _cb_registered(self, amf0_cmd):
+        self.on_registered(amf0_cmd[3])
+
+    def _cb_join(self, amf0_cmd):
+        if not self.workers.submit(self.on_join, amf0_cmd[3]):
+            log.warning('Worker pool saturated, handling join inline: %s' % amf0_cmd[3])
+            self.on_join(amf0_cmd[3])
+
+    def _cb_joins(self, amf0_cmd):
+        self.on_joins_batch(amf0_cmd[3:])
+
+    def _cb_joinsdone(self, amf0_cmd):
+        self.on_joinsdone()
+
+    def _cb_oper(self, amf0_cmd):
+        oper_id_name = amf0_cmd[3:]
+        for i in xrange(0, len(oper_id_name), 2):
+            oper_id = str(oper_id_name[i]).split('.0')
+            if len(oper_id) == 1:
+                self.on_oper(oper_id[0], oper_id_name[i + 1])
+
+    def _cb_deop(self, amf0_cmd):
+        self.on_deop(amf0_cmd[3], amf0_cmd[4])
+
+    def _cb_owner(self, amf0_cmd):
+        self.on_owner()
+
+    def _cb_avons(self, amf0_cmd):
+        avons_id_name = amf0_cmd[4:]
+        for i in xrange(0, len(avons_id_name), 2):
+            self.on_avon(avons_id_name[i], avons_id_name[i + 1])
+
+    def _cb_pros(self, amf0_cmd):
+        for pro_id in amf0_cmd[4:]:
+            self.on_pro(str(pro_id).replace('.0', ''))
+
+    def _cb_nick(self, amf0_cmd):
+        self.on_nick(amf0_cmd[3], amf0_cmd[4], int(amf0_cmd[5]))
+
+    def _cb_nickinuse(self, amf0_cmd):
+        self.on_nickinuse()
+
+    def _cb_quit(self, amf0_cmd):
+        self.on_quit(amf0_cmd[4], amf0_cmd[3])
+
+    def _cb_kick(self, amf0_cmd):
+        self.on_kick(amf0_cmd[3], amf0_cmd[4])
+
+    def _cb_banned(self, amf0_cmd):
+        self.on_banned()
+
+    def _cb_banlist(self, amf0_cmd):
+        banlist_id_nick = amf0_cmd[3:]
+        for i in xrange(0, len(banlist_id_nick), 2):
+            self.on_banlist(banlist_id_nick[i], banlist_id_nick[i + 1])
+
+    def _cb_startbanlist(self, amf0_cmd):
+        self.on_startbanlist()
+
+    def _cb_topic(self, amf0_cmd):
+        self.on_topic(amf0_cmd[3])
+
+    def _cb_print(self, amf0_cmd):
+        self.console_write(COLOR['white'], str(amf0_cmd))
+
+    def _cb_from_owner(self, amf0_cmd):
+        self.on_from_owner(amf0_cmd[3])
 
-                    # Callback Event Methods.
+    def _cb_doublesignon(self, amf0_cmd):
+        self.on_doublesignon()
+
+    def _cb_privmsg(self, amf0_cmd):
+        # self.msg_raw = amf0_cmd[4]
+        msg_text = self._decode_msg(u'' + amf0_cmd[4])
+        msg_sender = str(amf0_cmd[6])
+        context = MessageContext(self.find_user_info(msg_sender), msg_text, msg_sender, time.time())
+        if not self.user_events.submit(msg_sender, self.run_in_context, context, self.on_privmsg,
+                                       msg_text, msg_sender):
+            log.warning('Too many messages waiting from %s, message dropped.' % msg_sender)
+
+    def _cb_notice(self, amf0_cmd):
+        notice_msg = amf0_cmd[3]
+        notice_msg_id = amf0_cmd[4]
+        if notice_msg == 'avon':
+            self.on_avon(notice_msg_id, amf0_cmd[5])
+        elif notice_msg == 'pro':
+            self.on_pro(notice_msg_id)
+
+    def _cb_private_room(self, amf0_cmd):
+        private_status = str(amf0_cmd[3])
+        if private_status == 'yes':
+            self.private_room = True
+        elif private_status == 'no':
+            self.private_room = False
+        self.on_private_room()
+
+    # Callback Event Methods.
 
     def on_result(self, result_info):
         if len(result_info) is 4 and type(result_info[3]) is int:
@@ -667,10 +1410,7 @@ class TinychatRTMPClient:
         user.reading_only = join_info_dict['lf']
 
         if join_info_dict['account']:
-            tc_info = tinychat_api.tinychat_user_info(join_info_dict['account'])
-            if tc_info is not None:
-                user.tinychat_id = tc_info['tinychat_id']
-                user.last_login = tc_info['last_active']
+            self.prefetch_user_info([user])
             if join_info_dict['own']:
                 self.console_write(COLOR['red'],
                                    'Room Owner %s:%d:%s' % (join_info_dict['nick'], join_info_dict['id'],
@@ -718,6 +1458,46 @@ class TinychatRTMPClient:
                 self.console_write(COLOR['bright_cyan'],
                                    'Joins: %s:%d' % (joins_info_dict['nick'], joins_info_dict['id']))
 
+    def on_joins_batch(self, joins_info_list):
+        """
+        Load the users already in the room, as sent in one go when joining it.
+        All the users are added in one pass and summarized in a single console line.
+        :param joins_info_list: list of the join info dicts of the users.
+        :return: list the RoomUser objects of the users.
+        """
+        users = self.room_users.add_many([joins_info_dict['nick'] for joins_info_dict in joins_info_list])
+
+        owners = []
+        mods = []
+        accounts = 0
+        for user, joins_info_dict in zip(users, joins_info_list):
+            user.id = joins_info_dict['id']
+            user.user_account = joins_info_dict['account']
+            user.user_account_type = joins_info_dict['stype']
+            user.user_account_giftpoints = joins_info_dict['gp']
+            user.is_mod = joins_info_dict['mod']
+            user.is_owner = joins_info_dict['own']
+            user.device_type = str(joins_info_dict['btype'])
+            user.reading_only = joins_info_dict['lf']
+
+            if user.user_account:
+                accounts += 1
+                if user.is_owner:
+                    owners.append(user.nick)
+                elif user.is_mod:
+                    mods.append(user.nick)
+
+        summary = '%d users loaded, %d with accounts.' % (len(users), accounts)
+        if owners:
+            summary += ' Room Owner: %s.' % ', '.join(owners)
+        if mods:
+            summary += ' Moderators: %s.' % ', '.join(mods)
+        self.console_write(COLOR['bright_cyan'], summary)
+        log.info('Joins: %s' % summary)
+
+        self.prefetch_user_info(users)
+        return users
+
     def on_joinsdone(self):
         self.console_write(COLOR['cyan'], 'All joins information received.')
 
@@ -746,11 +1526,7 @@ class TinychatRTMPClient:
 
     def on_nick(self, old, new, uid):
         if uid is not self.client_id:
-            old_info = self.find_user_info(old)
-            old_info.nick = new
-            if old in self.room_users.keys():
-                del self.room_users[old]
-                self.room_users[new] = old_info
+            self.room_users.rename(old, new)
             self.console_write(COLOR['bright_cyan'], '%s:%s changed nick to: %s  ' % (old, uid, new))
 
     def on_nickinuse(self):
@@ -759,8 +1535,7 @@ class TinychatRTMPClient:
         self.set_nick()
 
     def on_quit(self, uid, name):
-        if name in self.room_users.keys():
-            del self.room_users[name]
+        if self.room_users.remove(name) is not None:
             self.console_write(COLOR['cyan'], '%s:%s left the room.' % (name, uid))
 
     def on_kick(self, uid, name):
@@ -800,12 +1575,10 @@ class TinychatRTMPClient:
     def on_privmsg(self, msg, msg_sender):
         """
         Message command controller.
+        Runs on a worker thread, after any earlier messages of the sender; self.user_obj is the sender.
         :param msg: str message.
         :param msg_sender: str the sender of the message.
         """
-        # Get user info object of the user sending the message..
-        self.user_obj = self.find_user_info(msg_sender)
-
         if msg.startswith('/'):
             msg_cmd = msg.split(' ')
             if msg_cmd[0] == '/msg':
@@ -819,9 +1592,7 @@ class TinychatRTMPClient:
                 media_type = msg_cmd[1]
                 media_id = msg_cmd[2]
                 time_point = int(msg_cmd[3])
-                # start in new thread
-                threading.Thread(target=self.on_media_broadcast_start,
-                                 args=(media_type, media_id, time_point, msg_sender, )).start()
+                self.on_media_broadcast_start(media_type, media_id, time_point, msg_sender)
 
             elif msg_cmd[0] == '/mbc':
                 media_type = msg_cmd[1]
@@ -917,9 +1688,7 @@ class TinychatRTMPClient:
         :param usr_nick: str the user name of the user we want to find info for.
         :return: object a user object containing user info.
         """
-        if usr_nick not in self.room_users.keys():
-            self.room_users[usr_nick] = RoomUser(usr_nick)
-        return self.room_users[usr_nick]
+        return self.room_users.add(usr_nick)
 
     def find_user_info(self, usr_nick):
         """
@@ -930,9 +1699,53 @@ class TinychatRTMPClient:
         :param usr_nick: str the user name to find info for.
         :return: object or None if no user name is in the room_users dict.
         """
-        if usr_nick in self.room_users.keys():
-            return self.room_users[usr_nick]
-        return None
+        return self.room_users.find(usr_nick)
+
+    def prefetch_user_info(self, users):
+        """
+        Attach the tinychat info of the account holders among the users, without waiting for it.
+        Cached info is attached right away, the rest is requested in batches on the worker threads.
+        :param users: list of RoomUser objects.
+        """
+        pending = []
+        for user in users:
+            account = user.user_account
+            if not account:
+                continue
+            tc_info = self.user_info.get(account)
+            if tc_info is not None:
+                self._attach_user_info(user, account, tc_info)
+            else:
+                pending.append((user, account))
+
+        for start in xrange(0, len(pending), self.user_info_batch_size):
+            batch = pending[start:start + self.user_info_batch_size]
+            if not self.workers.submit(self._load_user_info_batch, batch):
+                log.warning('Worker pool saturated, tinychat info of %d accounts not fetched.' % len(batch))
+
+    def _load_user_info_batch(self, batch):
+        for user, account in batch:
+            self.load_user_info(user, account)
+
+    def load_user_info(self, user, account=None):
+        """
+        Fetch (or take from the cache) and attach the tinychat info of a user's account.
+        :param user: RoomUser the user.
+        :param account: str the account name, defaults to the account of the user.
+        :return: dict the tinychat info or None.
+        """
+        account = account or user.user_account
+        tc_info = self.user_info.lookup(account)
+        if tc_info is not None:
+            self._attach_user_info(user, account, tc_info)
+        return tc_info
+
+    @staticmethod
+    def _attach_user_info(user, account, tc_info):
+        # The user may have left, or logged in with another account, while the info was being fetched.
+        if user.user_account == account:
+            user.tinychat_id = tc_info['tinychat_id']
+            user.last_login = tc_info['last_active']
 
     # Message Methods.
     def send_bauth_msg(self):
@@ -1059,7 +1872,7 @@ class TinychatRTMPClient:
         Send close user broadcast message. The client has to be mod when sending this message.
         :param nick: str the nickname of the user we want to close.
         """
-        self._send_command('owner_run', [u'_close' + nick])
+        self._send_command('owner_run', [u'_close' + nick], priority=rtmp_protocol.SendPriority.MODERATION)
 
     def send_mute_msg(self):
         """
@@ -1179,7 +1992,7 @@ class TinychatRTMPClient:
             self.send_chat_msg(mbsk_msg)
 
     # Message Construction.
-    def _send_command(self, cmd, params=None, trans_id=0):
+    def _send_command(self, cmd, params=None, trans_id=0, priority=None):
         """
          Sends command messages to the server.
          Calls remote procedure calls (RPC) at the receiving end.
@@ -1187,7 +2000,11 @@ class TinychatRTMPClient:
         :param cmd: str command name.
         :param params: list command parameters.
         :param trans_id: int the transaction ID.
+        :param priority: int the outbound traffic class (OPTIONAL), by default looked up in command_priorities.
         """
+        if priority is None:
+            priority = self.command_priorities.get(cmd, rtmp_protocol.SendPriority.CHAT)
+
         msg_format = [u'' + cmd, trans_id, None]
         if params and type(params) is list:
             msg_format.extend(params)
@@ -1197,20 +2014,13 @@ class TinychatRTMPClient:
             rtmp_protocol.DataTypes.COMMAND,
             msg_format)
 
-        #  cmd, params
-
-        try:
-            self.connection.writer.write(msg)
-            self.connection.writer.flush()
+        # Queueing never raises; a failed write shuts the connection down and the
+        # read loop reconnects.
+        self.connection.send(msg, priority)
 
-            if CONFIG['amf_sent']:
-                self.console_write(COLOR['white'], 'SENT --> ' + str(msg))
-
-        except Exception as ex:
-            log.error('send command error: %s' % ex, exc_info=True)
-            if CONFIG['debug_mode']:
-                traceback.print_exc()
-            self.reconnect()
+        if CONFIG['amf_sent']:
+            self.console_write(COLOR['white'], 'SENT --> %s (outbound queue: %s)' %
+                               (msg, len(self.connection.outbound)))
 
     # Stream functions
     def send_create_stream(self, play=False):
@@ -1229,8 +2039,7 @@ class TinychatRTMPClient:
             transaction_id)
 
         self.console_write(COLOR['white'], 'Sending createStream message #%s' % transaction_id)
-        self.connection.writer.write(msg)
-        self.connection.writer.flush()
+        self.connection.send(msg, rtmp_protocol.SendPriority.CONTROL)
 
         # Set to sort the stream information appropriately upon the arrival of a "_result" packet from the server.
         self.stream_sort = True
@@ -1251,8 +2060,7 @@ class TinychatRTMPClient:
                 publish_type)
 
             self.console_write(COLOR['white'], 'Sending publish message StreamID: %s' % self.streams['client_publish'])
-            self.connection.writer.write(msg)
-            self.connection.writer.flush()
+            self.connection.send(msg, rtmp_protocol.SendPriority.CONTROL)
 
         else:
             self.console_write(COLOR['white'], 'No StreamID available to start publish upon.')
@@ -1276,12 +2084,9 @@ class TinychatRTMPClient:
                 chunk_size)
 
             self.console_write(COLOR['white'], 'Sending chunk size message.')
-            self.connection.writer.write(msg)
-            self.connection.writer.flush()
-
-            # Set writer to work with new chunk size
-            self.connection.writer.chunk_size = chunk_size
-            self.console_write(COLOR['white'], 'Set chunk size: %s' % self.connection.writer.chunk_size)
+            # The writer thread switches to the new chunk size once this message has been written.
+            self.connection.send(msg, rtmp_protocol.SendPriority.CONTROL)
+            self.console_write(COLOR['white'], 'Set chunk size: %s' % chunk_size)
 
         else:
             self.console_write(COLOR['white'], 'No publish StreamID found to set chunk size upon.')
@@ -1301,8 +2106,7 @@ class TinychatRTMPClient:
                 play_id)
 
             self.console_write(COLOR['white'], 'Starting playback for:%s on StreamID: %s' % (play_id, stream_id))
-            self.connection.writer.write(msg)
-            self.connection.writer.flush()
+            self.connection.send(msg, rtmp_protocol.SendPriority.CONTROL)
 
         else:
             self.console_write(COLOR['white'], 'PlayID format incorrect, integers only allowed.')
@@ -1358,8 +2162,7 @@ class TinychatRTMPClient:
             packet_control_type,
             packet_timestamp)
 
-        self.connection.writer.write(msg)
-        self.connection.writer.flush()
+        self.connection.send(msg, rtmp_protocol.SendPriority.MEDIA)
 
     def send_video_packet(self, packet_raw_data, packet_control_type, packet_timestamp=0):
         """
@@ -1378,8 +2181,7 @@ class TinychatRTMPClient:
             packet_control_type,
             packet_timestamp)
 
-        self.connection.writer.write(msg)
-        self.connection.writer.flush()
+        self.connection.send(msg, rtmp_protocol.SendPriority.MEDIA)
 
     def send_close_stream(self, stream_id=None):
         """
@@ -1395,8 +2197,7 @@ class TinychatRTMPClient:
                 stream_id)
 
             self.console_write(COLOR['white'], 'Sending closeStream message on StreamID: %s' % stream_id)
-            self.connection.writer.write(msg)
-            self.connection.writer.flush()
+            self.connection.send(msg, rtmp_protocol.SendPriority.MEDIA)
 
         else:
             self.console_write(COLOR['white'], 'No closeStream StreamID found to send the closeStream request upon.')
@@ -1415,8 +2216,7 @@ class TinychatRTMPClient:
                 stream_id)
 
             self.console_write(COLOR['white'], 'Sending deleteStream message on StreamID: %s' % stream_id)
-            self.connection.writer.write(msg)
-            self.connection.writer.flush()
+            self.connection.send(msg, rtmp_protocol.SendPriority.MEDIA)
 
         else:
             self.console_write(COLOR['white'], 'No deleteStream StreamID found to send the deleteStream request upon.')
@@ -1442,12 +2242,10 @@ class TinychatRTMPClient:
             while self.publish_connection:
                 time.sleep(1)
             while self.is_connected and not self.publish_connection:
-                self.connection.writer.write(msg)
-                self.connection.writer.flush()
+                self.connection.send(msg, rtmp_protocol.SendPriority.CONTROL)
                 time.sleep(120)
         elif manual:
-            self.connection.writer.write(msg)
-            self.connection.writer.flush()
+            self.connection.send(msg, rtmp_protocol.SendPriority.CONTROL)
 
     @staticmethod
     def _encode_msg(msg):
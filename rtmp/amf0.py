@@ -0,0 +1,392 @@
+""" A purpose-built AMF0 (Action Message Format) codec for the subset of types used by Tinychat. """
+
+# Numbers, booleans, strings, long strings, null, undefined, objects, ECMA arrays, strict
+# arrays and references are handled here, straight on bytearray/str/memoryview buffers.
+# Any other type (dates, XML, typed objects, AMF3) is handed over to pyamf, which shares
+# the reference table with this codec so the output stays compatible in both directions.
+
+import struct
+
+import pyamf
+import pyamf.amf0
+import pyamf.util
+
+# Type markers.
+NUMBER = 0x00
+BOOLEAN = 0x01
+STRING = 0x02
+OBJECT = 0x03
+NULL = 0x05
+UNDEFINED = 0x06
+REFERENCE = 0x07
+ECMA_ARRAY = 0x08
+OBJECT_END = 0x09
+STRICT_ARRAY = 0x0A
+LONG_STRING = 0x0C
+
+# Precompiled codecs for the fixed width fields.
+UCHAR = struct.Struct('>B')
+USHORT = struct.Struct('>H')
+ULONG = struct.Struct('>L')
+LONG = struct.Struct('>l')
+DOUBLE = struct.Struct('>d')
+
+_OBJECT_END = '\x00\x00\x09'
+
+
+class Decoder(object):
+    """ Decodes AMF0 elements and raw fields from a buffer. """
+
+    def __init__(self, buf, offset=0):
+        """
+        Initialize the decoder.
+        :param buf: bytearray, str or memoryview the buffer to decode from.
+        :param offset: int the position in the buffer to start decoding at.
+        """
+        self.buf = buf
+        self.offset = offset
+        self.end = len(buf)
+        # The objects, ECMA arrays and strict arrays decoded so far, in order.
+        self.references = []
+
+        if isinstance(buf, memoryview):
+            self._bytes = lambda start, end: buf[start:end].tobytes()
+        elif isinstance(buf, bytearray):
+            self._bytes = lambda start, end: str(buf[start:end])
+        else:
+            self._bytes = lambda start, end: buf[start:end]
+
+    def at_eof(self):
+        return self.offset >= self.end
+
+    def tell(self):
+        return self.offset
+
+    def read_uchar(self):
+        value = UCHAR.unpack_from(self.buf, self.offset)[0]
+        self.offset += 1
+        return value
+
+    def read_ulong(self):
+        value = ULONG.unpack_from(self.buf, self.offset)[0]
+        self.offset += 4
+        return value
+
+    def read_bytes(self, length):
+        """
+        Read raw bytes.
+        :param length: int the amount of bytes to read.
+        :return: str the bytes.
+        """
+        if self.offset + length > self.end:
+            raise pyamf.DecodeError('Unexpected end of the buffer')
+        value = self._bytes(self.offset, self.offset + length)
+        self.offset += length
+        return value
+
+    def read_string(self):
+        """
+        Read a string without its type marker, as used for shared object names.
+        :return: unicode the decoded string.
+        """
+        length = USHORT.unpack_from(self.buf, self.offset)[0]
+        self.offset += 2
+        return self.read_bytes(length).decode('utf-8')
+
+    def read_element(self):
+        """
+        Read the next element from the buffer.
+        :return: the decoded python value.
+        """
+        buf = self.buf
+        offset = self.offset
+        marker = buf[offset]
+        if type(marker) is str:
+            marker = ord(marker)
+
+        if marker == NUMBER:
+            value = DOUBLE.unpack_from(buf, offset + 1)[0]
+            self.offset = offset + 9
+            # There is no way in AMF0 to tell integers and floats apart, integral numbers are returned as integers.
+            try:
+                if value == int(value):
+                    return int(value)
+            except (OverflowError, ValueError):
+                pass
+            return value
+
+        elif marker == STRING:
+            length = USHORT.unpack_from(buf, offset + 1)[0]
+            self.offset = offset + 3
+            return self.read_bytes(length).decode('utf-8')
+
+        elif marker == NULL:
+            self.offset = offset + 1
+            return None
+
+        elif marker == BOOLEAN:
+            self.offset = offset + 2
+            return bool(UCHAR.unpack_from(buf, offset + 1)[0])
+
+        elif marker == OBJECT:
+            self.offset = offset + 1
+            obj = pyamf.ASObject()
+            self.references.append(obj)
+            self._read_attributes(obj)
+            return obj
+
+        elif marker == ECMA_ARRAY:
+            # The length is only a hint, the array ends with an object end marker.
+            self.offset = offset + 5
+            obj = pyamf.MixedArray()
+            self.references.append(obj)
+            attributes = {}
+            self._read_attributes(attributes)
+            for key, value in attributes.iteritems():
+                try:
+                    key = int(key)
+                except ValueError:
+                    pass
+                obj[key] = value
+            return obj
+
+        elif marker == STRICT_ARRAY:
+            length = ULONG.unpack_from(buf, offset + 1)[0]
+            self.offset = offset + 5
+            obj = []
+            self.references.append(obj)
+            for _ in xrange(length):
+                obj.append(self.read_element())
+            return obj
+
+        elif marker == REFERENCE:
+            index = USHORT.unpack_from(buf, offset + 1)[0]
+            self.offset = offset + 3
+            try:
+                return self.references[index]
+            except IndexError:
+                raise pyamf.ReferenceError('Unknown reference %d' % index)
+
+        elif marker == UNDEFINED:
+            self.offset = offset + 1
+            return pyamf.Undefined
+
+        elif marker == LONG_STRING:
+            length = ULONG.unpack_from(buf, offset + 1)[0]
+            self.offset = offset + 5
+            return self.read_bytes(length).decode('utf-8')
+
+        return self._read_fallback()
+
+    def _read_attributes(self, obj):
+        """
+        Read the key/value pairs of an object or ECMA array up to and including the object end marker.
+        :param obj: dict the mapping to store the attributes into, the keys are left as (utf-8) str.
+        """
+        while True:
+            length = USHORT.unpack_from(self.buf, self.offset)[0]
+            self.offset += 2
+            key = self.read_bytes(length)
+
+            marker = self.buf[self.offset]
+            if marker == OBJECT_END or marker == '\x09':
+                self.offset += 1
+                return
+
+            obj[key] = self.read_element()
+
+    def _read_fallback(self):
+        """
+        Let pyamf read an element of a type this codec does not handle.
+        :return: the decoded python value.
+        """
+        body_stream = pyamf.util.BufferedByteStream(self._bytes(self.offset, self.end))
+        decoder = pyamf.amf0.Decoder(body_stream)
+        for obj in self.references:
+            decoder.context.addObject(obj)
+
+        value = decoder.readElement()
+
+        self.offset += body_stream.tell()
+        obj = decoder.context.getObject(len(self.references))
+        while obj is not None:
+            self.references.append(obj)
+            obj = decoder.context.getObject(len(self.references))
+        return value
+
+
+class Encoder(object):
+    """ Encodes AMF0 elements and raw fields into a bytearray. """
+
+    def __init__(self):
+        """ Initialize the encoder with an empty buffer. """
+        self.buf = bytearray()
+        # The objects, ECMA arrays and strict arrays encoded so far, and their reference index by id().
+        self.references = []
+        self._reference_index = {}
+
+    def __len__(self):
+        return len(self.buf)
+
+    def getvalue(self):
+        return str(self.buf)
+
+    def write_uchar(self, value):
+        self.buf += UCHAR.pack(value)
+
+    def write_ushort(self, value):
+        self.buf += USHORT.pack(value)
+
+    def write_ulong(self, value):
+        self.buf += ULONG.pack(value)
+
+    def write_long(self, value):
+        self.buf += LONG.pack(value)
+
+    def write_bytes(self, value):
+        """
+        Write raw bytes.
+        :param value: str, bytearray or memoryview the bytes to write.
+        """
+        self.buf += value
+
+    def write_string(self, value):
+        """
+        Write a string without its type marker, as used for shared object names and attribute names.
+        :param value: str or unicode the string to write.
+        """
+        if type(value) is unicode:
+            value = value.encode('utf-8')
+        self.buf += USHORT.pack(len(value))
+        self.buf += value
+
+    def write_element(self, value):
+        """
+        Write a python value as an AMF0 element.
+        :param value: the value to encode.
+        """
+        value_type = type(value)
+
+        if value is None:
+            self.buf.append(NULL)
+
+        elif value_type is unicode or value_type is str:
+            if value_type is unicode:
+                value = value.encode('utf-8')
+            length = len(value)
+            if length > 0xffff:
+                self.buf.append(LONG_STRING)
+                self.buf += ULONG.pack(length)
+            else:
+                self.buf.append(STRING)
+                self.buf += USHORT.pack(length)
+            self.buf += value
+
+        elif value_type is bool:
+            self.buf.append(BOOLEAN)
+            self.buf.append(1 if value else 0)
+
+        elif value_type is int or value_type is float or value_type is long:
+            self.buf.append(NUMBER)
+            self.buf += DOUBLE.pack(value)
+
+        elif value_type is pyamf.UndefinedType:
+            self.buf.append(UNDEFINED)
+
+        elif value_type is dict or value_type is pyamf.ASObject:
+            if self._write_reference(value):
+                return
+            self.buf.append(OBJECT)
+            self._write_attributes(value)
+
+        elif value_type is pyamf.MixedArray:
+            if self._write_reference(value):
+                return
+            self.buf.append(ECMA_ARRAY)
+            max_index = max([key for key in value if type(key) is int or type(key) is long] or [0])
+            self.buf += ULONG.pack(max(max_index, 0))
+            self._write_attributes(value)
+
+        elif value_type is list or value_type is tuple:
+            if self._write_reference(value):
+                return
+            self.buf.append(STRICT_ARRAY)
+            self.buf += ULONG.pack(len(value))
+            for item in value:
+                self.write_element(item)
+
+        else:
+            self._write_fallback(value)
+
+    def _write_reference(self, obj):
+        """
+        Write a reference if the object was encoded before, otherwise remember it.
+        :param obj: the object, ECMA array or strict array about to be written.
+        :return: bool True if a reference was written.
+        """
+        index = self._reference_index.get(id(obj))
+        if index is not None and index <= 0xffff:
+            self.buf.append(REFERENCE)
+            self.buf += USHORT.pack(index)
+            return True
+
+        self._reference_index[id(obj)] = len(self.references)
+        self.references.append(obj)
+        return False
+
+    def _write_attributes(self, obj):
+        """
+        Write the key/value pairs of an object or ECMA array followed by the object end marker.
+        :param obj: dict the mapping to write.
+        """
+        for key, value in obj.iteritems():
+            if type(key) is int or type(key) is long:
+                key = str(key)
+            self.write_string(key)
+            self.write_element(value)
+        self.buf += _OBJECT_END
+
+    def _write_fallback(self, value):
+        """
+        Let pyamf write a value of a type this codec does not handle.
+        :param value: the value to encode.
+        """
+        body_stream = pyamf.util.BufferedByteStream()
+        encoder = pyamf.amf0.Encoder(body_stream)
+        for obj in self.references:
+            encoder.context.addObject(obj)
+
+        encoder.writeElement(value)
+
+        self.buf += body_stream.getvalue()
+        obj = encoder.context.getObject(len(self.references))
+        while obj is not None:
+            self._reference_index[id(obj)] = len(self.references)
+            self.references.append(obj)
+            obj = encoder.context.getObject(len(self.references))
+
+
+def decode_elements(buf, offset=0):
+    """
+    Decode all the elements from a buffer.
+    :param buf: bytearray, str or memoryview the AMF0 encoded data.
+    :param offset: int the position in the buffer to start decoding at.
+    :return: list the decoded elements.
+    """
+    decoder = Decoder(buf, offset)
+    elements = []
+    while not decoder.at_eof():
+        elements.append(decoder.read_element())
+    return elements
+
+
+def encode_elements(elements):
+    """
+    Encode a sequence of elements.
+    :param elements: list the python values to encode.
+    :return: bytearray the AMF0 encoded data.
+    """
+    encoder = Encoder()
+    for element in elements:
+        encoder.write_element(element)
+    return encoder.buf
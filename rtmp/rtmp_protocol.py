@@ -6,14 +6,21 @@
 import socket
 import logging
 import random
+import struct
+import threading
+from collections import deque
 
-import pyamf.amf0
 import pyamf.util.pure
+import amf0
 import rtmp_protocol_base
 import socks
 
 log = logging.getLogger(__name__)
 
+# Precompiled codecs for the fixed width fields found in message bodies.
+USHORT = struct.Struct('>H')
+ULONG = struct.Struct('>L')
+
 
 class FileDataTypeMixIn(pyamf.util.pure.DataTypeMixIn):
     """
@@ -23,11 +30,37 @@ class FileDataTypeMixIn(pyamf.util.pure.DataTypeMixIn):
 
     def __init__(self, fileobject):
         self.fileobject = fileobject
+        # Python 2 socket file objects have no readinto.
+        self._readinto = getattr(fileobject, 'readinto', None)
         pyamf.util.pure.DataTypeMixIn.__init__(self)
 
     def read(self, length):
         return self.fileobject.read(length)
 
+    def read_into(self, buf, offset, length):
+        """
+        Reads exactly length bytes from the file object straight into a bytearray.
+        :param buf: bytearray the buffer to fill.
+        :param offset: int the position in the buffer to start writing at.
+        :param length: int the amount of bytes to read.
+        """
+        readinto = self._readinto
+        if readinto is None:
+            # Copy the data in once.
+            data = self.fileobject.read(length)
+            if len(data) != length:
+                raise IOError('Stream closed after %s of %s bytes.' % (len(data), length))
+            buf[offset:offset + length] = data
+            return
+
+        end = offset + length
+        filled = readinto(memoryview(buf)[offset:end]) or 0
+        while filled < length:
+            read_bytes = readinto(memoryview(buf)[offset + filled:end])
+            if not read_bytes:
+                raise IOError('Stream closed after %s of %s bytes.' % (filled, length))
+            filled += read_bytes
+
     def write(self, data):
         self.fileobject.write(data)
 
@@ -39,6 +72,97 @@ class FileDataTypeMixIn(pyamf.util.pure.DataTypeMixIn):
         return False
 
 
+class SocketDataTypeMixIn(pyamf.util.pure.DataTypeMixIn):
+    """
+    Provides reading and writing of raw data types straight from and to a socket.
+
+    Received data goes into a reusable buffer with recv_into, the headers are read from it.
+    A chunk of a message body is copied from the buffer into the body once, or, if it has not been
+    received yet, received straight into the body. Written data is sent with the next flush.
+    """
+
+    def __init__(self, sock, buffer_size=65536):
+        """
+        Initialize the stream.
+        :param sock: socket.socket the connected socket.
+        :param buffer_size: int the size of the receive buffer.
+        """
+        self.socket = sock
+        self._buffer = bytearray(buffer_size)
+        self._view = memoryview(self._buffer)
+        # The received data not read yet is self._buffer[self._start:self._end].
+        self._start = 0
+        self._end = 0
+        self._pending = []
+        pyamf.util.pure.DataTypeMixIn.__init__(self)
+
+    def _fill(self, length):
+        """
+        Receive data until the buffer holds at least length bytes.
+        :param length: int the amount of bytes needed.
+        """
+        available = self._end - self._start
+        if self._start + length > len(self._buffer):
+            # Move the data not read yet to the front of the buffer, growing the buffer if it is too small.
+            data = self._buffer[self._start:self._end]
+            if length > len(self._buffer):
+                self._buffer = bytearray(length)
+                self._view = memoryview(self._buffer)
+            self._buffer[:available] = data
+            self._start, self._end = 0, available
+
+        while self._end - self._start < length:
+            received = self.socket.recv_into(self._view[self._end:])
+            if not received:
+                raise IOError('Stream closed after %s of %s bytes.' % (self._end - self._start, length))
+            self._end += received
+
+    def read(self, length):
+        start = self._start
+        if self._end - start < length:
+            if start == self._end:
+                self._start = self._end = start = 0
+            self._fill(length)
+            start = self._start
+        self._start = start + length
+        return self._view[start:start + length].tobytes()
+
+    def read_into(self, buf, offset, length):
+        """
+        Reads exactly length bytes from the socket into a bytearray.
+        :param buf: bytearray the buffer to fill.
+        :param offset: int the position in the buffer to start writing at.
+        :param length: int the amount of bytes to read.
+        """
+        view = memoryview(buf)
+        start = self._start
+        buffered = min(self._end - start, length)
+        if buffered:
+            # Assigning a memoryview to a bytearray slice goes byte by byte, one memoryview to another is a memcpy.
+            view[offset:offset + buffered] = self._view[start:start + buffered]
+            self._start = start + buffered
+        if buffered < length:
+            filled = offset + buffered
+            end = offset + length
+            while filled < end:
+                received = self.socket.recv_into(view[filled:end])
+                if not received:
+                    raise IOError('Stream closed after %s of %s bytes.' % (filled - offset, length))
+                filled += received
+
+    def write(self, data):
+        self._pending.append(data)
+
+    def flush(self):
+        data = ''.join(self._pending)
+        del self._pending[:]
+        self.socket.sendall(data)
+
+    @staticmethod
+    def at_eof():
+        return False
+
+
 class DataTypes:
     """ Represents an enumeration of the RTMP message data-types. """
     NONE = -1
@@ -79,6 +203,82 @@ class UserControlTypes:
     PING_RESPONSE = 7
 
 
+class SendPriority:
+    """ Represents an enumeration of the outbound traffic classes, the most urgent first. """
+    CONTROL = 0
+    MODERATION = 1
+    CHAT = 2
+    MEDIA = 3
+
+    names = ('control', 'moderation', 'chat', 'media')
+
+
+class LazyCommand(object):
+    """
+    The elements of a COMMAND message body, decoded on demand.
+
+    Only the leading command name is decoded when the message is read, the
+    arguments are decoded the first time they are accessed; commands that are
+    ignored or only logged by name never pay for them.
+
+    The command supports the read-only list operations, indexing, slicing,
+    len(), iteration and comparison against lists.
+    """
+    __slots__ = ('name', '_body', '_offset', '_elements')
+
+    def __init__(self, body):
+        """
+        Initialize the command and decode its name.
+        :param body: bytearray the AMF0 encoded message body.
+        """
+        self._body = body
+        self._elements = None
+
+        if len(body) >= 3 and body[0] == 0x02:
+            length = USHORT.unpack_from(body, 1)[0]
+            self.name = body[3:3 + length].decode('utf-8')
+            self._offset = 3 + length
+        else:
+            self.name = None
+            self._offset = 0
+
+    def _decode(self):
+        """
+        Decode the remaining elements of the body, once.
+        :return: list all the elements of the command, including the name.
+        """
+        if self._elements is not None:
+            return self._elements
+
+        elements = amf0.decode_elements(self._body, self._offset)
+        if self.name is not None:
+            elements.insert(0, self.name)
+
+        self._elements = elements
+        self._body = None
+        return elements
+
+    def __getitem__(self, index):
+        if index == 0 and self.name is not None and type(index) is int:
+            return self.name
+        return self._decode()[index]
+
+    def __len__(self):
+        return len(self._decode())
+
+    def __iter__(self):
+        return iter(self._decode())
+
+    def __eq__(self, other):
+        return self._decode() == other
+
+    def __ne__(self, other):
+        return self._decode() != other
+
+    def __repr__(self):
+        return repr(self._decode())
+
+
 class RtmpReader:
     """ This class reads RTMP messages from a stream. """
 
@@ -88,40 +288,55 @@ class RtmpReader:
     def __init__(self, stream):
         """ Initialize the RTMP reader and set it to read from the specified stream. """
         self.stream = stream
+        # The previous header received on each channel, indexed by the channel id.
+        self.previous_headers = [None] * 64
+        # Messages which are still being reassembled, keyed by the channel id: [header, body, received].
+        self._partial_messages = {}
 
     def __iter__(self):
         return self
 
-    def next(self):
-        """ Read one RTMP message from the stream and return it. """
-        if self.stream.at_eof():
-            raise StopIteration
+    def read_message(self):
+        """
+        Read chunks from the stream until a message has been fully reassembled.
+        Every message body is read straight into a bytearray preallocated from the header body length,
+        chunks of messages on other channels are kept aside until their message is complete.
+        :return: tuple (header, body) the message header and the bytearray holding the message body.
+        """
+        while True:
+            header = rtmp_protocol_base.header_decode(self.stream, self.previous_headers)
+            partial = self._partial_messages.get(header.channel_id)
 
-        # Read the message into body_stream. The message may span a number of
-        # chunks (each one with its own header).
-        message_body = []
-        msg_body_len = 0
-        header = rtmp_protocol_base.header_decode(self.stream)
+            if partial is None:
+                body = bytearray(header.body_length)
+                received = 0
+            else:
+                header, body, received = partial
 
-        while True:
-            read_bytes = min(header.body_length - msg_body_len, self.chunk_size)
-            message_body.append(self.stream.read(read_bytes))
-            msg_body_len += read_bytes
-            if msg_body_len >= header.body_length:
-                break
+                # WORKAROUND: even though the RTMP specification states that the
+                # extended timestamp field DOES NOT follow type 3 chunks, it seems
+                # that Flash player 10.1.85.3 and Flash Media Server 3.0.2.217 send
+                # and expect this field here.
+                if header.timestamp >= 0x00ffffff:
+                    self.stream.read_ulong()
+
+            read_bytes = min(header.body_length - received, self.chunk_size)
+            self.stream.read_into(body, received, read_bytes)
+            received += read_bytes
 
-            # Decode the next header in the stream.
-            rtmp_protocol_base.header_decode(self.stream)
+            if received >= header.body_length:
+                if partial is not None:
+                    del self._partial_messages[header.channel_id]
+                return header, body
 
-            # WORKAROUND: even though the RTMP specification states that the
-            # extended timestamp field DOES NOT follow type 3 chunks, it seems
-            # that Flash player 10.1.85.3 and Flash Media Server 3.0.2.217 send
-            # and expect this field here.
-            if header.timestamp >= 0x00ffffff:
-                self.stream.read_ulong()
+            self._partial_messages[header.channel_id] = [header, body, received]
 
-        assert header.body_length == msg_body_len, (header, msg_body_len)
-        body_stream = pyamf.util.BufferedByteStream(''.join(message_body))
+    def next(self):
+        """ Read one RTMP message from the stream and return it. """
+        if self.stream.at_eof():
+            raise StopIteration
+
+        header, body = self.read_message()
 
         # Decode the message based on the data-type present in the header.
         ret = {'msg': header.data_type}
@@ -135,29 +350,29 @@ class RtmpReader:
 
         elif ret['msg'] == DataTypes.USER_CONTROL:
             ret['stream_id'] = header.stream_id  # contextual information use.
-            ret['event_type'] = body_stream.read_ushort()
-            ret['event_data'] = body_stream.read()
+            ret['event_type'] = USHORT.unpack_from(body)[0]
+            ret['event_data'] = str(body[2:])
 
         elif ret['msg'] == DataTypes.ACK:
             return self.next()
 
         elif ret['msg'] == DataTypes.WINDOW_ACK_SIZE:
-            ret['window_ack_size'] = body_stream.read_ulong()
+            ret['window_ack_size'] = ULONG.unpack_from(body)[0]
 
         elif ret['msg'] == DataTypes.SET_PEER_BANDWIDTH:
-            ret['window_ack_size'] = body_stream.read_ulong()
-            ret['limit_type'] = body_stream.read_uchar()
+            ret['window_ack_size'] = ULONG.unpack_from(body)[0]
+            ret['limit_type'] = body[4]
 
         elif ret['msg'] == DataTypes.SHARED_OBJECT:
-            decoder = pyamf.amf0.Decoder(body_stream)
-            obj_name = decoder.readString()
-            curr_version = body_stream.read_ulong()
-            flags = body_stream.read(8)
+            decoder = amf0.Decoder(body)
+            obj_name = decoder.read_string()
+            curr_version = decoder.read_ulong()
+            flags = decoder.read_bytes(8)
 
             # A shared object message may contain a number of events.
             events = []
-            while not body_stream.at_eof():
-                event = RtmpReader.read_shared_object_event(body_stream, decoder)
+            while not decoder.at_eof():
+                event = RtmpReader.read_shared_object_event(decoder)
                 events.append(event)
 
             ret['obj_name'] = obj_name
@@ -167,28 +382,24 @@ class RtmpReader:
 
         elif ret['msg'] == DataTypes.COMMAND:
             ret['stream_id'] = header.stream_id  # contextual information.
-            decoder = pyamf.amf0.Decoder(body_stream)
-            commands = []
-            while not body_stream.at_eof():
-                commands.append(decoder.readElement())
-            ret['command'] = commands
+            ret['command'] = LazyCommand(body)
 
         elif ret['msg'] == DataTypes.SET_CHUNK_SIZE:
-            ret['chunk_size'] = body_stream.read_ulong()
+            ret['chunk_size'] = ULONG.unpack_from(body)[0]
 
         elif ret['msg'] == DataTypes.DATA:
             ret['stream_id'] = header.stream_id
-            ret['metadata'] = message_body
+            ret['metadata'] = body
 
         elif ret['msg'] == DataTypes.AUDIO:
             ret['stream_id'] = header.stream_id
-            ret['control'] = body_stream.read_uchar()
-            ret['data'] = body_stream.read()
+            ret['control'] = body[0]
+            ret['data'] = memoryview(body)[1:]
 
         elif ret['msg'] == DataTypes.VIDEO:
             ret['stream_id'] = header.stream_id
-            ret['control'] = body_stream.read_uchar()
-            ret['data'] = body_stream.read()
+            ret['control'] = body[0]
+            ret['data'] = memoryview(body)[1:]
 
         else:
             assert False, header
@@ -197,13 +408,13 @@ class RtmpReader:
         return ret
 
     @staticmethod
-    def read_shared_object_event(body_stream, decoder):
+    def read_shared_object_event(decoder):
         """
         Helper method that reads one shared object event found inside a shared
         object RTMP message.
         """
-        so_body_type = body_stream.read_uchar()
-        so_body_size = body_stream.read_ulong()
+        so_body_type = decoder.read_uchar()
+        so_body_size = decoder.read_ulong()
 
         event = {'type': so_body_type}
         if event['type'] == SOEventTypes.USE:
@@ -213,29 +424,29 @@ class RtmpReader:
             assert so_body_size == 0, so_body_size
             event['data'] = ''
         elif event['type'] == SOEventTypes.CHANGE:
-            start_pos = body_stream.tell()
+            start_pos = decoder.tell()
             changes = {}
-            while body_stream.tell() < start_pos + so_body_size:
-                attrib_name = decoder.readString()
-                attrib_value = decoder.readElement()
+            while decoder.tell() < start_pos + so_body_size:
+                attrib_name = decoder.read_string()
+                attrib_value = decoder.read_element()
                 assert attrib_name not in changes, (attrib_name, changes.keys())
                 changes[attrib_name] = attrib_value
-            assert body_stream.tell() == start_pos + so_body_size,\
-                (body_stream.tell(), start_pos, so_body_size)
+            assert decoder.tell() == start_pos + so_body_size,\
+                (decoder.tell(), start_pos, so_body_size)
             event['data'] = changes
         elif event['type'] == SOEventTypes.MESSAGE:
-            start_pos = body_stream.tell()
+            start_pos = decoder.tell()
             msg_params = []
-            while body_stream.tell() < start_pos + so_body_size:
-                msg_params.append(decoder.readElement())
-            assert body_stream.tell() == start_pos + so_body_size,\
-                (body_stream.tell(), start_pos, so_body_size)
+            while decoder.tell() < start_pos + so_body_size:
+                msg_params.append(decoder.read_element())
+            assert decoder.tell() == start_pos + so_body_size,\
+                (decoder.tell(), start_pos, so_body_size)
             event['data'] = msg_params
         elif event['type'] == SOEventTypes.CLEAR:
             assert so_body_size == 0, so_body_size
             event['data'] = ''
         elif event['type'] == SOEventTypes.DELETE:
-            event['data'] = decoder.readString()
+            event['data'] = decoder.read_string()
         elif event['type'] == SOEventTypes.USE_SUCCESS:
             assert so_body_size == 0, so_body_size
             event['data'] = ''
@@ -246,71 +457,84 @@ class RtmpReader:
 
 
 class RtmpWriter:
-    """ This class writes RTMP messages into a stream. """
+    """
+    This class writes RTMP messages into a socket.
+
+    Written messages are chunked into a single pending buffer, which goes out
+    to the socket in one sendall call when the writer is flushed.
+    """
 
     # Default write chunk size.
     chunk_size = 128
 
-    def __init__(self, stream):
-        """ Initialize the RTMP writer and set it to write into the specified stream. """
-        self.stream = stream
+    def __init__(self, sock):
+        """ Initialize the RTMP writer and set it to write into the specified socket. """
+        self.socket = sock
+        self._pending = bytearray()
+        self._header_buffer = bytearray(rtmp_protocol_base.MAX_HEADER_LENGTH)
 
     def flush(self):
-        """ Flush the underlying stream. """
-        self.stream.flush()
+        """ Send all the pending chunked messages to the socket with a single call. """
+        if self._pending:
+            self.socket.sendall(self._pending)
+            self._pending = bytearray()
 
     def write(self, message):
+        """
+        Encode the specified message and add its chunks to the pending buffer.
+        The message is not sent until the writer is flushed.
+
+        :param message: dict the message to encode.
+        :return: int the amount of bytes the chunked message added to the pending buffer.
+        """
         log.debug('send %r', message)
-        """ Encode and write the specified message into the stream. """
         data_type = message['msg']
-        body_stream = pyamf.util.BufferedByteStream()
-        encoder = pyamf.amf0.Encoder(body_stream)
+        encoder = amf0.Encoder()
 
         if data_type == DataTypes.USER_CONTROL:
-            body_stream.write_ushort(message['event_type'])
-            body_stream.write(message['event_data'])
+            encoder.write_ushort(message['event_type'])
+            encoder.write_bytes(message['event_data'])
 
         elif data_type == DataTypes.WINDOW_ACK_SIZE:
-            body_stream.write_ulong(message['window_ack_size'])
+            encoder.write_ulong(message['window_ack_size'])
 
         elif data_type == DataTypes.SET_CHUNK_SIZE:
-            body_stream.write_long(message['chunk_size'])
+            encoder.write_long(message['chunk_size'])
 
         elif data_type == DataTypes.SET_PEER_BANDWIDTH:
-            body_stream.write_ulong(message['window_ack_size'])
-            body_stream.write_uchar(message['limit_type'])
+            encoder.write_ulong(message['window_ack_size'])
+            encoder.write_uchar(message['limit_type'])
 
         elif data_type == DataTypes.COMMAND:
             for command in message['command']:
-                encoder.writeElement(command)
+                encoder.write_element(command)
 
         elif data_type == DataTypes.SHARED_OBJECT:
-            encoder.serialiseString(message['obj_name'])
-            body_stream.write_ulong(message['curr_version'])
-            body_stream.write(message['flags'])
+            encoder.write_string(message['obj_name'])
+            encoder.write_ulong(message['curr_version'])
+            encoder.write_bytes(message['flags'])
 
             for event in message['events']:
-                RtmpWriter.write_shared_object_event(event, body_stream)
+                RtmpWriter.write_shared_object_event(event, encoder)
 
         elif data_type == DataTypes.AUDIO:
             # Write an audio message into the stream.
-            body_stream.write_uchar(message['body']['control'])  # Write control
-            body_stream.write(message['body']['data'])  # Write data
+            encoder.write_uchar(message['body']['control'])  # Write control
+            encoder.write_bytes(message['body']['data'])  # Write data
 
         elif data_type == DataTypes.VIDEO:
             # Write an video message into the stream.
-            body_stream.write_uchar(message['body']['control'])  # Write control
-            body_stream.write(message['body']['data'])  # Write data
+            encoder.write_uchar(message['body']['control'])  # Write control
+            encoder.write_bytes(message['body']['data'])  # Write data
 
         else:
             assert False, message
 
-        self.send_msg(data_type, body_stream.getvalue(), message)
+        return self.send_msg(data_type, encoder.buf, message)
 
     @staticmethod
-    def write_shared_object_event(event, body_stream):
-        inner_stream = pyamf.util.BufferedByteStream()
-        encoder = pyamf.amf0.Encoder(inner_stream)
+    def write_shared_object_event(event, encoder):
+        inner_encoder = amf0.Encoder()
 
         event_type = event['type']
         if event_type == SOEventTypes.USE:
@@ -318,8 +542,8 @@ class RtmpWriter:
         elif event_type == SOEventTypes.CHANGE:
             for attrib_name in event['data']:
                 attrib_value = event['data'][attrib_name]
-                encoder.serialiseString(attrib_name)
-                encoder.writeElement(attrib_value)
+                inner_encoder.write_string(attrib_name)
+                inner_encoder.write_element(attrib_value)
         elif event['type'] == SOEventTypes.CLEAR:
             assert event['data'] == '', event['data']
         elif event['type'] == SOEventTypes.USE_SUCCESS:
@@ -327,15 +551,18 @@ class RtmpWriter:
         else:
             assert False, event
 
-        body_stream.write_uchar(event_type)
-        body_stream.write_ulong(len(inner_stream))
-        body_stream.write(inner_stream.getvalue())
+        encoder.write_uchar(event_type)
+        encoder.write_ulong(len(inner_encoder))
+        encoder.write_bytes(inner_encoder.buf)
 
     def send_msg(self, data_type, body, message=None):
         """
-        Helper method that sends the specified message into the stream. Takes
+        Helper method that adds the specified message to the pending buffer. Takes
         care to prepend the necessary headers and split the message into
-        appropriately sized chunks.
+        appropriately sized chunks. The chunks are copied straight from a view on
+        the body, and the continuation header is encoded only once per message.
+
+        :return: int the amount of bytes added to the pending buffer.
         """
         # Values that just work. :-)
         if 1 <= data_type <= 7:
@@ -369,13 +596,157 @@ class RtmpWriter:
             stream_id=stream_id,
             body_length=len(body),
             data_type=data_type)
-        rtmp_protocol_base.header_encode(self.stream, header)
+        pending = self._pending
+        start = len(pending)
+        header_buffer = self._header_buffer
+
+        header_length = rtmp_protocol_base.header_encode_into(header_buffer, header)
+        pending += header_buffer[:header_length]
+
+        header_length = rtmp_protocol_base.header_encode_into(header_buffer, header, header)
+        continuation = header_buffer[:header_length]
 
-        for i in xrange(0, len(body), self.chunk_size):
-            chunk = body[i:i + self.chunk_size]
-            self.stream.write(chunk)
-            if i+self.chunk_size < len(body):
-                rtmp_protocol_base.header_encode(self.stream, header, header)
+        body_view = memoryview(body)
+        body_length = len(body)
+        chunk_size = self.chunk_size
+        for i in xrange(0, body_length, chunk_size):
+            pending += body_view[i:i + chunk_size]
+            if i + chunk_size < body_length:
+                pending += continuation
+
+        return len(pending) - start
+
+
+class OutboundQueue:
+    """
+    A bounded, thread-safe queue of RTMP messages waiting to be sent.
+
+    Messages are queued per priority class (see L{SendPriority}); any thread may put
+    messages into the queue without blocking, and a single writer thread takes them
+    out in batches, most urgent class first. A waiting class that has been passed over
+    starvation_limit times in a row is served next, so bulk traffic always moves.
+    Messages offered to a full class (or a closed queue) are dropped and counted.
+    """
+
+    def __init__(self, max_depth, starvation_limit=16):
+        """
+        Initialize the outbound queue.
+        :param max_depth: int the maximum amount of messages that may be waiting in each class.
+        :param starvation_limit: int the amount of times a waiting class may be passed over.
+        """
+        self.max_depth = max_depth
+        self.starvation_limit = starvation_limit
+        self.closed = False
+
+        class_count = len(SendPriority.names)
+        self.dropped = [0] * class_count
+        self.high_water = [0] * class_count
+        self.sent_messages = [0] * class_count
+        self.sent_bytes = [0] * class_count
+
+        self._classes = [deque() for _ in xrange(class_count)]
+        self._passed_over = [0] * class_count
+        self._length = 0
+        self._condition = threading.Condition()
+
+    def __len__(self):
+        return self._length
+
+    def put(self, message, priority=SendPriority.CHAT):
+        """
+        Add a message to the end of its priority class.
+        :param message: dict the message to send.
+        :param priority: int the SendPriority class of the message.
+        :return: bool True if the message was queued, False if it was dropped.
+        """
+        with self._condition:
+            messages = self._classes[priority]
+            if self.closed or len(messages) >= self.max_depth:
+                self.dropped[priority] += 1
+                return False
+
+            messages.append(message)
+            self._length += 1
+            if len(messages) > self.high_water[priority]:
+                self.high_water[priority] = len(messages)
+            self._condition.notify()
+            return True
+
+    def get_batch(self, max_messages):
+        """
+        Wait for messages and take up to max_messages of them from the queue.
+        :param max_messages: int the maximum amount of messages to return.
+        :return: list (priority, message) tuples in sending order, empty once the queue is closed.
+        """
+        with self._condition:
+            while not self._length and not self.closed:
+                self._condition.wait()
+
+            if self.closed:
+                return []
+
+            batch = []
+            while self._length and len(batch) < max_messages:
+                priority = self._next_priority()
+                batch.append((priority, self._classes[priority].popleft()))
+                self._length -= 1
+            return batch
+
+    def _next_priority(self):
+        """
+        Pick the class to take the next message from. Must be called with the lock held
+        and at least one message queued.
+        :return: int the SendPriority class.
+        """
+        chosen = None
+        for priority, messages in enumerate(self._classes):
+            if not messages:
+                continue
+            if chosen is None:
+                chosen = priority
+            else:
+                self._passed_over[priority] += 1
+
+        # Serve the most starved class instead, if any class waited for too long.
+        starved = max(xrange(len(self._classes)), key=self._passed_over.__getitem__)
+        if self._passed_over[starved] > self.starvation_limit and self._classes[starved]:
+            if chosen != starved:
+                self._passed_over[chosen] += 1
+            chosen = starved
+
+        self._passed_over[chosen] = 0
+        return chosen
+
+    def record_sent(self, priority, byte_count):
+        """
+        Count a message that was written to the socket.
+        :param priority: int the SendPriority class of the message.
+        :param byte_count: int the size of the chunked message.
+        """
+        self.sent_messages[priority] += 1
+        self.sent_bytes[priority] += byte_count
+
+    def stats(self):
+        """
+        Get the counters of every priority class.
+        :return: dict of class name to a dict of counters.
+        """
+        return dict((name, {
+            'queued': len(self._classes[priority]),
+            'high_water': self.high_water[priority],
+            'dropped': self.dropped[priority],
+            'sent_messages': self.sent_messages[priority],
+            'sent_bytes': self.sent_bytes[priority]
+        }) for priority, name in enumerate(SendPriority.names))
+
+    def close(self):
+        """ Close the queue, discarding any pending messages and releasing the writer thread. """
+        with self._condition:
+            self.closed = True
+            for messages in self._classes:
+                messages.clear()
+            self._length = 0
+            self._condition.notify_all()
 
 
 class FlashSharedObject:
@@ -392,7 +763,7 @@ class FlashSharedObject:
         self.data = {}
         self.use_success = False
 
-    def use(self, writer):
+    def use(self, client):
         """
         Initialize usage of the SO by contacting the Flash Media Server. Any
         remote changes to the SO should be now propagated to the client.
@@ -411,8 +782,7 @@ class FlashSharedObject:
             ],
             'obj_name': self.name
         }
-        writer.write(msg)
-        writer.flush()
+        client.send(msg, SendPriority.CONTROL)
 
     def handle_message(self, message):
         """
@@ -467,14 +837,20 @@ class FlashSharedObject:
 class RtmpClient:
     """ Represents an RTMP client. """
 
+    # The maximum amount of queued messages the writer thread sends with a single flush.
+    send_batch_size = 64
+    # The amount of times a waiting priority class may be passed over before it is served.
+    send_starvation_limit = 16
+
     def __init__(self, ip, port, tc_url, page_url, swf_url, app, swf_version,
-                 room_type, prefix, room, version, cookie, account='', proxy=None,):
+                 room_type, prefix, room, version, cookie, account='', proxy=None, send_queue_depth=1024):
         """ Initialize a new RTMP client. """
         self.socket = None
         self.stream = None
-        self.file = None
         self.reader = None
         self.writer = None
+        self.outbound = OutboundQueue(send_queue_depth, self.send_starvation_limit)
+        self._writer_thread = None
 
         self.ip = ip
         self.port = port
@@ -561,8 +937,7 @@ class RtmpClient:
         }
 
         msg['command'].extend(connect_params)
-        self.writer.write(msg)
-        self.writer.flush()
+        self.send(msg, SendPriority.CONTROL)
 
     def connect(self, connect_params):
         """ Connect to the server with the given connect parameters. """
@@ -577,19 +952,63 @@ class RtmpClient:
         else:
             self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
 
-        # Initialise basic socket and streams to temporarily record the data we receive.
+        # Initialise the socket and the stream the data is received from.
         self.socket.connect((self.ip, self.port))
-        self.file = self.socket.makefile()
-        self.stream = FileDataTypeMixIn(self.file)
+        self.stream = SocketDataTypeMixIn(self.socket)
 
         # Turn on TCP keep-alive.
         self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
 
         self.handshake()
         self.reader = RtmpReader(self.stream)
-        self.writer = RtmpWriter(self.stream)
+        self.writer = RtmpWriter(self.socket)
+
+        self._writer_thread = threading.Thread(target=self._write_loop)
+        self._writer_thread.setDaemon(True)
+        self._writer_thread.start()
+
         self.connect_rtmp(connect_params)
 
+    def send(self, message, priority=SendPriority.CHAT):
+        """
+        Queue a message to be sent by the writer thread. This never blocks.
+        :param message: dict the message to send.
+        :param priority: int the SendPriority class of the message.
+        :return: bool True if the message was queued, False if it was dropped.
+        """
+        if self.outbound.put(message, priority):
+            return True
+        log.warning('outbound %s queue full or closed (%s queued, %s dropped), dropping: %s' %
+                    (SendPriority.names[priority], len(self.outbound), self.outbound.dropped[priority],
+                     message['msg']))
+        return False
+
+    def _write_loop(self):
+        """
+        Writer thread; the only place messages are written to the socket. Drains the
+        outbound queue in batches and sends each batch with a single flush.
+
+        If a write fails the queue is closed and the socket is shut down, so the reading
+        side of the client fails as well and the connection can be set up again.
+        """
+        while True:
+            batch = self.outbound.get_batch(self.send_batch_size)
+            if not batch:
+                break
+
+            try:
+                for priority, message in batch:
+                    self.outbound.record_sent(priority, self.writer.write(message))
+                    # A new chunk size applies to the messages that follow it.
+                    if message['msg'] == DataTypes.SET_CHUNK_SIZE:
+                        self.writer.chunk_size = message['chunk_size']
+                self.writer.flush()
+            except Exception as ex:
+                log.error('send error: %s' % ex, exc_info=True)
+                self.outbound.close()
+                self._shutdown_socket()
+                break
+
     def handle_packet(self, amf_data):
         """ Handle default packets based on data-types. """
         if amf_data['msg'] == DataTypes.USER_CONTROL and amf_data['event_type'] == UserControlTypes.PING_REQUEST:
@@ -598,8 +1017,7 @@ class RtmpClient:
                 'event_type': UserControlTypes.PING_RESPONSE,
                 'event_data': amf_data['event_data']
             }
-            self.writer.write(ping_response)
-            self.writer.flush()
+            self.send(ping_response, SendPriority.CONTROL)
             log.info('Handled PING_REQUEST packet with response: %s' % ping_response)
             return True
 
@@ -609,8 +1027,7 @@ class RtmpClient:
                 'msg': DataTypes.WINDOW_ACK_SIZE,
                 'window_ack_size': amf_data['window_ack_size']
             }
-            self.writer.write(ack_msg)
-            self.writer.flush()
+            self.send(ack_msg, SendPriority.CONTROL)
             log.info('Handled WINDOW_ACK_SIZE packet with response: %s' % ack_msg)
             return True
 
@@ -636,8 +1053,16 @@ class RtmpClient:
         else:
             return False
 
+    def _shutdown_socket(self):
+        """ Shut down both directions of the socket, it may have been shut down already. """
+        try:
+            self.socket.shutdown(socket.SHUT_RDWR)
+        except socket.error as ex:
+            log.info('socket shutdown error: %s' % ex)
+
     def shutdown(self):
-        self.socket.shutdown(socket.SHUT_RDWR)
+        self.outbound.close()
+        self._shutdown_socket()
         self.socket.close()
 
     def call(self, process_name, parameters=None, trans_id=0):
@@ -655,13 +1080,12 @@ class RtmpClient:
             ]
         }
 
-        self.writer.write(msg)
-        self.writer.flush()
+        self.send(msg)
 
     def shared_object_use(self, so):
         """ Use a shared object and add it to the managed list of shared objects (SOs). """
         if so in self.shared_objects:
             return
-        so.use(self.reader, self.writer)
+        so.use(self)
         self.shared_objects.append(so)
 
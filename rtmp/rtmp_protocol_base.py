@@ -6,10 +6,21 @@
 # https://github.com/prekageo/rtmp-python & https://github.com/nortxort/pinylib
 
 import logging
+import struct
 import time
 
 HANDSHAKE_LENGTH = 1536
-HEADERS = {}  # Remember previous headers, for re-use.
+
+# Precompiled codecs for the chunk header forms. The 24 bit fields are packed byte
+# by byte so every message header form is de/encoded with a single struct call.
+BASIC_HEADER_3 = struct.Struct('<H')  # 3 byte form channel id (64 - 65599), little endian.
+MESSAGE_HEADER_0 = struct.Struct('<BBBBBBBL')  # timestamp, body length, data type, stream id.
+MESSAGE_HEADER_1 = struct.Struct('>BBBBBBB')  # timestamp, body length, data type.
+MESSAGE_HEADER_2 = struct.Struct('>BBB')  # timestamp.
+EXTENDED_TIMESTAMP = struct.Struct('>L')
+
+# The largest possible chunk header; 3 byte basic header, type 0 message header and extended timestamp.
+MAX_HEADER_LENGTH = 3 + MESSAGE_HEADER_0.size + EXTENDED_TIMESTAMP.size
 
 log = logging.getLogger(__name__)
 
@@ -63,83 +74,70 @@ class Packet(object):
         self.payload = stream_buffer.read(HANDSHAKE_LENGTH - 8)
 
 
-def header_decode(stream):
+def header_decode(stream, previous_headers):
     """
     Reads a header from the incoming stream.
 
     A header can be of varying lengths and the properties that get updated
-    depend on the length.
+    depend on the length. Fields missing from the shorter header forms are
+    inherited from the previous header received on the same channel.
 
     @param stream: The byte stream to read the header from.
     @type stream: C{pyamf.util.BufferedByteStream}
+    @param previous_headers: The previous header per channel, indexed by the
+        channel id. The list is grown and updated in place.
+    @type previous_headers: C{list}
     @return: The read header from the stream.
     @rtype: L{Header}
     """
     # Read the size and channel_id.
-    channel_id = stream.read_uchar()
+    channel_id = ord(stream.read(1))
     bits = channel_id >> 6
     channel_id &= 0x3f
 
     if channel_id == 0:
-        channel_id = stream.read_uchar() + 64
+        channel_id = ord(stream.read(1)) + 64
 
-    if channel_id == 1:
-        channel_id = stream.read_uchar() + 64 + (stream.read_uchar() << 8)
+    elif channel_id == 1:
+        channel_id = BASIC_HEADER_3.unpack(stream.read(2))[0] + 64
 
+    if channel_id >= len(previous_headers):
+        previous_headers.extend([None] * (channel_id + 1 - len(previous_headers)))
+
+    previous = previous_headers[channel_id]
     header = Header(channel_id)
 
+    if previous is not None:
+        header.timestamp = previous.timestamp
+        header.data_type = previous.data_type
+        header.body_length = previous.body_length
+        header.stream_id = previous.stream_id
+
     if bits == 3:
-        try:
-            header.stream_id = HEADERS[str(channel_id)].stream_id
-            header.body_length = HEADERS[str(channel_id)].body_length
-        except Exception:
-            pass
-        try:
-            header.data_type = HEADERS[str(channel_id)].data_type
-        except Exception:
-            pass
-        try:
-            header.timestamp = HEADERS[str(channel_id)].timestamp
-        except Exception:
-            pass
         return header
 
-    header.timestamp = stream.read_24bit_uint()
-
-    if bits < 3:
-        try:
-            header.stream_id = HEADERS[str(channel_id)].stream_id
-        except Exception:
-            pass
-        try:
-            header.body_length = HEADERS[str(channel_id)].body_length
-        except Exception:
-            pass
-
-    if bits < 2:
-        header.body_length = stream.read_24bit_uint()
-        header.data_type = stream.read_uchar()
-        try:
-            header.stream_id = HEADERS['previous'].stream_id
-        except Exception:
-            pass
-
-    if bits < 1:
-        # stream_id is little endian
-        stream.endian = '<'
-        header.stream_id = stream.read_ulong()
-        stream.endian = '!'
-
+    if bits == 0:
+        t0, t1, t2, l0, l1, l2, header.data_type, header.stream_id = \
+            MESSAGE_HEADER_0.unpack(stream.read(MESSAGE_HEADER_0.size))
+        header.body_length = (l0 << 16) | (l1 << 8) | l2
         header.full = True
 
+    elif bits == 1:
+        t0, t1, t2, l0, l1, l2, header.data_type = MESSAGE_HEADER_1.unpack(stream.read(MESSAGE_HEADER_1.size))
+        header.body_length = (l0 << 16) | (l1 << 8) | l2
+
+    else:
+        t0, t1, t2 = MESSAGE_HEADER_2.unpack(stream.read(MESSAGE_HEADER_2.size))
+
+    header.timestamp = (t0 << 16) | (t1 << 8) | t2
+
     if header.timestamp == 0xffffff:
-        header.timestamp = stream.read_ulong()
+        header.timestamp = EXTENDED_TIMESTAMP.unpack(stream.read(EXTENDED_TIMESTAMP.size))[0]
 
-    # Remember previous headers.
-    HEADERS['previous'] = header  # Type 1 & 2.
-    HEADERS[str(channel_id)] = header  # Type 3.
+    # Remember the header for the shorter header forms on this channel.
+    previous_headers[channel_id] = header
 
-    log.info('header recv: %s' % header)
+    log.info('header recv: %s', header)
     return header
 
 
@@ -147,7 +145,19 @@ def header_encode(stream, header, previous=None):
     """
     Encodes a RTMP header to C{stream}.
 
-    We expect the stream to already be in network endian mode.
+    @param stream: The stream to write the encoded header.
+    @type stream: L{util.BufferedByteStream}
+    @param header: The L{Header} to encode.
+    @param previous: The previous header (if any).
+    """
+    buf = bytearray(MAX_HEADER_LENGTH)
+    length = header_encode_into(buf, header, previous)
+    stream.write(str(buf[:length]))
+
+
+def header_encode_into(buf, header, previous=None):
+    """
+    Encodes a RTMP header to the start of C{buf}.
 
     The channel id can be encoded in up to 3 bytes. The first byte is special as
     it contains the size of the rest of the header as described in
@@ -157,12 +167,14 @@ def header_encode(stream, header, previous=None):
     64 >= channel_id > 320: 0, channel_id - 64
     320 >= channel_id > 0xffff + 64: 1, channel_id - 64 (written as 2 byte int)
 
-    @param stream: The stream to write the encoded header.
-    @type stream: L{util.BufferedByteStream}
+    @param buf: A reusable buffer of at least C{MAX_HEADER_LENGTH} bytes.
+    @type buf: C{bytearray}
     @param header: The L{Header} to encode.
     @param previous: The previous header (if any).
+    @return: The amount of bytes written to C{buf}.
+    @rtype: C{int}
     """
-    log.debug('header send: %s' % header)
+    log.debug('header send: %s', header)
     if previous is None:
         size = 0
     else:
@@ -171,38 +183,49 @@ def header_encode(stream, header, previous=None):
     channel_id = header.channel_id
 
     if channel_id < 64:
-        stream.write_uchar(size | channel_id)
+        buf[0] = size | channel_id
+        offset = 1
     elif channel_id < 320:
-        stream.write_uchar(size)
-        stream.write_uchar(channel_id - 64)
+        buf[0] = size
+        buf[1] = channel_id - 64
+        offset = 2
     else:
-        channel_id -= 64
-
-        stream.write_uchar(size + 1)
-        stream.write_uchar(channel_id & 0xff)
-        stream.write_uchar(channel_id >> 0x08)
+        buf[0] = size | 1
+        BASIC_HEADER_3.pack_into(buf, 1, channel_id - 64)
+        offset = 3
 
     if size == 0xc0:
-        return
+        return offset
 
-    if size <= 0x80:
-        if header.timestamp >= 0xffffff:
-            stream.write_24bit_uint(0xffffff)
-        else:
-            stream.write_24bit_uint(header.timestamp)
+    timestamp = header.timestamp
+    if timestamp >= 0xffffff:
+        field_timestamp = 0xffffff
+    else:
+        field_timestamp = timestamp
 
-    if size <= 0x40:
-        stream.write_24bit_uint(header.body_length)
-        stream.write_uchar(header.data_type)
+    t0, t1, t2 = field_timestamp >> 16, (field_timestamp >> 8) & 0xff, field_timestamp & 0xff
 
     if size == 0:
-        stream.endian = '<'
-        stream.write_ulong(header.stream_id)
-        stream.endian = '!'
+        body_length = header.body_length
+        MESSAGE_HEADER_0.pack_into(buf, offset, t0, t1, t2, body_length >> 16, (body_length >> 8) & 0xff,
+                                   body_length & 0xff, header.data_type, header.stream_id)
+        offset += MESSAGE_HEADER_0.size
+
+    elif size == 0x40:
+        body_length = header.body_length
+        MESSAGE_HEADER_1.pack_into(buf, offset, t0, t1, t2, body_length >> 16, (body_length >> 8) & 0xff,
+                                   body_length & 0xff, header.data_type)
+        offset += MESSAGE_HEADER_1.size
+
+    else:
+        MESSAGE_HEADER_2.pack_into(buf, offset, t0, t1, t2)
+        offset += MESSAGE_HEADER_2.size
+
+    if timestamp >= 0xffffff:
+        EXTENDED_TIMESTAMP.pack_into(buf, offset, timestamp)
+        offset += EXTENDED_TIMESTAMP.size
 
-    if size <= 0x80:
-        if header.timestamp >= 0xffffff:
-            stream.write_ulong(header.timestamp)
+    return offset
 
 
 class Header(object):
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+
+"""
+Conformance of the in-tree AMF0 codec with pyamf.
+
+Every corpus is encoded by both and has to give the same bytes, and the pyamf encoding
+has to decode to the same values (and types) from each kind of buffer the codec reads.
+"""
+
+import datetime
+import unittest
+
+import pyamf
+
+from rtmp import amf0
+
+
+def _shared():
+    shared = pyamf.ASObject({'nick': u'guest-1', 'id': 1})
+    listed = [1, 2, 3]
+    return [shared, shared, listed, {'again': listed, 'obj': shared}]
+
+
+def _mixed():
+    mixed = pyamf.MixedArray()
+    mixed[0] = u'zero'
+    mixed[1] = 1.5
+    mixed['name'] = u'room'
+    mixed['nested'] = pyamf.MixedArray({'flag': True, 2: None})
+    return [mixed]
+
+
+CORPUS = {
+    'numbers': [0, 1, -1, 2 ** 31, -2 ** 53, 1.5, -0.25, 1e300, float('inf')],
+    'booleans': [True, False],
+    'strings': [u'', u'privmsg', u'h\xe9llo ☃ \U0001f600', 'bytes'],
+    'long string': [u'x' * 0x10000, u'☃' * 30000],
+    'null and undefined': [None, pyamf.Undefined],
+    'objects': [pyamf.ASObject({'a': 1, 'b': u'two', 'c': None}), {'empty': pyamf.ASObject()}],
+    'strict arrays': [[], [1, u'two', [3.5, None]], (u'tuple', 1)],
+    'privmsg': [u'privmsg', 0, None, u'74,101,115,116', u'#0,en', u'n', u'1234'],
+    'join': [u'join', 0, pyamf.ASObject({'nick': u'guest-1234', 'id': 1234, 'account': u'', 'mod': False,
+                                          'own': False, 'btype': u'', 'lf': False, 'stype': 0, 'gp': 0})],
+    'references': _shared(),
+    'mixed arrays': _mixed(),
+    'datetime fallback': [u'before', datetime.datetime(2016, 5, 4, 3, 2, 1), {'after': [1, 2]}],
+}
+
+
+def _pyamf_encode(elements):
+    return pyamf.encode(*elements, encoding=pyamf.AMF0).getvalue()
+
+
+def _pyamf_decode(data):
+    return list(pyamf.decode(data, encoding=pyamf.AMF0))
+
+
+class ConformanceTest(unittest.TestCase):
+
+    def assertSameValues(self, expected, actual, path='value'):
+        self.assertEqual(type(expected), type(actual), '%s: %r is not %r' % (path, actual, expected))
+        if isinstance(expected, dict):
+            self.assertEqual(sorted(expected.keys()), sorted(actual.keys()), path)
+            for key in expected:
+                self.assertSameValues(expected[key], actual[key], '%s[%r]' % (path, key))
+        elif isinstance(expected, (list, tuple)):
+            self.assertEqual(len(expected), len(actual), path)
+            for i, (a, b) in enumerate(zip(expected, actual)):
+                self.assertSameValues(a, b, '%s[%d]' % (path, i))
+        else:
+            self.assertEqual(expected, actual, path)
+
+    def test_encode_matches_pyamf(self):
+        for name, elements in sorted(CORPUS.items()):
+            self.assertEqual(_pyamf_encode(elements), str(amf0.encode_elements(elements)), name)
+
+    def test_decode_matches_pyamf(self):
+        for name, elements in sorted(CORPUS.items()):
+            data = _pyamf_encode(elements)
+            expected = _pyamf_decode(data)
+            for buf in (data, bytearray(data), memoryview(bytearray(data))):
+                self.assertSameValues(expected, amf0.decode_elements(buf), '%s (%s)' % (name, type(buf).__name__))
+
+    def test_round_trip(self):
+        for name, elements in sorted(CORPUS.items()):
+            data = str(amf0.encode_elements(elements))
+            self.assertEqual(data, str(amf0.encode_elements(amf0.decode_elements(data))), name)
+
+    def test_decode_references_share_objects(self):
+        decoded = amf0.decode_elements(_pyamf_encode(_shared()))
+        self.assertIs(decoded[0], decoded[1])
+        self.assertIs(decoded[2], decoded[3]['again'])
+        self.assertIs(decoded[0], decoded[3]['obj'])
+
+    def test_decode_from_offset(self):
+        data = 'header' + _pyamf_encode(CORPUS['privmsg'])
+        self.assertEqual(CORPUS['privmsg'], amf0.decode_elements(bytearray(data), 6))
+
+    def test_truncated_buffer(self):
+        data = _pyamf_encode([u'privmsg'])
+        self.assertRaises(pyamf.DecodeError, amf0.decode_elements, data[:-1])
+
+    def test_unknown_reference(self):
+        self.assertRaises(pyamf.ReferenceError, amf0.decode_elements, '\x07\x00\x05')
+
+
+if __name__ == '__main__':
+    unittest.main()
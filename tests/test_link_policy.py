@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+
+""" Checks of the link policy: the most specific domain wins, and the decisions on chat messages. """
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from files import link_policy
+
+POLICY = '''# Links in the room.
+deny example.com
+allow www.example.com
+ignore tinychat.com
+spam.net
+allow youtube.com
+'''
+
+
+class DomainTrieTest(unittest.TestCase):
+
+    def test_most_specific_domain_wins(self):
+        for domains in (['example.com', 'www.example.com'], ['www.example.com', 'example.com']):
+            trie = link_policy.DomainTrie()
+            for domain in domains:
+                trie.add(domain, link_policy.DENY if domain == 'example.com' else link_policy.ALLOW)
+            self.assertEqual(trie.lookup('example.com'), link_policy.DENY)
+            self.assertEqual(trie.lookup('mail.example.com'), link_policy.DENY)
+            self.assertEqual(trie.lookup('www.example.com'), link_policy.ALLOW)
+            self.assertEqual(trie.lookup('cdn.www.example.com'), link_policy.ALLOW)
+            self.assertEqual(trie.size, 2)
+
+    def test_other_hosts(self):
+        trie = link_policy.DomainTrie()
+        trie.add('www.example.com', link_policy.ALLOW)
+        self.assertIsNone(trie.lookup('example.com'))
+        self.assertIsNone(trie.lookup('notexample.com'))
+        self.assertIsNone(trie.lookup('com'))
+        self.assertIsNone(trie.lookup('example.org'))
+
+    def test_add_again(self):
+        trie = link_policy.DomainTrie()
+        trie.add('example.com.', link_policy.DENY)
+        trie.add('example.com', link_policy.IGNORE)
+        self.assertEqual(trie.size, 1)
+        self.assertEqual(trie.lookup('example.com'), link_policy.IGNORE)
+
+
+class LinkPolicyTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = self.directory + os.sep
+        self.name = 'link_policy.txt'
+        with open(self.path + self.name, 'w') as f:
+            f.write(POLICY)
+        self.policy = link_policy.LinkPolicy(self.path, self.name)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def check(self, msg):
+        return tuple(self.policy.check(msg))
+
+    def test_no_links(self):
+        self.assertEqual(self.check('hello, how are you? mail me at me@example.com'),
+                         (link_policy.IGNORE, None, None))
+
+    def test_denied(self):
+        self.assertEqual(self.check('go to http://example.com/win now'),
+                         (link_policy.DENY, u'http://example.com/win', u'example.com'))
+        self.assertEqual(self.check('free at cdn.SPAM.net'), (link_policy.DENY, u'cdn.spam.net', u'cdn.spam.net'))
+        # A Cyrillic a in the host.
+        self.assertEqual(self.check(u'go to ex\u0430mple.com')[0], link_policy.DENY)
+
+    def test_allowed_subdomain_of_denied_domain(self):
+        self.assertEqual(self.check('see https://www.example.com/Page'),
+                         (link_policy.ALLOW, 'https://www.example.com/Page', 'www.example.com'))
+
+    def test_allowed_link_needs_a_scheme(self):
+        self.assertEqual(self.check('see www.example.com'), (link_policy.IGNORE, None, None))
+        self.assertEqual(self.check('see https://unknown.org/Path?q=A'),
+                         (link_policy.ALLOW, 'https://unknown.org/Path?q=A', 'unknown.org'))
+
+    def test_ignored(self):
+        self.assertEqual(self.check('come to https://tinychat.com/room'), (link_policy.IGNORE, None, None))
+
+    def test_denied_link_wins_over_allowed_link(self):
+        self.assertEqual(self.check('https://youtube.com/watch?v=1 and spam.net')[0], link_policy.DENY)
+
+    def test_missing_file_allows_links(self):
+        policy = link_policy.LinkPolicy(self.path, 'missing.txt')
+        self.assertEqual(policy.check('see http://example.com/').action, link_policy.ALLOW)
+
+    def test_invalidate(self):
+        self.policy.check_interval = 60
+        self.assertEqual(self.check('https://youtube.com/watch?v=1')[0], link_policy.ALLOW)
+        with open(self.path + self.name, 'a') as f:
+            f.write('deny youtube.com\n')
+        self.policy.invalidate()
+        self.assertEqual(self.check('https://youtube.com/watch?v=1')[0], link_policy.DENY)
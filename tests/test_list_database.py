@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+
+""" Checks of the list database: importing the list files once, versions and the lists kept in memory on top. """
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from files import file_handler as fh, list_database, list_store
+
+
+class ListDatabaseTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = self.directory + os.sep
+        self.lists = {self.path + 'badnicks.txt': 'bad_nicks', self.path + 'badaccounts.txt': 'bad_accounts'}
+        with open(self.path + 'badnicks.txt', 'w') as f:
+            f.write('Spammer\n\nguest-123\nSpammer\n')
+        self.db_location = os.path.join(self.directory, 'db', 'lists.db')
+        # Two databases on one file, like two bot processes sharing it.
+        self.first = list_database.ListDatabase(self.db_location, self.lists)
+        self.second = list_database.ListDatabase(self.db_location, self.lists)
+
+    def tearDown(self):
+        fh.use_database(None)
+        for database in (self.first, self.second):
+            database._connection().close()
+        shutil.rmtree(self.directory)
+
+    def test_invalid_table_name(self):
+        self.assertRaises(ValueError, list_database.ListDatabase, self.db_location, {'x': 'bad; drop'})
+
+    def test_import_files_once(self):
+        self.assertEqual(self.first.import_files(), {'bad_nicks': 2, 'bad_accounts': 0})
+        self.assertEqual(self.first.read(self.path, 'badnicks.txt'), ['Spammer', 'guest-123'])
+        # Imported already, by this database or the other one.
+        self.assertEqual(self.first.import_files(), {})
+        self.assertEqual(self.second.import_files(), {})
+        self.assertEqual(self.second.read(self.path, 'badnicks.txt'), ['Spammer', 'guest-123'])
+
+    def test_removed_items_are_not_imported_again(self):
+        self.first.import_files()
+        self.first.remove(self.path, 'badnicks.txt', 'Spammer')
+        self.second.import_files()
+        self.assertEqual(self.second.read(self.path, 'badnicks.txt'), ['guest-123'])
+
+    def test_version_changes_with_writes_of_the_other_connection(self):
+        version = self.first.version(self.path, 'badnicks.txt')
+        self.assertTrue(self.second.add(self.path, 'badnicks.txt', 'newbie'))
+        added = self.first.version(self.path, 'badnicks.txt')
+        self.assertNotEqual(added, version)
+
+        # Adding an item again or removing a missing item changes nothing.
+        self.assertFalse(self.second.add(self.path, 'badnicks.txt', 'newbie'))
+        self.assertFalse(self.second.remove(self.path, 'badnicks.txt', 'missing'))
+        self.assertEqual(self.first.version(self.path, 'badnicks.txt'), added)
+
+        self.assertTrue(self.second.remove(self.path, 'badnicks.txt', 'newbie'))
+        removed = self.first.version(self.path, 'badnicks.txt')
+        self.assertNotEqual(removed, added)
+
+        self.second.add(self.path, 'badnicks.txt', 'newbie')
+        self.second.clear(self.path, 'badnicks.txt')
+        self.assertNotEqual(self.first.version(self.path, 'badnicks.txt'), removed)
+        self.assertEqual(self.first.read(self.path, 'badnicks.txt'), [])
+
+    def test_versions_are_per_list(self):
+        version = self.first.version(self.path, 'badaccounts.txt')
+        self.second.add(self.path, 'badnicks.txt', 'newbie')
+        self.assertEqual(self.first.version(self.path, 'badaccounts.txt'), version)
+
+    def test_file_handler_uses_the_database(self):
+        fh.use_database(self.first)
+        fh.file_writer(self.path, 'badaccounts.txt', 'account')
+        self.assertEqual(fh.file_reader(self.path, 'badaccounts.txt'), ['account'])
+        self.assertFalse(os.path.exists(self.path + 'badaccounts.txt'))
+        self.assertTrue(fh.remove_from_file(self.path, 'badaccounts.txt', 'account'))
+        # Files not kept in the database are still files.
+        fh.file_writer(self.path, 'other.txt', 'line')
+        self.assertEqual(fh.file_reader(self.path, 'other.txt'), ['line'])
+
+    def test_list_store_on_the_database(self):
+        self.first.import_files()
+        fh.use_database(self.first)
+        store = list_store.ListStore(self.path, 'badnicks.txt', check_interval=0)
+        self.assertIn('spammer', store)
+
+        self.assertTrue(store.add('Newbie'))
+        self.assertEqual(self.second.read(self.path, 'badnicks.txt'), ['Spammer', 'guest-123', 'Newbie'])
+        self.assertTrue(store.remove('GUEST-123'))
+        self.assertEqual(self.second.read(self.path, 'badnicks.txt'), ['Spammer', 'Newbie'])
+
+        # A change by the other process is picked up from the version.
+        self.second.add(self.path, 'badnicks.txt', 'Other')
+        self.assertIn('other', store)
+        self.second.clear(self.path, 'badnicks.txt')
+        self.assertNotIn('spammer', store)
+        self.assertEqual(len(store), 0)
+        # The file itself is left as it was.
+        with open(self.path + 'badnicks.txt') as f:
+            self.assertEqual(f.read(), 'Spammer\n\nguest-123\nSpammer\n')
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+
+""" Checks of the in memory lists: case insensitive membership and changes written through to the file. """
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from files import file_handler as fh, list_store
+
+
+class ListStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = self.directory + os.sep
+        self.name = 'badnicks.txt'
+        with open(self.path + self.name, 'w') as f:
+            f.write('Spammer\n  guest-123 \n\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def lines(self):
+        return fh.file_reader(self.path, self.name)
+
+    def test_membership_ignores_case_and_whitespace(self):
+        store = list_store.ListStore(self.path, self.name)
+        self.assertEqual(len(store), 2)
+        self.assertIn('spammer', store)
+        self.assertIn('SPAMMER', store)
+        self.assertIn('Guest-123', store)
+        self.assertIn(' spammer ', store)
+        self.assertNotIn('spammer2', store)
+        self.assertNotIn('', store)
+        self.assertNotIn(None, store)
+
+    def test_missing_file(self):
+        store = list_store.ListStore(self.path, 'missing.txt')
+        self.assertEqual(len(store), 0)
+        self.assertNotIn('anyone', store)
+
+    def test_add_writes_through(self):
+        store = list_store.ListStore(self.path, self.name)
+        self.assertTrue(store.add('Newbie'))
+        self.assertIn('newbie', store)
+        self.assertIn('Newbie', self.lines())
+        self.assertFalse(store.add('NEWBIE'))
+        self.assertFalse(store.add('spammer'))
+        self.assertEqual(self.lines().count('Newbie'), 1)
+
+    def test_remove_writes_through(self):
+        store = list_store.ListStore(self.path, self.name)
+        # The line is removed as it is written in the file, whatever the case it is removed in.
+        self.assertTrue(store.remove('SPAMMER'))
+        self.assertNotIn('spammer', store)
+        self.assertNotIn('Spammer', self.lines())
+        self.assertFalse(store.remove('spammer'))
+
+    def test_clear(self):
+        store = list_store.ListStore(self.path, self.name)
+        store.clear()
+        self.assertEqual(len(store), 0)
+        self.assertEqual(self.lines(), [])
+
+    def test_file_changed_elsewhere(self):
+        store = list_store.ListStore(self.path, self.name, check_interval=0)
+        fh.file_writer(self.path, self.name, 'HandEdited')
+        os.utime(self.path + self.name, (1, 1))
+        self.assertIn('handedited', store)
+
+    def test_fold_confusables(self):
+        store = list_store.ListStore(self.path, self.name, fold_confusables=True)
+        # Cyrillic a and e, and a zero width space.
+        self.assertIn(u'Sp\u0430mm\u0435r', store)
+        self.assertIn(u'spam\u200bmer', store)
+        plain = list_store.ListStore(self.path, self.name)
+        self.assertNotIn(u'Sp\u0430mm\u0435r', plain)
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+
+""" Checks of the bad strings matcher: folding, whole word matching and recompiling the file when it changes. """
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from files import matcher
+
+
+class FoldTest(unittest.TestCase):
+
+    def test_ascii_is_only_lower_cased(self):
+        self.assertEqual(matcher.fold('HeLLo 0O1l!'), u'hello 0o1l!')
+        self.assertIs(type(matcher.fold('bytes')), unicode)
+
+    def test_full_width_and_styled_letters(self):
+        self.assertEqual(matcher.fold(u'\uff26\uff32\uff25\uff25'), u'free')
+        self.assertEqual(matcher.fold(u'\U0001d41f\U0001d42b\U0001d41e\U0001d41e'), u'free')
+
+    def test_look_alike_letters(self):
+        # Cyrillic c, a and capital S, Greek omicron.
+        self.assertEqual(matcher.fold(u'\u0441l\u0430\u0405s'), u'class')
+        self.assertEqual(matcher.fold(u'g\u03bfal'), u'goal')
+
+    def test_zero_width_characters(self):
+        self.assertEqual(matcher.fold(u'a\u200bs\u200d\ufeffs'), u'ass')
+        self.assertEqual(matcher.fold(u'a\u00ads\u2060s'), u'ass')
+
+    def test_order(self):
+        # NFKC first: the Greek rho and lunate epsilon symbols normalize to look-alike letters.
+        self.assertEqual(matcher.fold(u'\u03f1\u03f5n'), u'pen')
+        # Lower case last: the roman numeral twelve normalizes to capitals.
+        self.assertEqual(matcher.fold(u'\u216b'), u'xii')
+
+    def test_utf8_bytes(self):
+        self.assertEqual(matcher.fold(u'\u0441l\u0430ss'.encode('utf-8')), u'class')
+        self.assertEqual(matcher.fold('bad \xff byte'), u'bad \ufffd byte')
+
+    def test_evasion_is_matched(self):
+        strings = matcher.StringMatcher(['ass'])
+        self.assertEqual(strings.search(u'you \u0430\u200bss'), u'ass')
+        self.assertEqual(strings.search(u'you \uff21\uff33\uff33'), u'ass')
+        self.assertIsNone(strings.search(u'go to cl\u0430ss'))
+
+
+class StringMatcherTest(unittest.TestCase):
+
+    def test_whole_words_only(self):
+        strings = matcher.StringMatcher(['ass'])
+        self.assertIsNone(strings.search('go to class'))
+        self.assertIsNone(strings.search('assignment passing grass'))
+        self.assertEqual(strings.search('you ass'), u'ass')
+        self.assertEqual(strings.search('ass!'), u'ass')
+        self.assertEqual(strings.search('(ass)'), u'ass')
+
+    def test_phrases(self):
+        strings = matcher.StringMatcher(['buy followers', 'free'])
+        self.assertEqual(strings.search('want to buy followers cheap'), u'buy followers')
+        self.assertIsNone(strings.search('buy more followers'))
+        self.assertIsNone(strings.search('rebuy followersx'))
+        self.assertIsNone(strings.search('freedom'))
+
+    def test_case_is_ignored(self):
+        strings = matcher.StringMatcher(['BadWord'])
+        self.assertEqual(strings.strings, [u'badword'])
+        self.assertEqual(strings.search('a BADWORD here'), u'badword')
+
+    def test_overlapping_strings(self):
+        strings = matcher.StringMatcher(['he', 'she', 'hers', 'his'])
+        found = list(strings.finditer('ushers she his he'))
+        self.assertEqual(found, [(7, u'she'), (11, u'his'), (15, u'he')])
+
+    def test_all_matches_in_order(self):
+        strings = matcher.StringMatcher(['spam', 'spam and eggs', 'eggs'])
+        found = list(strings.finditer('spam and eggs'))
+        self.assertEqual(found, [(0, u'spam'), (0, u'spam and eggs'), (9, u'eggs')])
+
+    def test_empty_strings_are_skipped(self):
+        strings = matcher.StringMatcher(['', '   ', 'word'])
+        self.assertEqual(len(strings), 1)
+        self.assertIsNone(matcher.StringMatcher(()).search('anything'))
+
+    def test_unicode_and_bytes(self):
+        strings = matcher.StringMatcher([u'caf\xe9'])
+        self.assertEqual(strings.search(u'un caf\xe9 noir'), u'caf\xe9')
+        self.assertEqual(strings.search('un caf\xc3\xa9 noir'), u'caf\xe9')
+
+
+class FileMatcherTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = self.directory + os.sep
+        self.name = 'badstrings.txt'
+        with open(self.path + self.name, 'w') as f:
+            f.write('first\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_missing_file(self):
+        strings = matcher.FileMatcher(self.path, 'missing.txt')
+        self.assertIsNone(strings.search('first'))
+
+    def test_invalidate(self):
+        strings = matcher.FileMatcher(self.path, self.name, check_interval=60)
+        self.assertEqual(strings.search('the first one'), u'first')
+        with open(self.path + self.name, 'a') as f:
+            f.write('second\n')
+        # Within the check interval the file is not looked at.
+        self.assertIsNone(strings.search('the second one'))
+        strings.invalidate()
+        self.assertEqual(strings.search('the second one'), u'second')
+        self.assertEqual(strings.builds, 2)
+
+    def test_file_change(self):
+        strings = matcher.FileMatcher(self.path, self.name, check_interval=0)
+        self.assertEqual(strings.search('the first one'), u'first')
+        with open(self.path + self.name, 'w') as f:
+            f.write('second\n')
+        os.utime(self.path + self.name, (1, 1))
+        self.assertIsNone(strings.search('the first one'))
+        self.assertEqual(strings.search('the second one'), u'second')
+
+    def test_unchanged_file_is_not_compiled_again(self):
+        strings = matcher.FileMatcher(self.path, self.name, check_interval=0)
+        strings.search('first')
+        strings.search('first')
+        self.assertEqual(strings.builds, 1)
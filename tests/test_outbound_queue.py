@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+
+""" Checks of the outbound message queue: sending order, starvation, dropping and closing. """
+
+import threading
+import unittest
+
+from rtmp import rtmp_protocol
+from rtmp.rtmp_protocol import SendPriority
+
+
+def _run(target, *args):
+    """ Run a function in a daemon thread, keeping its result. """
+    result = []
+    thread = threading.Thread(target=lambda: result.append(target(*args)))
+    thread.daemon = True
+    thread.start()
+    return thread, result
+
+
+class OutboundQueueTest(unittest.TestCase):
+
+    def test_most_urgent_class_first(self):
+        queue = rtmp_protocol.OutboundQueue(10)
+        queue.put('media', SendPriority.MEDIA)
+        queue.put('chat 1')
+        queue.put('control', SendPriority.CONTROL)
+        queue.put('chat 2', SendPriority.CHAT)
+        queue.put('moderation', SendPriority.MODERATION)
+        self.assertEqual(len(queue), 5)
+        self.assertEqual(queue.get_batch(10), [
+            (SendPriority.CONTROL, 'control'),
+            (SendPriority.MODERATION, 'moderation'),
+            (SendPriority.CHAT, 'chat 1'),
+            (SendPriority.CHAT, 'chat 2'),
+            (SendPriority.MEDIA, 'media')
+        ])
+        self.assertEqual(len(queue), 0)
+
+    def test_batch_size(self):
+        queue = rtmp_protocol.OutboundQueue(10)
+        for number in range(5):
+            queue.put(number)
+        self.assertEqual([message for _, message in queue.get_batch(2)], [0, 1])
+        self.assertEqual([message for _, message in queue.get_batch(10)], [2, 3, 4])
+
+    def test_starved_class_is_served(self):
+        queue = rtmp_protocol.OutboundQueue(10, starvation_limit=2)
+        for number in range(6):
+            queue.put('control %d' % number, SendPriority.CONTROL)
+        queue.put('media 0', SendPriority.MEDIA)
+        queue.put('media 1', SendPriority.MEDIA)
+        self.assertEqual([message for _, message in queue.get_batch(8)], [
+            'control 0', 'control 1', 'media 0',
+            'control 2', 'control 3', 'media 1',
+            'control 4', 'control 5'
+        ])
+
+    def test_starvation_counts_across_batches(self):
+        queue = rtmp_protocol.OutboundQueue(10, starvation_limit=2)
+        queue.put('media', SendPriority.MEDIA)
+        for number in range(2):
+            queue.put('control %d' % number, SendPriority.CONTROL)
+            self.assertEqual(queue.get_batch(1), [(SendPriority.CONTROL, 'control %d' % number)])
+        queue.put('control 2', SendPriority.CONTROL)
+        self.assertEqual(queue.get_batch(1), [(SendPriority.MEDIA, 'media')])
+        self.assertEqual(queue.get_batch(1), [(SendPriority.CONTROL, 'control 2')])
+
+    def test_drop_when_full(self):
+        queue = rtmp_protocol.OutboundQueue(2)
+        self.assertTrue(queue.put('chat 1'))
+        self.assertTrue(queue.put('chat 2'))
+        self.assertFalse(queue.put('chat 3'))
+        # Every class has its own limit.
+        self.assertTrue(queue.put('control', SendPriority.CONTROL))
+
+        stats = queue.stats()
+        self.assertEqual(stats['chat'], {'queued': 2, 'high_water': 2, 'dropped': 1,
+                                         'sent_messages': 0, 'sent_bytes': 0})
+        self.assertEqual(stats['control']['dropped'], 0)
+        self.assertEqual([message for _, message in queue.get_batch(10)], ['control', 'chat 1', 'chat 2'])
+
+    def test_record_sent(self):
+        queue = rtmp_protocol.OutboundQueue(2)
+        queue.record_sent(SendPriority.MEDIA, 100)
+        queue.record_sent(SendPriority.MEDIA, 50)
+        self.assertEqual(queue.stats()['media']['sent_messages'], 2)
+        self.assertEqual(queue.stats()['media']['sent_bytes'], 150)
+
+    def test_get_batch_waits_for_messages(self):
+        queue = rtmp_protocol.OutboundQueue(2)
+        thread, result = _run(queue.get_batch, 10)
+        thread.join(0.05)
+        self.assertTrue(thread.is_alive())
+        queue.put('chat')
+        thread.join(5)
+        self.assertEqual(result, [[(SendPriority.CHAT, 'chat')]])
+
+    def test_close(self):
+        queue = rtmp_protocol.OutboundQueue(2)
+        thread, result = _run(queue.get_batch, 10)
+        thread.join(0.05)
+        queue.close()
+        thread.join(5)
+        self.assertEqual(result, [[]])
+
+        self.assertFalse(queue.put('chat'))
+        self.assertEqual(queue.stats()['chat']['dropped'], 1)
+        self.assertEqual(queue.get_batch(10), [])
+
+    def test_close_discards_pending_messages(self):
+        queue = rtmp_protocol.OutboundQueue(2)
+        queue.put('chat')
+        queue.close()
+        self.assertEqual(len(queue), 0)
+        self.assertEqual(queue.get_batch(10), [])
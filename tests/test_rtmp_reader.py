@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+
+""" Checks of reading RTMP messages straight from a socket. """
+
+import socket
+import threading
+import unittest
+
+from rtmp import rtmp_protocol
+
+
+class _Sink(object):
+    """ A socket collecting what is sent to it. """
+
+    def __init__(self):
+        self.data = bytearray()
+
+    def sendall(self, data):
+        self.data += data
+
+
+def _messages():
+    return [
+        {'msg': rtmp_protocol.DataTypes.COMMAND, 'command': [u'privmsg', 0, None, u'0', u'104,105', u'#0,en', u'a']},
+        {'msg': rtmp_protocol.DataTypes.COMMAND, 'command': [u'long', 0, None, u'x' * 1000]},
+        {'msg': rtmp_protocol.DataTypes.AUDIO, 'stream_id': 1, 'timestamp': 5,
+         'body': {'control': 0xaf, 'data': '\x01' * 300}},
+        {'msg': rtmp_protocol.DataTypes.USER_CONTROL, 'event_type': rtmp_protocol.UserControlTypes.PING_REQUEST,
+         'event_data': '\x00\x00\x01\x00'},
+        {'msg': rtmp_protocol.DataTypes.COMMAND, 'command': [u'quit', 0, None, u'a', 1]}
+    ]
+
+
+def _encode(messages):
+    sink = _Sink()
+    writer = rtmp_protocol.RtmpWriter(sink)
+    for message in messages:
+        writer.write(message)
+    writer.flush()
+    return str(sink.data)
+
+
+class SocketDataTypeMixInTest(unittest.TestCase):
+
+    def read_from_socket(self, data, piece_size, buffer_size=65536):
+        """ Send the data over a socket pair in pieces and read the messages from the other end. """
+        sender, receiver = [socket.socket(_sock=sock) for sock in socket.socketpair()]
+
+        def send():
+            for start in xrange(0, len(data), piece_size):
+                sender.sendall(data[start:start + piece_size])
+            sender.close()
+
+        thread = threading.Thread(target=send)
+        thread.start()
+        try:
+            reader = rtmp_protocol.RtmpReader(rtmp_protocol.SocketDataTypeMixIn(receiver, buffer_size))
+            messages = []
+            for _ in xrange(len(_messages())):
+                message = reader.next()
+                if message['msg'] == rtmp_protocol.DataTypes.COMMAND:
+                    messages.append(list(message['command']))
+                elif message['msg'] == rtmp_protocol.DataTypes.AUDIO:
+                    messages.append(message['data'].tobytes())
+                else:
+                    messages.append(message['event_data'])
+            self.assertRaises(IOError, reader.stream.read, 1)
+            return messages
+        finally:
+            thread.join()
+            receiver.close()
+
+    def expected(self):
+        expected = []
+        for message in _messages():
+            if 'command' in message:
+                expected.append(message['command'])
+            elif 'body' in message:
+                expected.append(message['body']['data'])
+            else:
+                expected.append(message['event_data'])
+        return expected
+
+    def test_whole_stream(self):
+        self.assertEqual(self.read_from_socket(_encode(_messages()), 65536), self.expected())
+
+    def test_stream_in_small_pieces(self):
+        # Chunks arrive in parts, and are partly received straight into the message bodies.
+        for piece_size in (1, 7, 100):
+            self.assertEqual(self.read_from_socket(_encode(_messages()), piece_size), self.expected())
+
+    def test_small_receive_buffer(self):
+        self.assertEqual(self.read_from_socket(_encode(_messages()), 65536, buffer_size=8), self.expected())
+
+    def test_write_and_flush(self):
+        sender, receiver = socket.socketpair()
+        stream = rtmp_protocol.SocketDataTypeMixIn(socket.socket(_sock=sender))
+        stream.write_uchar(3)
+        stream.write('abc')
+        stream.flush()
+        self.assertEqual(receiver.recv(16), '\x03abc')
+        sender.close()
+        receiver.close()
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+
+""" Checks of the spam checks: the compiled spam rules and the flood detector. """
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from files import spam_filter
+
+RULES = [
+    {'name': 'unicode_spam', 'type': 'substrings', 'strings': [u'▲', u'Free Coins']},
+    {'name': 'room_link', 'type': 'link', 'domains': ['tinychat.com']},
+    {'name': 'snapshot', 'type': 'substrings', 'action': 'kick', 'option': 'snapshot',
+     'strings': ['I just took a video snapshot of this chatroom.']},
+    {'name': 'phone', 'type': 'regex', 'pattern': r'\b\d{3}-\d{4}\b'},
+    {'name': 'symbols', 'type': 'unicode_category', 'categories': ['So', 'Sm'], 'max_count': 3}]
+
+
+class SpamRulesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.rules = spam_filter.SpamRules(RULES)
+
+    def check(self, msg, room='myroom', options=None):
+        hit = self.rules.check(msg, room, options or {})
+        return None if hit is None else (hit.rule.name, hit.text)
+
+    def test_clean_message(self):
+        self.assertIsNone(self.check('hello everyone, how are you?'))
+
+    def test_substrings_are_folded(self):
+        self.assertEqual(self.check(u'look ▲ here'), ('unicode_spam', u'▲'))
+        self.assertEqual(self.check('get FREE COINS now'), ('unicode_spam', u'free coins'))
+        # Cyrillic e and o, and a zero width space.
+        self.assertEqual(self.check(u'fr\u0435e c\u043e\u200bins'), ('unicode_spam', u'free coins'))
+        self.assertEqual(self.check('get free coins now'.encode('utf-8')), ('unicode_spam', u'free coins'))
+
+    def test_link_to_another_room(self):
+        self.assertEqual(self.check('come to tinychat.com/otherroom'), ('room_link', u'tinychat.com/otherroom'))
+        self.assertEqual(self.check('http://tinychat.com//otherroom/ now'), ('room_link', u'tinychat.com//otherroom'))
+
+    def test_link_to_own_room(self):
+        self.assertIsNone(self.check('come to tinychat.com/myroom'))
+        self.assertIsNone(self.check('come to tinychat.com/MyRoom', room='MYROOM'))
+
+    def test_link_to_look_alike_domain_or_page(self):
+        self.assertIsNone(self.check('see nottinychat.com/otherroom'))
+        self.assertIsNone(self.check('see tinychat.com/otherroom/page'))
+
+    def test_option_gates_rule(self):
+        msg = 'I just took a video snapshot of this chatroom. Check it out here:'
+        self.assertIsNone(self.check(msg))
+        self.assertIsNone(self.check(msg, options={'snapshot': False}))
+        hit = self.rules.check(msg, 'myroom', {'snapshot': True})
+        self.assertEqual(hit.rule.name, 'snapshot')
+        self.assertEqual(hit.rule.action, spam_filter.ACTION_KICK)
+
+    def test_regex(self):
+        self.assertEqual(self.check('call me 555-1234'), ('phone', u'555-1234'))
+        self.assertIsNone(self.check('call me 5551234'))
+
+    def test_unicode_category(self):
+        self.assertIsNone(self.check(u'♥♥♥ love it'))
+        self.assertEqual(self.check(u'♥♥♥∞ love it'), ('symbols', '4'))
+
+    def test_literals_before_regexes(self):
+        self.assertEqual(self.check('free coins, call 555-1234'), ('unicode_spam', u'free coins'))
+
+    def test_invalid_rules(self):
+        invalid = [{'type': 'substrings', 'strings': ['x']},
+                   {'name': 'x', 'type': 'unknown'},
+                   {'name': 'x', 'type': 'substrings', 'action': 'mute', 'strings': ['x']},
+                   {'name': 'x', 'type': 'regex', 'pattern': '(unclosed'},
+                   {'name': 'x', 'type': 'substrings', 'strings': []},
+                   {'name': 'x', 'type': 'substrings', 'strings': ['']},
+                   {'name': 'x', 'type': 'link', 'domains': []}]
+        for rule in invalid:
+            self.assertRaises(ValueError, spam_filter.SpamRules, [rule])
+
+    def test_every_option_combination_is_compiled(self):
+        rules = spam_filter.SpamRules(RULES + [{'name': 'other', 'type': 'regex', 'option': 'other', 'pattern': 'x+'}])
+        self.assertEqual(len(rules._compiled), 4)
+
+
+class SpamFilterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.config = os.path.join(self.directory, 'config.ini')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write_rules(self, rules, mtime):
+        with open(self.config, 'w') as f:
+            f.write('[SPAM]\nspam_rules = %r\n' % (rules, ))
+        os.utime(self.config, (mtime, mtime))
+
+    def test_invalid_rules_keep_the_previous_rules(self):
+        self.write_rules([{'name': 'word', 'type': 'substrings', 'strings': ['spam']}], 1)
+        spam = spam_filter.SpamFilter(self.config, check_interval=0)
+        self.assertEqual(spam.check('some spam', 'room', {}).rule.name, 'word')
+
+        self.write_rules([{'name': 'empty', 'type': 'substrings', 'strings': []}], 2)
+        self.assertEqual(spam.check('some spam', 'room', {}).rule.name, 'word')
+        self.assertIsNone(spam.check('hello', 'room', {}))
+
+        self.write_rules([{'name': 'other', 'type': 'substrings', 'strings': ['eggs']}], 3)
+        self.assertIsNone(spam.check('some spam', 'room', {}))
+        self.assertEqual(spam.stats()['hits'], {'word': 2})
+
+
+class FloodDetectorTest(unittest.TestCase):
+
+    def send(self, detector, times, msgs=None, history=None):
+        """ Check messages received at the times, returning the history and the reasons. """
+        reasons = []
+        for number, received in enumerate(times):
+            msg = 'message %d' % number if msgs is None else msgs[number]
+            history, reason = detector.check(history, msg, received)
+            reasons.append(reason)
+        return history, reasons
+
+    def test_burst(self):
+        detector = spam_filter.FloodDetector(0, 0, 5, 3, 0)
+        history, reasons = self.send(detector, [0, 0.5, 1, 1.5, 2, 2.5])
+        self.assertEqual(reasons, [None] * 5 + [spam_filter.FLOOD_BURST])
+
+    def test_burst_time_span_is_exclusive(self):
+        detector = spam_filter.FloodDetector(0, 0, 5, 3, 0)
+        history, reasons = self.send(detector, [0, 0.5, 1, 1.5, 2, 3])
+        self.assertEqual(reasons, [None] * 6)
+
+    def test_rate(self):
+        detector = spam_filter.FloodDetector(12, 30, 5, 3, 0)
+        history, reasons = self.send(detector, [number * 2 for number in xrange(13)])
+        self.assertEqual(reasons, [None] * 12 + [spam_filter.FLOOD_RATE])
+        # One message every 2.5 seconds is 12 messages in 30 seconds, which is allowed.
+        history, reasons = self.send(detector, [number * 2.5 for number in xrange(40)])
+        self.assertEqual(reasons, [None] * 40)
+
+    def test_repeats(self):
+        detector = spam_filter.FloodDetector(0, 0, 0, 0, 4)
+        msgs = ['same'] * 4 + ['other', 'same'] + ['again'] * 5
+        history, reasons = self.send(detector, range(len(msgs)), msgs)
+        self.assertEqual(reasons, [None] * 10 + [spam_filter.FLOOD_REPEAT])
+
+    def test_ring_wraps_around(self):
+        detector = spam_filter.FloodDetector(3, 10, 2, 1, 0)
+        # Many messages far apart fill the ring several times over.
+        history, reasons = self.send(detector, [number * 100 for number in xrange(50)])
+        self.assertEqual(reasons, [None] * 50)
+        self.assertEqual(history.count, detector.size)
+        self.assertEqual(len(history.times), detector.size)
+        # A burst is found wherever in the ring it starts, also when it wraps around the end.
+        for start in xrange(detector.size):
+            history, reasons = self.send(detector, [10000 * (start + 1) + t for t in (0, 0.2, 0.4)], history=history)
+            self.assertEqual(reasons, [None, None, spam_filter.FLOOD_BURST])
+
+    def test_history_is_replaced_when_the_size_changes(self):
+        history, reasons = self.send(spam_filter.FloodDetector(3, 10, 0, 0, 0), [0, 1])
+        detector = spam_filter.FloodDetector(5, 10, 0, 0, 0)
+        new_history, reason = detector.check(history, 'message', 2)
+        self.assertIsNot(new_history, history)
+        self.assertEqual(new_history.count, 1)
+
+    def test_checks_off(self):
+        detector = spam_filter.FloodDetector(0, 0, 0, 0, 0)
+        history, reasons = self.send(detector, [0] * 20, ['same'] * 20)
+        self.assertEqual(reasons, [None] * 20)